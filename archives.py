@@ -0,0 +1,385 @@
+import fnmatch
+import io
+import logging
+import multiprocessing
+import os
+import re
+import shutil
+import tarfile
+import tempfile
+import threading
+import time
+import zlib
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Already-compressed formats are stored as-is; deflating them again only burns CPU
+STORE_EXTENSIONS = {
+    ".jpg", ".jpeg", ".png", ".gif", ".webp", ".mp3", ".mp4", ".mkv", ".avi", ".mov",
+    ".zip", ".gz", ".bz2", ".xz", ".7z", ".rar", ".docx", ".xlsx", ".pptx",
+}
+
+CHUNK_SIZE = 1024 * 1024
+# Compressed members up to this size travel back from workers in memory, larger ones via temp files
+INLINE_LIMIT = 1024 * 1024
+# Small files are grouped so each worker task carries at least this much input
+BATCH_BYTES = 8 * 1024 * 1024
+BATCH_FILES = 64
+
+
+def collect_members(paths):
+    # Expands directories recursively. Returns (files, directories) as
+    # (path, arcname) pairs; a folder keeps its own name as the top level.
+    files, directories = [], []
+    for path in paths:
+        path = os.path.abspath(path)
+        if not os.path.isdir(path):
+            files.append((path, os.path.basename(path)))
+            continue
+        base = os.path.dirname(path)
+        for current, subdirs, names in os.walk(path):
+            subdirs.sort()
+            directories.append((current, os.path.relpath(current, base).replace(os.sep, "/") + "/"))
+            for name in sorted(names):
+                full = os.path.join(current, name)
+                files.append((full, os.path.relpath(full, base).replace(os.sep, "/")))
+    return files, directories
+
+
+def _batches(members):
+    batch, batch_bytes = [], 0
+    for path, arcname in members:
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            size = 0
+        batch.append((path, arcname))
+        batch_bytes += size
+        if batch_bytes >= BATCH_BYTES or len(batch) >= BATCH_FILES:
+            yield batch
+            batch, batch_bytes = [], 0
+    if batch:
+        yield batch
+
+
+def _deflate_member(path, level, temp_dir, store_extensions):
+    # Runs in a worker process. Returns (compress_type, crc, file_size,
+    # compress_size, data, temp_path); stored members are copied from the
+    # source file by the writer, so neither data nor temp_path is set.
+    crc = 0
+    size = 0
+    store = os.path.splitext(path)[1].lower() in store_extensions
+    if store:
+        with open(path, "rb") as source:
+            while chunk := source.read(CHUNK_SIZE):
+                crc = zlib.crc32(chunk, crc)
+                size += len(chunk)
+        return zipfile.ZIP_STORED, crc, size, size, None, None
+
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    out = io.BytesIO()
+    spill = None
+    with open(path, "rb") as source:
+        while chunk := source.read(CHUNK_SIZE):
+            crc = zlib.crc32(chunk, crc)
+            size += len(chunk)
+            out.write(compressor.compress(chunk))
+            if spill is None and out.tell() > INLINE_LIMIT:
+                spill = tempfile.NamedTemporaryFile(dir=temp_dir, delete=False)
+                spill.write(out.getvalue())
+                out = spill
+    out.write(compressor.flush())
+    compressed = out.tell()
+
+    if compressed >= size:
+        # Incompressible after all: store it rather than grow it
+        if spill is not None:
+            spill.close()
+            os.remove(spill.name)
+        return zipfile.ZIP_STORED, crc, size, size, None, None
+    if spill is not None:
+        spill.close()
+        return zipfile.ZIP_DEFLATED, crc, size, compressed, None, spill.name
+    return zipfile.ZIP_DEFLATED, crc, size, compressed, out.getvalue(), None
+
+
+def _deflate_batch(batch, level, temp_dir, store_extensions):
+    return [_deflate_member(path, level, temp_dir, store_extensions) for path, _ in batch]
+
+
+def _copy_exact(source, target, size):
+    while size > 0:
+        chunk = source.read(min(CHUNK_SIZE, size))
+        if not chunk:
+            raise IOError(f"Source ended {size} bytes short while it was being copied")
+        target.write(chunk)
+        size -= len(chunk)
+
+
+def _append_member(zf, path, arcname, result):
+    # Writes a member whose data is already compressed: local header, then the
+    # bytes, then registers it so ZipFile.close() writes the central directory
+    compress_type, crc, file_size, compress_size, data, temp_path = result
+    zinfo = zipfile.ZipInfo.from_file(path, arcname, strict_timestamps=False)
+    zinfo.compress_type = compress_type
+    zinfo.CRC = crc
+    zinfo.file_size = file_size
+    zinfo.compress_size = compress_size
+    zip64 = file_size > zipfile.ZIP64_LIMIT or compress_size > zipfile.ZIP64_LIMIT
+    zinfo.header_offset = zf.fp.tell()
+    zf.fp.write(zinfo.FileHeader(zip64))
+    if data is not None:
+        zf.fp.write(data)
+    elif temp_path is not None:
+        with open(temp_path, "rb") as source:
+            shutil.copyfileobj(source, zf.fp, CHUNK_SIZE)
+        os.remove(temp_path)
+    else:
+        with open(path, "rb") as source:
+            _copy_exact(source, zf.fp, file_size)
+    zf.filelist.append(zinfo)
+    zf.NameToInfo[arcname] = zinfo
+    zf.start_dir = zf.fp.tell()
+
+
+def _ordered_results(pool, batches, args, window):
+    # Keeps at most `window` batches in flight and yields results in input
+    # order, so the archive streams out while memory and temp space stay bounded
+    pending = deque()
+    for batch in batches:
+        pending.append((batch, pool.submit(_deflate_batch, batch, *args)))
+        if len(pending) >= window:
+            done, future = pending.popleft()
+            yield from zip(done, future.result())
+    while pending:
+        done, future = pending.popleft()
+        yield from zip(done, future.result())
+
+
+def compress_paths(paths, output_path, level=6, workers=None, store_extensions=STORE_EXTENSIONS):
+    # Zips files and folders, deflating members on `workers` processes
+    # (1 compresses in this process). Returns a summary dict.
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    files, directories = collect_members(paths)
+    output_dir = os.path.dirname(os.path.abspath(output_path))
+    stats = {"files": 0, "directories": len(directories), "bytes_in": 0, "bytes_out": 0, "workers": workers}
+
+    with tempfile.TemporaryDirectory(dir=output_dir, prefix=".compress-") as temp_dir, \
+            zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as zf:
+        for path, arcname in directories:
+            zf.write(path, arcname)
+        args = (level, temp_dir, store_extensions)
+        batches = _batches(files)
+        if workers == 1:
+            results = ((member, result) for batch in batches
+                       for member, result in zip(batch, _deflate_batch(batch, *args)))
+            for (path, arcname), result in results:
+                _append_member(zf, path, arcname, result)
+                stats["files"] += 1
+                stats["bytes_in"] += result[2]
+        else:
+            # Spawned on every platform, as on Windows: forking a process that
+            # already runs scheduler and executor threads is unsafe
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+                for (path, arcname), result in _ordered_results(pool, batches, args, workers * 2):
+                    _append_member(zf, path, arcname, result)
+                    stats["files"] += 1
+                    stats["bytes_in"] += result[2]
+    stats["bytes_out"] = os.path.getsize(output_path)
+    stats["seconds"] = time.perf_counter() - started
+    logging.debug(f"Compressed {stats['files']} files ({stats['bytes_in']} bytes) into {output_path} "
+                  f"with {workers} workers in {stats['seconds']:.2f}s")
+    return stats
+
+
+# Extraction
+
+def archive_format(path):
+    if zipfile.is_zipfile(path):
+        return "zip"
+    if tarfile.is_tarfile(path):
+        return "tar"
+    raise ValueError(f"{path} is not a zip or tar archive")
+
+
+def safe_target(root, name):
+    # Where member `name` lands under root, or None for absolute paths, drive
+    # letters and ".." components that would escape it
+    name = name.replace("\\", "/")
+    if name.startswith("/") or re.match(r"^[A-Za-z]:", name):
+        return None
+    parts = [part for part in name.split("/") if part not in ("", ".")]
+    if not parts or ".." in parts:
+        return None
+    root = os.path.abspath(root)
+    target = os.path.abspath(os.path.join(root, *parts))
+    if os.path.commonpath([root, target]) != root:
+        return None
+    return target
+
+
+def member_selected(name, include=None, exclude=None):
+    # Patterns match either the full member path or just its file name
+    name = name.rstrip("/")
+    base = name.rsplit("/", 1)[-1]
+    matches = lambda patterns: any(fnmatch.fnmatch(name, p) or fnmatch.fnmatch(base, p) for p in patterns)
+    if include and not matches(include):
+        return False
+    return not (exclude and matches(exclude))
+
+
+def list_archive(path):
+    # Member names, sizes and types without extracting anything
+    if archive_format(path) == "zip":
+        with zipfile.ZipFile(path) as zf:
+            return [
+                {"name": info.filename, "size": info.file_size, "compressed_size": info.compress_size,
+                 "is_dir": info.is_dir()}
+                for info in zf.infolist()
+            ]
+    listing = []
+    with tarfile.open(path, "r|*") as tf:
+        for member in tf:
+            listing.append({"name": member.name, "size": member.size, "compressed_size": None,
+                            "is_dir": member.isdir()})
+    return listing
+
+
+class _Progress:
+    def __init__(self, total, callback):
+        self.total = total
+        self.callback = callback
+        self.members = 0
+        self.bytes = 0
+        self.lock = threading.Lock()
+
+    def add(self, size):
+        with self.lock:
+            self.members += 1
+            self.bytes += size
+            if self.callback is not None:
+                self.callback(self.members, self.total, self.bytes)
+
+
+def _write_stream(source, target, size=None):
+    with open(target, "wb") as out:
+        if size is None:
+            # ZipExtFile reads are fastest at shutil's default buffer size
+            shutil.copyfileobj(source, out)
+        else:
+            _copy_exact(source, out, size)
+
+
+def _extract_zip(archive_path, extract_path, include, exclude, workers, progress_callback, stats):
+    with zipfile.ZipFile(archive_path) as zf:
+        infos = zf.infolist()
+    selected = []
+    for info in infos:
+        if not member_selected(info.filename, include, exclude):
+            stats["skipped"] += 1
+            continue
+        target = safe_target(extract_path, info.filename)
+        if target is None:
+            logging.warning(f"Rejected unsafe archive member {info.filename!r}")
+            stats["rejected"].append(info.filename)
+            continue
+        if info.is_dir():
+            os.makedirs(target, exist_ok=True)
+        else:
+            selected.append((info, target))
+    for parent in {os.path.dirname(target) for _, target in selected}:
+        os.makedirs(parent, exist_ok=True)
+
+    # Each worker thread reads through its own handle; zlib releases the GIL
+    # while inflating, so members decompress and write concurrently
+    local = threading.local()
+    handles = []
+    handles_lock = threading.Lock()
+    progress = _Progress(len(selected), progress_callback)
+
+    def extract_one(item):
+        info, target = item
+        if not hasattr(local, "zf"):
+            local.zf = zipfile.ZipFile(archive_path)
+            with handles_lock:
+                handles.append(local.zf)
+        with local.zf.open(info) as source:
+            _write_stream(source, target)
+        progress.add(info.file_size)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for _ in pool.map(extract_one, selected):
+                pass
+    finally:
+        for handle in handles:
+            handle.close()
+    stats["members"] = progress.members
+    stats["bytes"] = progress.bytes
+
+
+def _extract_tar(archive_path, extract_path, include, exclude, workers, progress_callback, stats):
+    # Tar streams decompress strictly in order, so reading stays on this
+    # thread; small members are handed to writer threads while large ones are
+    # copied straight through in chunks, bounding memory per member
+    progress = _Progress(None, progress_callback)
+    slots = threading.BoundedSemaphore(workers * 4)
+
+    def write_small(data, target, mtime):
+        try:
+            with open(target, "wb") as out:
+                out.write(data)
+            os.utime(target, (mtime, mtime))
+            progress.add(len(data))
+        finally:
+            slots.release()
+
+    with ThreadPoolExecutor(max_workers=workers) as pool, tarfile.open(archive_path, "r|*") as tf:
+        futures = []
+        for member in tf:
+            if not member_selected(member.name, include, exclude):
+                stats["skipped"] += 1
+                continue
+            target = safe_target(extract_path, member.name)
+            if target is None or not (member.isfile() or member.isdir()):
+                # Links and device nodes are never created: they can point outside extract_path
+                logging.warning(f"Rejected unsafe archive member {member.name!r}")
+                stats["rejected"].append(member.name)
+                continue
+            if member.isdir():
+                os.makedirs(target, exist_ok=True)
+                continue
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            source = tf.extractfile(member)
+            if member.size <= CHUNK_SIZE:
+                data = source.read()
+                slots.acquire()
+                futures.append(pool.submit(write_small, data, target, member.mtime))
+            else:
+                _write_stream(source, target, member.size)
+                os.utime(target, (member.mtime, member.mtime))
+                progress.add(member.size)
+        for future in futures:
+            future.result()
+    stats["members"] = progress.members
+    stats["bytes"] = progress.bytes
+
+
+def extract_members(archive_path, extract_path, include=None, exclude=None, workers=None, progress=None):
+    # Extracts zip or tar (.tar, .tar.gz, .tar.bz2, .tar.xz) members matching
+    # include and not exclude. progress(members_done, members_total, bytes)
+    # is called from worker threads; members_total is None for tar streams.
+    started = time.perf_counter()
+    workers = workers or min(8, (os.cpu_count() or 1) * 2)
+    stats = {"members": 0, "bytes": 0, "skipped": 0, "rejected": []}
+    os.makedirs(extract_path, exist_ok=True)
+    if archive_format(archive_path) == "zip":
+        _extract_zip(archive_path, extract_path, include, exclude, workers, progress, stats)
+    else:
+        _extract_tar(archive_path, extract_path, include, exclude, workers, progress, stats)
+    stats["seconds"] = time.perf_counter() - started
+    logging.debug(f"Extracted {stats['members']} members ({stats['bytes']} bytes) from {archive_path} "
+                  f"in {stats['seconds']:.2f}s; {stats['skipped']} skipped, {len(stats['rejected'])} rejected")
+    return stats
@@ -0,0 +1,212 @@
+import asyncio
+import logging
+import os
+from helpers import extract_json, validate_json_response
+from tools import DATA_DIR, start_streaming_plan, validate_tool_calls
+from tools_definition import tools
+from prompt_builder import PromptBuilder
+from tool_selector import ToolSelector
+from response_cache import ResponseCache
+from streaming import stream_tool_calls, stream_tool_calls_async
+from async_runtime import AsyncCommandPipeline, AsyncRuntime
+from tool_registry import requires
+
+AGENT_ID = "ag:364281a7:20241130:word-agent:9c4d242f"
+
+# Command pipeline sizing. Commands in flight are coroutines on one event
+# loop, so many can wait on the model at once; only model requests and the
+# threads for blocking calls are limited.
+MAX_PENDING_COMMANDS = 256
+MAX_LLM_REQUESTS = 4
+BLOCKING_WORKERS = 4
+
+# Command -> tool_calls translations are kept here between runs
+RESPONSE_CACHE_PATH = os.path.join(DATA_DIR, "response_cache.json")
+
+@requires(Mistral="mistralai:Mistral")
+def create_mistral_client(api_key):
+    return Mistral(api_key=api_key)
+
+class Assistant:
+    # The command -> tool calls -> results pipeline shared by the GUI and the
+    # headless server, running on an asyncio event loop in its own thread.
+    # Model requests are awaited, tools run on the tool executor and other
+    # blocking calls on the runtime's executor, so the loop itself never
+    # blocks. Each command carries its own output function, called from any
+    # thread, so results go back to whoever submitted it; on_done(success) is
+    # called once the command has finished.
+    def __init__(self, output=print, runtime=None, max_pending=MAX_PENDING_COMMANDS,
+                 max_in_flight=MAX_LLM_REQUESTS, cache_path=RESPONSE_CACHE_PATH, streaming=True):
+        self.output = output
+        self.runtime = runtime or AsyncRuntime(blocking_workers=BLOCKING_WORKERS)
+        self.pipeline = AsyncCommandPipeline(
+            self.runtime,
+            self._process,
+            max_pending=max_pending,
+            max_in_flight=max_in_flight,
+        )
+        self.prompt_builder = PromptBuilder(tools, selector=ToolSelector(tools))
+        self.response_cache = ResponseCache(path=cache_path)
+        self.streaming = streaming  # Dispatch tool calls while the response streams in
+        self.mistral_client = None
+
+    def connect(self, api_key):
+        self.use_client(create_mistral_client(api_key))
+
+    def use_client(self, client):
+        # Any object with Mistral's agents.complete / agents.stream, and
+        # preferably their *_async versions
+        self.mistral_client = client
+        self.pipeline.start()
+
+    def submit(self, command, output=None, on_done=None, key="commands", fresh=False):
+        # Thread-safe; raises queue.Full when the pipeline is saturated. With
+        # fresh=True the model is asked again even if the command is cached.
+        return self.pipeline.submit((command, output or self.output, on_done, fresh), key=key)
+
+    async def _process(self, item, ticket):
+        user_command, output, on_done, fresh = item
+        success = False
+        try:
+            success = await self.generate_and_execute_tools(user_command, ticket, output, fresh)
+        except Exception as e:
+            output(f"Command failed: {e}\n")
+            raise
+        finally:
+            if on_done is not None:
+                on_done(success)
+
+    async def generate_and_execute_tools(self, user_command, ticket, output, fresh=False):
+        # Generation overlaps with other commands; ticket.wait_turn() keeps
+        # tool execution in submission order. Returns False if no tools could
+        # be run for the command.
+        logging.debug(f"User command entered: {user_command}")
+
+        if not self.mistral_client:
+            output("API key not provided. Please submit your API key.\n")
+            return False
+
+        # Generate tool calls from Mistral agent, unless a cached translation exists
+        catalog_hash = self.prompt_builder.catalog_hash
+        tool_calls_json = self.response_cache.get(user_command, catalog_hash, bypass=fresh)
+        cached = tool_calls_json is not None
+        # Streamed and remaining calls go into one plan, so a call still waits
+        # for the earlier ones it depends on (same paths, barriers, depends_on)
+        plan = start_streaming_plan()
+        dispatched = []
+        deferred = []
+        rejected = []
+        if not cached:
+            # In streaming mode each tool call runs as soon as it has been received
+            # and validated, provided earlier commands are done. This must not wait
+            # because the LLM slot is still held, so anything out of turn runs after
+            # the stream. Nothing after an invalid call runs.
+            def dispatch(call):
+                if deferred or rejected or not ticket.try_turn():
+                    deferred.append(call)
+                    return
+                dispatched.append(call)
+                if not validate_json_response({"tool_calls": [call]}):
+                    rejected.append(f"Invalid tool call {call}")
+                    return
+                calls, errors = validate_tool_calls([call])
+                if errors:
+                    rejected.extend(errors)
+                    return
+                plan.add(calls[0]).add_done_callback(lambda f: self.report_results([f.result()], output))
+
+            tool_calls_json = await self.generate_tool_calls(
+                user_command, output, on_tool_call=dispatch if self.streaming else None)
+            if tool_calls_json is None:
+                output("Invalid JSON response from Mistral agent.\n")
+                await asyncio.wrap_future(plan.close())
+                return False
+
+            # Validate JSON response
+            if not validate_json_response(tool_calls_json):
+                output("Invalid JSON response format.\n")
+                await asyncio.wrap_future(plan.close())
+                return False
+        logging.debug(f"Response cache metrics: {self.response_cache.metrics()}")
+        logging.debug(f"Pipeline metrics: {self.pipeline.metrics()}")
+
+        # Execute tool calls that weren't already dispatched while streaming.
+        # Any invalid call rejects the plan before the rest of it runs.
+        tool_calls, errors = validate_tool_calls(tool_calls_json.get("tool_calls", [])[len(dispatched):])
+        errors = rejected + errors
+        if errors:
+            streamed = len(plan.tool_calls)
+            note = f" ({streamed} earlier tool calls already ran)" if streamed else ""
+            await asyncio.wrap_future(plan.close())
+            output(f"Rejected tool plan{note}: {'; '.join(errors)}\n")
+            return False
+        await ticket.wait_turn()
+        streamed = len(plan.tool_calls)
+        for call in tool_calls:
+            plan.add(call)
+        results, report = await asyncio.wrap_future(plan.close())
+        self.report_results(results[streamed:], output)
+        if len(results) > 1:
+            output(
+                f"Finished {len(results)} tools in {report['wall_seconds'] * 1000:.0f} ms; "
+                f"critical path {' -> '.join(report['critical_path'])} "
+                f"({report['critical_path_seconds'] * 1000:.0f} ms)\n")
+        if not cached and all(result["success"] for result in results):
+            # Only plans that validated and ran cleanly are replayed. Saving the
+            # cache writes a file, which must not block the loop
+            await self.runtime.run_blocking(self.response_cache.put, user_command, catalog_hash, tool_calls_json)
+        return True
+
+    def report_results(self, results, output):
+        for res in results:
+            timing = ""
+            if "queue_wait" in res:
+                timing = f" in {res['duration'] * 1000:.0f} ms (queued {res['queue_wait'] * 1000:.0f} ms)"
+            if res["success"]:
+                result = res.get("result")
+                detail = "" if isinstance(result, bool) or result is None else f": {str(result)[:200]}"
+                output(f"Tool {res['tool']} executed successfully{timing}{detail}\n")
+            else:
+                error = res.get("error") or "Unknown error"
+                output(f"Tool {res['tool']} failed{timing}: {error}\n")
+
+    async def generate_tool_calls(self, user_command, output, on_tool_call=None):
+        # Only the query changes between requests; the prefix is prebuilt
+        prompt = self.prompt_builder.build(user_command)
+        logging.debug(f"Prompt metrics: {self.prompt_builder.metrics()}")
+
+        # Generate model response using Mistral agent
+        try:
+            async with self.pipeline.llm_request():
+                if on_tool_call is not None:
+                    response = await self._stream(prompt, on_tool_call)
+                else:
+                    response = await self._complete(prompt)
+            logging.debug(f"Mistral agent response: {response}")
+        except Exception as e:
+            logging.error(f"Mistral agent request failed: {e}")
+            output(f"Mistral agent request failed: {e}\n")
+            return None
+
+        # Extract JSON from response
+        tool_calls_json = extract_json(response)
+        return tool_calls_json
+
+    async def _complete(self, prompt):
+        agents = self.mistral_client.agents
+        messages = [{"role": "user", "content": prompt},]
+        if hasattr(agents, "complete_async"):
+            chat_response = await agents.complete_async(agent_id=AGENT_ID, messages=messages)
+        else:
+            chat_response = await self.runtime.run_blocking(
+                lambda: agents.complete(agent_id=AGENT_ID, messages=messages))
+        return chat_response.choices[0].message.content
+
+    async def _stream(self, prompt, on_tool_call):
+        if hasattr(self.mistral_client.agents, "stream_async"):
+            return await stream_tool_calls_async(self.mistral_client, AGENT_ID, prompt, on_tool_call)
+        # A client without async methods streams on an executor thread and
+        # hands each tool call back to the loop
+        return await self.runtime.run_blocking(
+            stream_tool_calls, self.mistral_client, AGENT_ID, prompt,
+            lambda call: self.runtime.call_soon(on_tool_call, call))
@@ -0,0 +1,261 @@
+import asyncio
+import itertools
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
+
+class LoopLagMonitor:
+    # Sleeps `interval` at a time on the loop and records how late it wakes
+    # up. Anything that blocks the loop (a sync call in a coroutine, a long
+    # CPU step) shows up here as lag.
+    def __init__(self, interval=0.1, window=600):
+        self.interval = interval
+        self._samples = deque(maxlen=window)
+        self._max = 0.0
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, loop.time() - expected)
+            self._samples.append(lag)
+            self._max = max(self._max, lag)
+
+    def metrics(self):
+        samples = sorted(self._samples)
+        if not samples:
+            return {"loop_lag_ms": 0.0, "loop_lag_p99_ms": 0.0, "loop_lag_max_ms": 0.0}
+        return {
+            "loop_lag_ms": round(self._samples[-1] * 1000, 2),
+            "loop_lag_p99_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1000, 2),
+            "loop_lag_max_ms": round(self._max * 1000, 2),
+        }
+
+
+class AsyncRuntime:
+    # One asyncio event loop on a background thread. Coroutines are submitted
+    # from any thread (the Tk loop, HTTP handlers, tools); blocking calls that
+    # have no async version run on a small executor instead of the loop.
+    def __init__(self, blocking_workers=4, lag_interval=0.1):
+        self.loop = asyncio.new_event_loop()
+        self.executor = ThreadPoolExecutor(max_workers=blocking_workers, thread_name_prefix="blocking")
+        self.loop.set_default_executor(self.executor)
+        self.lag = LoopLagMonitor(interval=lag_interval)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            started = threading.Event()
+
+            def run():
+                asyncio.set_event_loop(self.loop)
+                self.loop.create_task(self.lag.run())
+                self.loop.call_soon(started.set)
+                self.loop.run_forever()
+
+            self._thread = threading.Thread(target=run, name="event-loop", daemon=True)
+            self._thread.start()
+            started.wait()
+
+    def submit(self, coro):
+        # Schedules a coroutine from any thread; returns a concurrent Future
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call_soon(self, func, *args):
+        self.start()
+        self.loop.call_soon_threadsafe(func, *args)
+
+    async def run_blocking(self, func, *args):
+        return await self.loop.run_in_executor(self.executor, func, *args)
+
+    def metrics(self):
+        metrics = self.lag.metrics()
+        metrics["threads"] = threading.active_count()
+        return metrics
+
+    def stop(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is None:
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        thread.join()
+        self.executor.shutdown(wait=False)
+
+
+class AsyncOrderingTicket:
+    # OrderingTicket for coroutines: waiting for a turn is awaited instead of
+    # blocking a thread. Used on the loop only.
+    def __init__(self, sequencer, key, seq):
+        self._sequencer = sequencer
+        self.key = key
+        self.seq = seq
+        self._has_turn = key is None
+
+    async def wait_turn(self):
+        if not self._has_turn:
+            await self._sequencer.wait_for(self.key, self.seq)
+            self._has_turn = True
+
+    def try_turn(self):
+        if not self._has_turn and self._sequencer.is_turn(self.key, self.seq):
+            self._has_turn = True
+        return self._has_turn
+
+    def finish(self):
+        if self.key is not None:
+            self._sequencer.advance(self.key, self.seq)
+
+
+class AsyncSequencer:
+    # Orders commands that share a key: each takes a numbered ticket and runs
+    # its tools only once every earlier ticket of that key has finished.
+    # Ticket numbers are handed out under a lock from any thread; turns are
+    # tracked and awaited on the loop.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next_ticket = {}
+        self._turn = {}
+        self._waiters = {}  # (key, seq) -> Future waiting for that turn
+        self._finished = set()  # (key, seq) finished before its turn came
+
+    def ticket(self, key):
+        if key is None:
+            return AsyncOrderingTicket(self, None, None)
+        with self._lock:
+            seq = self._next_ticket.get(key, 0)
+            self._next_ticket[key] = seq + 1
+        return AsyncOrderingTicket(self, key, seq)
+
+    def is_turn(self, key, seq):
+        return self._turn.get(key, 0) == seq
+
+    async def wait_for(self, key, seq):
+        if self.is_turn(key, seq):
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[(key, seq)] = waiter
+        await waiter
+
+    def advance(self, key, seq):
+        # A command that finished before its turn (e.g. it failed during
+        # generation) is skipped over once the commands before it finish
+        if not self.is_turn(key, seq):
+            self._finished.add((key, seq))
+            return
+        turn = seq + 1
+        while (key, turn) in self._finished:
+            self._finished.remove((key, turn))
+            turn += 1
+        self._turn[key] = turn
+        waiter = self._waiters.pop((key, turn), None)
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+
+class AsyncCommandPipeline:
+    # Commands on an event loop: every accepted command is a coroutine rather
+    # than a queued item waiting for a worker thread, so hundreds can be in
+    # flight at once. submit() raises queue.Full past max_pending, and
+    # llm_request() bounds concurrent model requests.
+    def __init__(self, runtime, process, max_pending=256, max_in_flight=4):
+        self.runtime = runtime
+        self.process = process
+        self.max_pending = max_pending
+        self.max_in_flight = max_in_flight
+        self.sequencer = AsyncSequencer()
+        self._llm_slots = None
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._llm_in_flight = 0
+        self._started = False
+        self._held = []  # Accepted before start(), e.g. before the API key is entered
+        self.stats = {
+            "submitted": 0, "rejected": 0, "completed": 0, "failed": 0,
+            "max_pending": 0, "max_llm_in_flight": 0,
+            # Time spent waiting for a model slot; there is no worker queue
+            "total_wait_seconds": 0.0, "max_wait_seconds": 0.0,
+        }
+
+    def start(self):
+        with self._lock:
+            self._started = True
+            held, self._held = self._held, []
+        for item in held:
+            self.runtime.submit(self._run(*item))
+
+    def stop(self):
+        with self._lock:
+            self._started = False
+        self.runtime.stop()
+
+    def submit(self, command, key=None):
+        # Never blocks; a full pipeline raises queue.Full
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.stats["rejected"] += 1
+                raise queue.Full
+            self._pending += 1
+            command_id = next(self._ids)
+            # Numbered in submission order
+            ticket = self.sequencer.ticket(key)
+            self.stats["submitted"] += 1
+            self.stats["max_pending"] = max(self.stats["max_pending"], self._pending)
+            item = (command_id, command, ticket)
+            if not self._started:
+                self._held.append(item)
+                return command_id
+        self.runtime.submit(self._run(*item))
+        return command_id
+
+    @asynccontextmanager
+    async def llm_request(self):
+        if self._llm_slots is None:
+            self._llm_slots = asyncio.Semaphore(self.max_in_flight)
+        started = time.monotonic()
+        async with self._llm_slots:
+            waited = time.monotonic() - started
+            with self._lock:
+                self._llm_in_flight += 1
+                self.stats["max_llm_in_flight"] = max(self.stats["max_llm_in_flight"], self._llm_in_flight)
+                self.stats["total_wait_seconds"] += waited
+                self.stats["max_wait_seconds"] = max(self.stats["max_wait_seconds"], waited)
+            try:
+                yield
+            finally:
+                with self._lock:
+                    self._llm_in_flight -= 1
+
+    async def _run(self, command_id, command, ticket):
+        try:
+            await self.process(command, ticket)
+            outcome = "completed"
+        except Exception as e:
+            logging.error(f"Command {command_id} failed: {e}")
+            outcome = "failed"
+        finally:
+            ticket.finish()
+        with self._lock:
+            self._pending -= 1
+            self.stats[outcome] += 1
+
+    def metrics(self):
+        with self._lock:
+            metrics = dict(self.stats)
+            metrics["pending"] = self._pending
+            metrics["llm_in_flight"] = self._llm_in_flight
+        processed = metrics["completed"] + metrics["failed"]
+        metrics["avg_wait_seconds"] = metrics["total_wait_seconds"] / processed if processed else 0.0
+        metrics.update(self.runtime.metrics())
+        return metrics
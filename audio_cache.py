@@ -0,0 +1,226 @@
+import glob
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+INDEX_NAME = "index.json"
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+# Cache hits only reorder the LRU; they are written to the index at most this often
+INDEX_SAVE_SECONDS = 30
+AUDIO_EXTENSIONS = ("*.mp3", "*.m4a", "*.opus", "*.ogg", "*.flac", "*.wav")
+_NOT_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_query(query):
+    # "Bohemian Rhapsody - Queen" and "bohemian  rhapsody queen" share a key
+    text = unicodedata.normalize("NFKC", str(query)).casefold()
+    return " ".join(_NOT_WORD.sub(" ", text).split())
+
+
+def spotdl_download(query, directory):
+    # Default downloader: one spotdl run into an empty directory
+    subprocess.run(["spotdl", "download", query, "--output", directory], check=True)
+    for pattern in AUDIO_EXTENSIONS:
+        files = glob.glob(os.path.join(directory, pattern))
+        if files:
+            return files[0]
+    raise FileNotFoundError(f"spotdl produced no audio file for {query!r}")
+
+
+def _file_digest(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        while data := f.read(1024 * 1024):
+            digest.update(data)
+    return digest.hexdigest()
+
+
+class AudioCache:
+    # Downloaded tracks stored by content hash, with normalized queries
+    # pointing at them. The index (query -> blob, blob -> size) lives in
+    # memory and in index.json; blobs are evicted least recently played
+    # first once the total passes max_bytes, except pinned ones (queued or
+    # playing). `download(query, directory)` must leave an audio file in
+    # directory and return its path.
+    def __init__(self, directory, max_bytes=DEFAULT_MAX_BYTES, download=spotdl_download, prefetch_workers=1):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.download = download
+        self._lock = threading.Lock()
+        self._queries = {}
+        self._blobs = OrderedDict()  # blob -> size, least recently used first
+        self._total = 0
+        self._pins = {}  # blob -> number of holders
+        self._inflight = {}
+        self._saved_at = 0
+        self._prefetcher = ThreadPoolExecutor(max_workers=prefetch_workers, thread_name_prefix="audio-prefetch")
+        self._load()
+
+    def _index_path(self):
+        return os.path.join(self.directory, INDEX_NAME)
+
+    def _blob_path(self, blob):
+        return os.path.join(self.directory, blob)
+
+    def _load(self):
+        try:
+            with open(self._index_path(), encoding="utf-8") as f:
+                index = json.load(f)
+        except FileNotFoundError:
+            index = {"queries": {}, "blobs": []}
+        except (OSError, ValueError) as e:
+            logging.warning(f"Audio cache index unreadable, starting empty: {e}")
+            index = {"queries": {}, "blobs": []}
+        # blobs are stored least recently used first; drop any whose file is gone
+        for blob, size in index.get("blobs", []):
+            if os.path.isfile(self._blob_path(blob)):
+                self._blobs[blob] = size
+                self._total += size
+        self._queries = {key: blob for key, blob in index.get("queries", {}).items() if blob in self._blobs}
+        # Leftovers of downloads interrupted by a crash
+        shutil.rmtree(os.path.join(self.directory, "downloads"), ignore_errors=True)
+        os.makedirs(os.path.join(self.directory, "downloads"), exist_ok=True)
+
+    def _save(self):
+        # Called with the lock held; replace so a crash never leaves half an index
+        temporary = self._index_path() + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            json.dump({"queries": self._queries, "blobs": list(self._blobs.items())}, f)
+        os.replace(temporary, self._index_path())
+        self._saved_at = time.monotonic()
+
+    def lookup(self, query, pin=False):
+        # Path of the cached track, or None; a hit counts as a use
+        key = normalize_query(query)
+        with self._lock:
+            blob = self._queries.get(key)
+            if blob is None:
+                return None
+            self._blobs.move_to_end(blob)
+            if pin:
+                self._pin(blob)
+            if time.monotonic() - self._saved_at > INDEX_SAVE_SECONDS:
+                self._save()
+            return self._blob_path(blob)
+
+    def get(self, query, pin=False):
+        # Cached path, downloading on a miss. Concurrent misses for the same
+        # query wait for a single download. With pin, the track is pinned
+        # before it can be evicted and the caller must unpin() it.
+        key = normalize_query(query)
+        path = self.lookup(query, pin)
+        if path is not None:
+            return path
+        with self._lock:
+            # A download may have finished since the lookup
+            if key in self._queries:
+                if pin:
+                    self._pin(self._queries[key])
+                return self._blob_path(self._queries[key])
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = Future()
+        if not owner:
+            path = future.result()
+            if pin:
+                with self._lock:
+                    self._pin(os.path.basename(path))
+            return path
+        try:
+            path = self._fetch(key, query, pin)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(path)
+            return path
+        finally:
+            with self._lock:
+                del self._inflight[key]
+
+    def prefetch(self, query):
+        # Background get(); returns its Future
+        return self._prefetcher.submit(self.get, query)
+
+    def _fetch(self, key, query, pin=False):
+        started = time.perf_counter()
+        workdir = tempfile.mkdtemp(dir=os.path.join(self.directory, "downloads"))
+        try:
+            downloaded = self.download(query, workdir)
+            blob = _file_digest(downloaded) + os.path.splitext(downloaded)[1].lower()
+            size = os.path.getsize(downloaded)
+            with self._lock:
+                if blob not in self._blobs:
+                    os.replace(downloaded, self._blob_path(blob))
+                    self._blobs[blob] = size
+                    self._total += size
+                self._blobs.move_to_end(blob)
+                self._queries[key] = blob
+                if pin:
+                    self._pin(blob)
+                self._evict(keep=blob)
+                self._save()
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+        logging.debug(f"Cached {query!r} as {blob} in {time.perf_counter() - started:.2f}s")
+        return self._blob_path(blob)
+
+    def unpin(self, path):
+        # Releases a pin taken by get(pin=True); the track may be evicted once
+        # nothing holds it
+        blob = os.path.basename(path)
+        with self._lock:
+            holders = self._pins.get(blob, 0) - 1
+            if holders > 0:
+                self._pins[blob] = holders
+                return
+            self._pins.pop(blob, None)
+            if self._total > self.max_bytes and self._evict(keep=None):
+                self._save()
+
+    def _pin(self, blob):
+        # Called with the lock held
+        self._pins[blob] = self._pins.get(blob, 0) + 1
+
+    def _evict(self, keep):
+        # Called with the lock held; returns how many blobs were removed. A
+        # blob that cannot be removed (playing on Windows) stays and is
+        # retried on the next eviction.
+        evicted = 0
+        for blob in list(self._blobs):
+            if self._total <= self.max_bytes:
+                break
+            if blob == keep or blob in self._pins:
+                continue
+            try:
+                os.remove(self._blob_path(blob))
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logging.debug(f"Could not evict {blob}: {e}")
+                continue
+            self._total -= self._blobs.pop(blob)
+            self._queries = {key: value for key, value in self._queries.items() if value != blob}
+            evicted += 1
+            logging.debug(f"Evicted {blob} from the audio cache")
+        return evicted
+
+    def stats(self):
+        with self._lock:
+            return {"tracks": len(self._blobs), "queries": len(self._queries), "bytes": self._total}
+
+    def close(self):
+        self._prefetcher.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            self._save()
@@ -0,0 +1,167 @@
+import logging
+import os
+import re
+import uuid
+from datetime import datetime
+
+from file_walker import compile_pattern, walk_files
+
+# How many per-item errors a summary spells out
+MAX_REPORTED_ERRORS = 10
+
+
+def summarize(done, errors, dry_run=False, preview=None):
+    # Compact per-batch result: counts plus the first few failures by name
+    summary = {"done": done, "failed": len(errors)}
+    if errors:
+        summary["errors"] = dict(list(errors.items())[:MAX_REPORTED_ERRORS])
+    if dry_run:
+        summary["dry_run"] = True
+        summary["preview"] = preview[:MAX_REPORTED_ERRORS]
+    return summary
+
+
+def _key(name):
+    return os.path.normcase(name)
+
+
+def _listing(directory, pattern):
+    # One scandir pass: matching regular files as (name, mtime)
+    regex = compile_pattern(pattern)
+    with os.scandir(directory) as entries:
+        return [
+            (entry.name, entry.stat().st_mtime)
+            for entry in entries
+            if regex.match(entry.name) and entry.is_file()
+        ]
+
+
+def _rename_to_free(directory, name, target):
+    # os.rename replaces an existing target on POSIX; never let a staged file
+    # land on a name that is taken again
+    destination = os.path.join(directory, target)
+    if os.path.lexists(destination):
+        raise FileExistsError(f"{target} already exists")
+    os.rename(os.path.join(directory, name), destination)
+
+
+def plan_renames(files, regex=None, replacement="", template=None, start=1, sort="name"):
+    # Maps each (name, mtime) to its new name. template fields: {name},
+    # {stem}, {ext}, {n} (counter from `start`) and {mtime} (a datetime, so
+    # "{mtime:%Y-%m-%d}" works). With regex, replacement follows re.sub.
+    order = sorted(files, key=(lambda f: f[1]) if sort == "mtime" else (lambda f: f[0].lower()))
+    compiled = re.compile(regex) if regex else None
+    plan = []
+    for n, (name, mtime) in enumerate(order, start):
+        stem, ext = os.path.splitext(name)
+        if template is not None:
+            new_name = template.format(name=name, stem=stem, ext=ext, n=n, mtime=datetime.fromtimestamp(mtime))
+        else:
+            new_name = compiled.sub(replacement, name)
+        if new_name != name:
+            plan.append((name, new_name))
+    return plan
+
+
+def rename_matching(directory, pattern="*", regex=None, replacement="", template=None, start=1, sort="name",
+                    dry_run=False):
+    # Renames every matching file in one directory after a single scan.
+    # Names that would collide with each other or with files that are not
+    # being renamed are reported as failures; chains and swaps (a->b, b->a)
+    # go through temporary names.
+    if template is None and not regex:
+        raise ValueError("batch rename needs a regex or a template")
+    files = _listing(directory, pattern)
+    existing = {_key(name) for name in os.listdir(directory)}
+    plan = plan_renames(files, regex, replacement, template, start, sort)
+    sources = {_key(old) for old, _ in plan}
+    errors = {}
+    accepted = []
+    claimed = set()
+    for old, new in plan:
+        if not new or os.sep in new or (os.altsep and os.altsep in new):
+            errors[old] = f"invalid new name {new!r}"
+        elif _key(new) in claimed:
+            errors[old] = f"{new} is the new name of another file"
+        elif _key(new) in existing and _key(new) not in sources and _key(new) != _key(old):
+            errors[old] = f"{new} already exists"
+        else:
+            claimed.add(_key(new))
+            accepted.append((old, new))
+    if dry_run:
+        return summarize(0, errors, True, [f"{old} -> {new}" for old, new in accepted])
+
+    done = 0
+    staged = []
+    two_phase = any(_key(new) in sources and _key(new) != _key(old) for old, new in accepted)
+    for old, new in accepted:
+        try:
+            if two_phase:
+                temporary = f".{uuid.uuid4().hex}.renaming"
+                os.rename(os.path.join(directory, old), os.path.join(directory, temporary))
+                staged.append((old, temporary, new))
+            else:
+                os.rename(os.path.join(directory, old), os.path.join(directory, new))
+                done += 1
+        except OSError as e:
+            errors[old] = str(e)
+    for old, temporary, new in staged:
+        try:
+            _rename_to_free(directory, temporary, new)
+            done += 1
+        except OSError as e:
+            # Put it back rather than leave a temporary name behind, unless
+            # another file has taken its old name by now
+            try:
+                _rename_to_free(directory, temporary, old)
+                errors[old] = str(e)
+            except OSError as restore_error:
+                errors[old] = f"{e}; could not restore it ({restore_error}), left as {temporary}"
+    logging.debug(f"Batch renamed {done} files in {directory}, {len(errors)} failed")
+    return summarize(done, errors)
+
+
+def delete_matching(directory, pattern, recursive=False, exclude=None, dry_run=False):
+    # Deletes matching files (never folders) found by one walk of directory
+    errors = {}
+    if recursive:
+        targets = [path for path in walk_files(directory, pattern, exclude=exclude) if os.path.isfile(path)]
+    else:
+        targets = [os.path.join(directory, name) for name, _ in _listing(directory, pattern)]
+    if dry_run:
+        return summarize(0, errors, True, targets)
+    done = 0
+    for path in targets:
+        try:
+            os.remove(path)
+            done += 1
+        except OSError as e:
+            errors[path] = str(e)
+    logging.debug(f"Deleted {done} files matching {pattern} under {directory}, {len(errors)} failed")
+    return summarize(done, errors)
+
+
+def write_files(files, directory=None, overwrite=True):
+    # Creates every path -> content entry of `files`, relative paths under
+    # `directory`; each parent folder is created once
+    errors = {}
+    targets = {}
+    for path, content in files.items():
+        target = os.path.join(directory, path) if directory else path
+        targets[target] = "" if content is None else str(content)
+    for parent in {os.path.dirname(target) for target in targets}:
+        if parent:
+            try:
+                os.makedirs(parent, exist_ok=True)
+            except OSError as e:
+                errors[parent] = str(e)
+    done = 0
+    for target, content in targets.items():
+        try:
+            with open(target, "w" if overwrite else "x") as f:
+                f.write(content)
+            done += 1
+        except OSError as e:
+            errors[target] = str(e)
+    logging.debug(f"Created {done} files, {len(errors)} failed")
+    return summarize(done, errors)
@@ -0,0 +1,102 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+# File names are unique so every created file can be counted
+FILES = itertools.count()
+
+
+class FakeAgents:
+    # Stands in for Mistral.agents: every prompt is answered with one
+    # create_file call after `latency` seconds
+    def __init__(self, latency):
+        self.latency = latency
+
+    def _response(self):
+        call = {"name": "create_file", "arguments": {"file_path": f"out/{next(FILES)}.txt", "content": "ok"}}
+        content = "```json\n" + json.dumps({"tool_calls": [call]}) + "\n```"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    async def complete_async(self, agent_id, messages):
+        await asyncio.sleep(self.latency)
+        return self._response()
+
+
+class ThreadCounter:
+    # Peak threading.active_count() while running
+    def __init__(self):
+        self.peak = threading.active_count()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._done.wait(0.005):
+            self.peak = max(self.peak, threading.active_count())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._done.set()
+        self._thread.join()
+
+
+def run_async(commands, latency, workdir):
+    from assistant import Assistant
+    assistant = Assistant(output=lambda text: None, max_pending=commands, max_in_flight=commands,
+                          cache_path=os.path.join(workdir, "cache.json"), streaming=False)
+    assistant.use_client(SimpleNamespace(agents=FakeAgents(latency)))
+    finished = threading.Semaphore(0)
+    with ThreadCounter() as threads:
+        started = time.perf_counter()
+        for n in range(commands):
+            assistant.submit(f"async note {n}", on_done=lambda success: finished.release())
+        for _ in range(commands):
+            finished.acquire()
+        seconds = time.perf_counter() - started
+    metrics = assistant.pipeline.metrics()
+    assert metrics["completed"] == commands, metrics
+    return seconds, threads.peak, metrics
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Commands in flight on one event loop: threads used and loop lag")
+    parser.add_argument("--commands", type=int, default=400)
+    parser.add_argument("--llm-ms", type=int, default=200, help="Simulated model latency per command")
+    args = parser.parse_args()
+    latency = args.llm_ms / 1000
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # tools keeps its databases in the data folder; files land in out/
+        os.environ["AI_PC_TOOLS_DATA"] = workdir
+        os.chdir(workdir)
+        os.makedirs("out")
+        import logging
+        import tools
+        logging.disable(logging.INFO)
+        baseline = threading.active_count()
+        print(f"{args.commands} commands, {args.llm_ms} ms per model call; "
+              f"{baseline} threads before starting (tool executor: {tools.TOOL_WORKERS} workers)")
+        seconds, peak, metrics = run_async(args.commands, latency, workdir)
+        print(f"  {seconds:6.2f} s ({args.commands / seconds:7.1f} commands/s), peak threads {peak:4d}, "
+              f"{metrics['max_llm_in_flight']} model calls in flight at once, loop lag p99 "
+              f"{metrics['loop_lag_p99_ms']:.1f} ms / max {metrics['loop_lag_max_ms']:.1f} ms")
+        created = len(os.listdir("out"))
+        assert created == args.commands, created
+        os.chdir(REPO)
+    os._exit(0)
+
+
+if __name__ == "__main__":
+    main()
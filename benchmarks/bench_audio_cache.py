@@ -0,0 +1,115 @@
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from audio_cache import AudioCache, normalize_query
+
+
+class StubDownloader:
+    # Stands in for spotdl: waits like a download would, then writes a fake
+    # mp3 whose content depends only on the normalized query
+    def __init__(self, seconds, size_kb):
+        self.seconds = seconds
+        self.size = size_kb * 1024
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, query, directory):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.seconds)
+        seed = normalize_query(query).encode()
+        path = os.path.join(directory, f"{query}.mp3".replace(os.sep, "_"))
+        with open(path, "wb") as f:
+            f.write(b"ID3" + (seed * (self.size // max(len(seed), 1) + 1))[:self.size - 3])
+        return path
+
+
+def playlist(tracks, plays):
+    # Zipf-like popularity, with the spelling of each query varied
+    names = [f"Song {i} - Artist {i % 50}" for i in range(tracks)]
+    weights = [1 / (rank + 1) for rank in range(tracks)]
+    spellings = [str, str.lower, str.upper, lambda name: name.replace(" - ", "  ")]
+    return [random.choice(spellings)(name) for name in random.choices(names, weights, k=plays)]
+
+
+def legacy_play(download, query):
+    # The old play_song: a fresh temporary directory per request, deleted afterwards
+    directory = tempfile.mkdtemp()
+    try:
+        download(query, directory)
+    finally:
+        shutil.rmtree(directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="play_song: download per request vs audio cache")
+    parser.add_argument("--tracks", type=int, default=200)
+    parser.add_argument("--plays", type=int, default=1000)
+    parser.add_argument("--download-ms", type=int, default=50, help="Simulated download time per track")
+    parser.add_argument("--size-kb", type=int, default=512)
+    parser.add_argument("--cache-mb", type=int, default=40)
+    args = parser.parse_args()
+    random.seed(1)
+    queries = playlist(args.tracks, args.plays)
+    seconds = args.download_ms / 1000
+
+    with tempfile.TemporaryDirectory() as tmp:
+        stub = StubDownloader(seconds, args.size_kb)
+        started = time.perf_counter()
+        for query in queries:
+            legacy_play(stub, query)
+        print(f"{args.plays} plays of {args.tracks} tracks ({args.download_ms} ms per download)")
+        print(f"  download every time: {time.perf_counter() - started:6.2f} s, {stub.calls} downloads")
+
+        stub = StubDownloader(seconds, args.size_kb)
+        cache = AudioCache(os.path.join(tmp, "cache"), max_bytes=args.cache_mb * 1024 * 1024, download=stub)
+        started = time.perf_counter()
+        for query in queries:
+            assert os.path.isfile(cache.get(query))
+        stats = cache.stats()
+        print(f"  audio cache:         {time.perf_counter() - started:6.2f} s, {stub.calls} downloads, "
+              f"{stats['tracks']} tracks kept in {stats['bytes'] / 1024 / 1024:.1f} MB (limit {args.cache_mb} MB)")
+        assert stats["bytes"] <= args.cache_mb * 1024 * 1024
+
+        started = time.perf_counter()
+        for _ in range(10000):
+            cache.lookup(queries[0])
+        print(f"  cache hit lookup:    {(time.perf_counter() - started) / 10000 * 1e6:6.1f} us")
+        cache.close()
+
+        started = time.perf_counter()
+        reopened = AudioCache(os.path.join(tmp, "cache"), max_bytes=args.cache_mb * 1024 * 1024, download=stub)
+        print(f"  reopen index:        {(time.perf_counter() - started) * 1000:6.1f} ms, "
+              f"{reopened.stats()['queries']} queries")
+
+        # Eight concurrent requests for one new track share a download
+        calls = stub.calls
+        threads = [threading.Thread(target=reopened.get, args=("Brand New Song",)) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        print(f"  8 concurrent requests for a new track: {stub.calls - calls} download")
+
+        # Prefetch the next track while the current one "plays"
+        calls = stub.calls
+        future = reopened.prefetch("Next Up - Someone")
+        time.sleep(seconds * 2)
+        started = time.perf_counter()
+        reopened.get("next up someone")
+        future.result()
+        print(f"  prefetched track ready in {(time.perf_counter() - started) * 1000:.2f} ms, "
+              f"{stub.calls - calls} download")
+        reopened.close()
+
+
+if __name__ == "__main__":
+    main()
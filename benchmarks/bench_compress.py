@@ -0,0 +1,75 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from archives import compress_paths
+
+WORDS = ["reminder", "timer", "assistant", "folder", "archive", "window", "volume", "music", "email", "search"]
+
+
+def build_inputs(root, files, file_mb, media_share):
+    # Compressible text files plus a share of random-byte .jpg files standing in for media
+    os.makedirs(root, exist_ok=True)
+    size = int(file_mb * 1024 * 1024)
+    for i in range(files):
+        if i < files * media_share:
+            with open(os.path.join(root, f"photo{i}.jpg"), "wb") as f:
+                f.write(os.urandom(size))
+            continue
+        line = " ".join(random.choice(WORDS) for _ in range(12)) + "\n"
+        block = "".join(line if random.random() < 0.5 else line.upper() for _ in range(2000)).encode()
+        with open(os.path.join(root, f"log{i}.txt"), "wb") as f:
+            written = 0
+            while written < size:
+                f.write(block)
+                written += len(block)
+
+
+def legacy(paths, output_path):
+    with zipfile.ZipFile(output_path, "w", zipfile.ZIP_DEFLATED) as zipf:
+        for path in paths:
+            zipf.write(path, os.path.basename(path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="compress_files throughput vs worker count")
+    parser.add_argument("--files", type=int, default=32)
+    parser.add_argument("--file-mb", type=float, default=8)
+    parser.add_argument("--media-share", type=float, default=0.25, help="Fraction of inputs that are .jpg")
+    parser.add_argument("--level", type=int, default=6)
+    parser.add_argument("--workers", type=int, nargs="*", help="Worker counts to try (default: 1, 2, 4 ... cores)")
+    args = parser.parse_args()
+    cores = os.cpu_count() or 1
+    counts = args.workers or sorted({1, cores} | {n for n in (2, 4, 8, 16) if n < cores})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "input")
+        build_inputs(source, args.files, args.file_mb, args.media_share)
+        paths = sorted(os.path.join(source, name) for name in os.listdir(source))
+        total_mb = sum(os.path.getsize(p) for p in paths) / 1024 / 1024
+        print(f"{len(paths)} files, {total_mb:.0f} MB, {cores} cores")
+
+        output = os.path.join(tmp, "legacy.zip")
+        started = time.perf_counter()
+        legacy(paths, output)
+        elapsed = time.perf_counter() - started
+        print(f"  legacy ZipFile.write:  {elapsed:6.2f} s  {total_mb / elapsed:7.1f} MB/s  "
+              f"{os.path.getsize(output) / 1024 / 1024:7.1f} MB out")
+
+        for workers in counts:
+            output = os.path.join(tmp, f"parallel{workers}.zip")
+            stats = compress_paths([source], output, level=args.level, workers=workers)
+            with zipfile.ZipFile(output) as zf:
+                assert zf.testzip() is None
+            print(f"  {workers:2d} workers:            {stats['seconds']:6.2f} s  "
+                  f"{total_mb / stats['seconds']:7.1f} MB/s  {stats['bytes_out'] / 1024 / 1024:7.1f} MB out")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import argparse
+import hashlib
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from duplicates import HashCache, find_duplicates
+
+
+def build_tree(root, files, size_kb, duplicate_share):
+    # Every file has the same size; most differ only in the middle so the
+    # head/tail sample cannot tell them apart, some are exact copies
+    size = size_kb * 1024
+    base = bytearray(os.urandom(size))
+    originals = []
+    for i in range(files):
+        directory = os.path.join(root, f"d{i % 20}")
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"file{i}.bin")
+        if originals and random.random() < duplicate_share:
+            data = random.choice(originals)
+        else:
+            data = bytearray(base)
+            data[size // 2: size // 2 + 8] = i.to_bytes(8, "little")
+            if i % 2:
+                data[:8] = i.to_bytes(8, "little")
+            data = bytes(data)
+            if len(originals) < 50:
+                originals.append(data)
+        with open(path, "wb") as f:
+            f.write(data)
+
+
+def naive(root):
+    # Full hash of every file, grouped by digest
+    groups = {}
+    for current, _, names in os.walk(root):
+        for name in names:
+            path = os.path.join(current, name)
+            with open(path, "rb") as f:
+                groups.setdefault(hashlib.blake2b(f.read()).digest(), []).append(path)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="find_duplicates vs hashing every file")
+    parser.add_argument("--files", type=int, default=5000)
+    parser.add_argument("--size-kb", type=int, default=512)
+    parser.add_argument("--duplicate-share", type=float, default=0.1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, "tree")
+        build_tree(root, args.files, args.size_kb, args.duplicate_share)
+        total_mb = args.files * args.size_kb / 1024
+        print(f"{args.files} files of {args.size_kb} KB ({total_mb:.0f} MB), all the same size")
+
+        started = time.perf_counter()
+        expected = naive(root)
+        print(f"  hash every file:        {time.perf_counter() - started:6.2f} s, {len(expected)} groups")
+
+        cache = HashCache(os.path.join(tmp, "hashes.db"))
+        for label in ("find_duplicates (cold)", "find_duplicates (cached)"):
+            groups, stats = find_duplicates(root, cache=cache)
+            assert sorted(map(sorted, expected)) == sorted(groups)
+            print(f"  {label:<24}{stats['seconds']:6.2f} s, {stats['groups']} groups, "
+                  f"{stats['sampled']} sampled, {stats['fully_hashed']} fully hashed, "
+                  f"{stats['cache_hits']} cache hits")
+
+        # Touch a few files and rescan
+        for i in range(10):
+            path = os.path.join(root, f"d{i % 20}", f"file{i}.bin")
+            os.utime(path, (time.time(), time.time() + 1))
+        groups, stats = find_duplicates(root, cache=cache)
+        print(f"  after touching 10 files {stats['seconds']:6.2f} s, {stats['sampled']} sampled, "
+              f"{stats['fully_hashed']} fully hashed")
+
+
+if __name__ == "__main__":
+    main()
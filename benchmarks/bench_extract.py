@@ -0,0 +1,71 @@
+import argparse
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+import time
+import zipfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from archives import extract_members
+from bench_compress import build_inputs
+
+
+def timed(label, extract, total_mb):
+    started = time.perf_counter()
+    extract()
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<34} {elapsed:6.2f} s  {total_mb / elapsed:7.1f} MB/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="extract_archive: legacy extractall vs selective/parallel extraction")
+    parser.add_argument("--files", type=int, default=400)
+    parser.add_argument("--file-mb", type=float, default=0.5)
+    parser.add_argument("--workers", type=int, nargs="*", default=[1, 4, 8])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, "input")
+        build_inputs(source, args.files, args.file_mb, media_share=0.1)
+        names = sorted(os.listdir(source))
+        total_mb = sum(os.path.getsize(os.path.join(source, n)) for n in names) / 1024 / 1024
+        zip_path = os.path.join(tmp, "input.zip")
+        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zf:
+            for name in names:
+                zf.write(os.path.join(source, name), f"input/{name}")
+        tar_path = os.path.join(tmp, "input.tar.gz")
+        with tarfile.open(tar_path, "w:gz") as tf:
+            tf.add(source, "input")
+        print(f"{len(names)} members, {total_mb:.0f} MB uncompressed")
+
+        counter = iter(range(1000))
+        target = lambda: os.path.join(tmp, f"out{next(counter)}")
+
+        def legacy_zip():
+            with zipfile.ZipFile(zip_path) as zf:
+                zf.extractall(target())
+
+        timed("zip extractall (legacy)", legacy_zip, total_mb)
+        for workers in args.workers:
+            timed(f"zip extract_members, {workers} workers",
+                  lambda: extract_members(zip_path, target(), workers=workers), total_mb)
+        started = time.perf_counter()
+        stats = extract_members(zip_path, target(), include=["log4?.txt"])
+        print(f"  zip selective ({stats['members']} members):     {time.perf_counter() - started:6.3f} s")
+
+        def legacy_tar():
+            with tarfile.open(tar_path) as tf:
+                tf.extractall(target())
+
+        timed("tar.gz extractall", legacy_tar, total_mb)
+        for workers in args.workers:
+            timed(f"tar.gz extract_members, {workers} workers",
+                  lambda: extract_members(tar_path, target(), workers=workers), total_mb)
+        shutil.rmtree(source)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_search import build_tree
+from file_index import FileIndex
+from file_walker import walk_files
+
+QUERIES = ["*.txt", "file42*", "*le7.dat", "*report*", "d3", "f*9.txt", "*.d*"]
+
+
+def query_latencies(index, root, repeat):
+    timings = {}
+    for pattern in QUERIES:
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            found = index.search(root, pattern, max_results=1000)
+            samples.append((time.perf_counter() - started) * 1000)
+        timings[pattern] = (statistics.median(samples), len(found))
+    return timings
+
+
+def fill_rows(index, root, rows, per_dir=100):
+    # Synthetic entries inserted straight into the index, for query latency at
+    # a scale that would take too long to create as real files
+    words = ["report", "invoice", "photo", "notes", "draft", "backup", "song", "scan"]
+    extensions = [".txt", ".dat", ".pdf", ".jpg", ".mp3"]
+    conn = index._writer
+    conn.execute("BEGIN")
+    batch = []
+    for i in range(rows):
+        directory = os.path.join(root, f"s{i // (per_dir * 100)}", f"t{(i // per_dir) % 100}")
+        name = f"{random.choice(words)}_{i}{random.choice(extensions)}"
+        batch.append((os.path.join(directory, name), directory, name, 0, 0.0, 0))
+        if len(batch) == 50000:
+            conn.executemany("INSERT INTO entries (path, parent, name, size, mtime, is_dir) VALUES (?, ?, ?, ?, ?, ?)", batch)
+            batch = []
+    conn.executemany("INSERT INTO entries (path, parent, name, size, mtime, is_dir) VALUES (?, ?, ?, ?, ?, ?)", batch)
+    conn.execute("COMMIT")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Filename index: build, refresh and query latency vs live walk")
+    parser.add_argument("--files", type=int, default=100000, help="Real files in the synthetic tree")
+    parser.add_argument("--rows", type=int, default=1000000,
+                        help="Extra synthetic index rows for the scale test; use 3000000 for the full-size run")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = os.path.join(tmp, "tree")
+        build_tree(root, args.files)
+        index = FileIndex(os.path.join(tmp, "index.db"), [root])
+
+        started = time.perf_counter()
+        index.refresh()
+        print(f"initial index of {index.count()} entries: {time.perf_counter() - started:.2f} s")
+
+        started = time.perf_counter()
+        index.refresh()
+        print(f"refresh with nothing changed:        {(time.perf_counter() - started) * 1000:8.1f} ms")
+
+        # Touch a few directories and refresh again
+        for d in range(5):
+            open(os.path.join(root, f"d{d}", "added.txt"), "w").close()
+        started = time.perf_counter()
+        index.refresh()
+        print(f"refresh after 5 directories changed: {(time.perf_counter() - started) * 1000:8.1f} ms")
+
+        started = time.perf_counter()
+        walked = list(walk_files(root, "*.txt", max_results=1000))
+        print(f"live walk_files '*.txt' (1000 results): {(time.perf_counter() - started) * 1000:8.1f} ms")
+        for pattern, (median, found) in query_latencies(index, root, args.repeat).items():
+            print(f"  index '{pattern}': {median:7.2f} ms median, {found} results")
+
+        if args.rows:
+            started = time.perf_counter()
+            fill_rows(index, root, args.rows)
+            print(f"added {args.rows} synthetic rows in {time.perf_counter() - started:.1f} s "
+                  f"({index.count()} entries)")
+            for pattern, (median, found) in query_latencies(index, root, args.repeat).items():
+                print(f"  index '{pattern}': {median:7.2f} ms median, {found} results")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+import argparse
+import bisect
+import email
+import imaplib
+import os
+import re
+import socketserver
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mail_sync import HeaderCache, MailSync
+
+BODY = ("Hello,\r\n\r\n" + "This is the body of a synthetic message used to size full fetches.\r\n" * 40).encode()
+SENDERS = ["alice@example.com", "bob@example.com", "billing@shop.example", "news@paper.example", "boss@work.example"]
+
+
+class Mailbox:
+    def __init__(self, count):
+        self.uidvalidity = 1000
+        self.uids = []
+        self.next_uid = 1
+        self.lock = threading.Lock()
+        self.append(count)
+
+    def append(self, count):
+        with self.lock:
+            for _ in range(count):
+                self.uids.append(self.next_uid)
+                # Leave gaps now and then, like a real mailbox after deletions
+                self.next_uid += 2 if self.next_uid % 97 == 0 else 1
+
+    def headers(self, uid):
+        day = 1 + uid % 28
+        return (f"From: {SENDERS[uid % len(SENDERS)]}\r\n"
+                f"Subject: Message number {uid}\r\n"
+                f"Date: Mon, {day:02d} Sep 2024 {uid % 24:02d}:{uid % 60:02d}:00 +0000\r\n"
+                f"Message-ID: <{uid}@stand-in>\r\n\r\n").encode()
+
+
+class ImapHandler(socketserver.StreamRequestHandler):
+    # Just enough IMAP4rev1 for imaplib: LOGIN, SELECT/EXAMINE, SEARCH,
+    # FETCH and their UID variants, LOGOUT
+    disable_nagle_algorithm = True
+
+    def send(self, data):
+        self.wfile.write(data)
+        self.server.bytes_sent += len(data)
+
+    def line(self, text):
+        self.send(text.encode() + b"\r\n")
+
+    def expand(self, sequence_set, values):
+        # values is sorted; returns the members named by an IMAP sequence set
+        highest = values[-1] if values else 0
+        found = []
+        for part in sequence_set.split(","):
+            low, _, high = part.partition(":")
+            low = highest if low == "*" else int(low)
+            high = low if not high else (highest if high == "*" else int(high))
+            low, high = min(low, high), max(low, high)
+            found.extend(values[bisect.bisect_left(values, low):bisect.bisect_right(values, high)])
+        return sorted(set(found))
+
+    def fetch(self, positions, items, by_uid):
+        box = self.server.mailbox
+        header_fields = re.search(r"BODY\.PEEK\[HEADER\.FIELDS \(([^)]*)\)\]", items)
+        for seq in positions:
+            uid = box.uids[seq - 1]
+            if header_fields:
+                data = box.headers(uid)
+                label = f"BODY[HEADER.FIELDS ({header_fields.group(1)})]"
+            else:
+                data = box.headers(uid) + BODY
+                label = "RFC822"
+            prefix = f"UID {uid} " if by_uid else ""
+            self.send(f"* {seq} FETCH ({prefix}{label} {{{len(data)}}}\r\n".encode() + data + b")\r\n")
+
+    def handle(self):
+        box = self.server.mailbox
+        self.line("* OK IMAP4rev1 stand-in ready")
+        while True:
+            raw = self.rfile.readline()
+            if not raw:
+                return
+            self.server.commands += 1
+            tag, _, rest = raw.decode().rstrip("\r\n").partition(" ")
+            command, _, args = rest.partition(" ")
+            command = command.upper()
+            with box.lock:
+                uids = list(box.uids)
+            if command == "CAPABILITY":
+                self.line("* CAPABILITY IMAP4rev1")
+            elif command in ("SELECT", "EXAMINE"):
+                self.line(f"* {len(uids)} EXISTS")
+                self.line(f"* OK [UIDVALIDITY {box.uidvalidity}] UIDs valid")
+                self.line(f"* OK [UIDNEXT {box.next_uid}] Predicted next UID")
+            elif command == "SEARCH":
+                self.line("* SEARCH " + " ".join(str(i + 1) for i in range(len(uids))))
+            elif command == "FETCH":
+                sequence_set, _, items = args.partition(" ")
+                self.fetch(self.expand(sequence_set, range(1, len(uids) + 1)), items, False)
+            elif command == "UID":
+                sub, _, sub_args = args.partition(" ")
+                if sub.upper() == "SEARCH":
+                    criteria = sub_args.split()
+                    found = uids if criteria[-1] == "ALL" else self.expand(criteria[-1], uids)
+                    self.line("* SEARCH " + " ".join(map(str, found)))
+                else:
+                    sequence_set, _, items = sub_args.partition(" ")
+                    positions = {uid: i + 1 for i, uid in enumerate(uids)}
+                    self.fetch([positions[uid] for uid in self.expand(sequence_set, uids)], items, True)
+            elif command == "LOGOUT":
+                self.line("* BYE stand-in closing")
+                self.line(f"{tag} OK LOGOUT completed")
+                return
+            self.line(f"{tag} OK {command} completed")
+
+
+class ImapStandIn(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, mailbox):
+        super().__init__(("127.0.0.1", 0), ImapHandler)
+        self.mailbox = mailbox
+        self.bytes_sent = 0
+        self.commands = 0
+
+    def counters(self):
+        return self.commands, self.bytes_sent
+
+
+def legacy_read(port, limit):
+    # The old read_emails: SEARCH ALL, then one RFC822 FETCH per message
+    mail = imaplib.IMAP4("127.0.0.1", port)
+    mail.login("user", "password")
+    mail.select("inbox")
+    typ, data = mail.search(None, "ALL")
+    for num in data[0].split()[:limit]:
+        typ, data = mail.fetch(num, "(RFC822)")
+        email.message_from_bytes(data[0][1])
+    mail.logout()
+
+
+def measure(server, label, action):
+    commands, sent = server.counters()
+    started = time.perf_counter()
+    result = action()
+    elapsed = time.perf_counter() - started
+    commands_after, sent_after = server.counters()
+    print(f"  {label:<34} {elapsed:7.2f} s  {commands_after - commands:6d} round trips  "
+          f"{(sent_after - sent) / 1024 / 1024:8.2f} MB")
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="read_emails: legacy full fetch vs incremental header sync")
+    parser.add_argument("--messages", type=int, default=50000)
+    parser.add_argument("--legacy-messages", type=int, default=5000,
+                        help="Messages fetched by the legacy loop; its cost is linear so the rest is extrapolated")
+    args = parser.parse_args()
+
+    mailbox = Mailbox(args.messages)
+    server = ImapStandIn(mailbox)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    port = server.server_address[1]
+    print(f"IMAP stand-in on port {port} with {args.messages} messages")
+
+    limit = min(args.legacy_messages, args.messages)
+    commands, sent = server.counters()
+    started = time.perf_counter()
+    legacy_read(port, limit)
+    elapsed = time.perf_counter() - started
+    commands_after, sent_after = server.counters()
+    scale = args.messages / limit
+    print(f"  {'legacy, every call (extrapolated)':<34} {elapsed * scale:7.2f} s  "
+          f"{int((commands_after - commands) * scale):6d} round trips  "
+          f"{(sent_after - sent) * scale / 1024 / 1024:8.2f} MB")
+
+    def connect():
+        conn = imaplib.IMAP4("127.0.0.1", port)
+        conn.login("user", "password")
+        return conn
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = HeaderCache(os.path.join(tmp, "mail.db"))
+        sync = MailSync(connect, cache)
+        added = measure(server, "first sync (all headers)", sync.sync)
+        assert added == args.messages == cache.count("INBOX")
+        measure(server, "sync, nothing new", sync.sync)
+        mailbox.append(25)
+        added = measure(server, "sync, 25 new messages", sync.sync)
+        assert added == 25
+
+        with mailbox.lock:
+            del mailbox.uids[100:110]
+        measure(server, "sync after 10 deletions", sync.sync)
+        assert cache.count("INBOX") == len(mailbox.uids)
+
+        for label, query in (("latest 10", {}), ("latest 10 from boss", {"sender": "boss"}),
+                             ("subject search", {"subject": "number 4242"})):
+            started = time.perf_counter()
+            rows = sync.latest(10, **query)
+            print(f"  cache query {label:<22} {(time.perf_counter() - started) * 1000:7.2f} ms  {len(rows)} rows")
+
+        mailbox.uidvalidity += 1
+        measure(server, "sync after UIDVALIDITY change", sync.sync)
+        assert cache.count("INBOX") == len(mailbox.uids)
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import argparse
+import os
+import queue
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from output_renderer import OutputRenderer
+
+
+class FakeTextbox:
+    # Mimics the parts of CTkTextbox the renderer uses; each call pays a fixed
+    # cost standing in for a Tk redraw
+    def __init__(self, call_cost):
+        self.call_cost = call_cost
+        self.lines = [""]
+
+    def _pay(self):
+        deadline = time.perf_counter() + self.call_cost
+        while time.perf_counter() < deadline:
+            pass
+
+    def insert(self, index, text):
+        self._pay()
+        parts = text.split("\n")
+        self.lines[-1] += parts[0]
+        self.lines.extend(parts[1:])
+
+    def delete(self, start, end):
+        self._pay()
+        last = int(end.split(".")[0])
+        del self.lines[: last - 1]
+
+    def see(self, index):
+        self._pay()
+
+
+class FakeLoop:
+    # Runs after() callbacks in due order, like Tk's event loop
+    def __init__(self):
+        self.pending = []
+
+    def after(self, ms, callback):
+        self.pending.append((time.perf_counter() + ms / 1000, callback))
+
+    def run_until(self, condition):
+        while not condition():
+            self.pending.sort(key=lambda item: item[0])
+            due, callback = self.pending.pop(0)
+            time.sleep(max(0, due - time.perf_counter()))
+            callback()
+
+
+def legacy_seconds(messages, call_cost):
+    # update_output: insert + see, then sleep 100 ms, per message
+    return messages * (2 * call_cost + 0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Output render throughput, per-message vs batched")
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--call-cost-ms", type=float, default=0.5, help="Simulated cost of one textbox call")
+    parser.add_argument("--flush-interval-ms", type=int, default=50)
+    parser.add_argument("--max-lines", type=int, default=5000)
+    parser.add_argument("--session-messages", type=int, default=100000, help="Messages for the retention check")
+    args = parser.parse_args()
+    call_cost = args.call_cost_ms / 1000
+
+    results = queue.Queue()
+    for i in range(args.messages):
+        results.put(f"Tool set_timer executed successfully in 3 ms (queued 0 ms) #{i}\n")
+    textbox = FakeTextbox(call_cost)
+    loop = FakeLoop()
+    renderer = OutputRenderer(textbox, results, loop.after, flush_interval_ms=args.flush_interval_ms,
+                              max_lines=args.max_lines)
+    started = time.perf_counter()
+    renderer.start()
+    loop.run_until(lambda: renderer.stats["messages"] == args.messages)
+    elapsed = time.perf_counter() - started
+    print(f"{args.messages} messages")
+    print(f"  legacy per-message loop: {legacy_seconds(args.messages, call_cost):8.2f} s (modelled)")
+    print(f"  batched renderer:        {elapsed:8.2f} s in {renderer.stats['flushes']} flushes "
+          f"({args.messages / elapsed:.0f} messages/s)")
+
+    # Long session: retained lines stay flat
+    textbox = FakeTextbox(0)
+    renderer = OutputRenderer(textbox, results, loop.after, max_lines=args.max_lines)
+    for i in range(args.session_messages):
+        results.put(f"message {i}\n")
+        if i % 1000 == 999:
+            renderer.flush()
+    renderer.flush()
+    print(f"after {args.session_messages} messages the textbox holds {len(textbox.lines) - 1} lines "
+          f"({renderer.stats['trimmed_lines']} trimmed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from planner import build_plan, execute_plan
+from tool_executor import ToolExecutor
+
+PLANS = {
+    "folder then move": [
+        {"name": "create_folder", "arguments": {"folder_path": "C:\\reports"}},
+        {"name": "move_file", "arguments": {"source": "C:\\a.txt", "destination": "C:\\reports\\a.txt"}},
+        {"name": "move_file", "arguments": {"source": "C:\\b.txt", "destination": "C:\\reports\\b.txt"}},
+        {"name": "compress_files", "arguments": {"files": ["C:\\reports\\a.txt", "C:\\reports\\b.txt"],
+                                                 "output_path": "C:\\reports.zip"}},
+    ],
+    "five independent copies": [
+        {"name": "copy_file", "arguments": {"source": f"C:\\src\\{i}.txt", "destination": f"D:\\dst\\{i}.txt"}}
+        for i in range(5)
+    ],
+    "explicit depends_on": [
+        {"id": "shot", "name": "take_screenshot", "arguments": {"output_path": "C:\\shot.png"}},
+        {"name": "set_timer", "arguments": {"duration": "5m"}},
+        {"name": "send_email", "arguments": {"recipient": "a@b.c", "subject": "s", "body": "b"},
+         "depends_on": ["shot"]},
+    ],
+    "shutdown last": [
+        {"name": "create_file", "arguments": {"file_path": "C:\\notes.txt"}},
+        {"name": "set_timer", "arguments": {"duration": "1m"}},
+        {"name": "system_control", "arguments": {"action": "shutdown"}},
+    ],
+}
+
+
+def fake_tool(arguments):
+    time.sleep(fake_tool.seconds)
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dependency-aware plan execution vs serial execution")
+    parser.add_argument("--seconds", type=float, default=0.05, help="Simulated duration of each tool")
+    args = parser.parse_args()
+    fake_tool.seconds = args.seconds
+
+    executor = ToolExecutor(max_workers=8)
+
+    def submit(call):
+        return executor.submit(call["name"], fake_tool, call.get("arguments", {}))
+
+    for name, calls in PLANS.items():
+        results, report = execute_plan(calls, submit)
+        serial = len(calls) * args.seconds
+        print(f"{name}")
+        print(f"  dependencies:  {build_plan(calls)}")
+        print(f"  wall {report['wall_seconds'] * 1000:.0f} ms vs serial {serial * 1000:.0f} ms; "
+              f"critical path {' -> '.join(report['critical_path'])} ({report['critical_path_seconds'] * 1000:.0f} ms)")
+    executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
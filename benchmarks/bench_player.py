@@ -0,0 +1,96 @@
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from player import FakeBackend, PlayerService
+
+
+def gaps(timeline):
+    # Silence between each track's end and the next track's start, in ms
+    result = []
+    last_end = None
+    for event, _, at in timeline:
+        if event == "end":
+            last_end = at
+        elif last_end is not None:
+            result.append((at - last_end) * 1000)
+            last_end = None
+    return result
+
+
+def legacy(tracks, duration, load, instance_cost, poll):
+    # The old play_song: new player per song, parsed on demand, polled every `poll` seconds
+    timeline = []
+    for track in tracks:
+        time.sleep(instance_cost)
+        backend = FakeBackend(default_duration=duration, load_seconds=load)
+        backend.timeline = timeline
+        backend.play(backend.prepare(track))
+        while not any(event == "end" and path == track for event, path, _ in timeline):
+            time.sleep(poll)
+    return timeline
+
+
+def service(tracks, duration, load):
+    backend = FakeBackend(default_duration=duration, load_seconds=load)
+    player = PlayerService(backend)
+    done = threading.Event()
+    original = backend._on_end
+
+    def on_end(handle):
+        original(handle)
+        if handle[0] == tracks[-1]:
+            done.set()
+    backend.set_end_callback(on_end)
+    for track in tracks:
+        player.enqueue(track, track)
+    done.wait()
+    player.close()
+    return backend.timeline
+
+
+def check_queue():
+    # Skips, stale end events and stop, with very short tracks
+    backend = FakeBackend(default_duration=0.05)
+    player = PlayerService(backend)
+    for name in "abcd":
+        player.enqueue(name, name)
+    assert player.status() == {"playing": "a", "queue": ["b", "c", "d"]}
+    assert player.skip() == "b"
+    time.sleep(0.2)
+    player.stop()
+    started = [path for event, path, _ in backend.timeline if event == "start"]
+    assert started == ["a", "b", "c", "d"], started
+    assert player.status() == {"playing": None, "queue": []}
+    player.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="play_song: player per song with polling vs playlist service")
+    parser.add_argument("--tracks", type=int, default=5)
+    parser.add_argument("--duration", type=float, default=1.5, help="Seconds per fake track")
+    parser.add_argument("--load-ms", type=int, default=150, help="Simulated media load and parse time")
+    parser.add_argument("--instance-ms", type=int, default=100, help="Simulated vlc.Instance() creation time")
+    parser.add_argument("--poll", type=float, default=1.0)
+    args = parser.parse_args()
+    tracks = [f"track{i}.mp3" for i in range(args.tracks)]
+
+    check_queue()
+    print("queue, skip and stop behave (fake backend)")
+    for label, timeline in (
+        ("player per song, 1 s polling", legacy(tracks, args.duration, args.load_ms / 1000,
+                                                args.instance_ms / 1000, args.poll)),
+        ("player service, preloaded", service(tracks, args.duration, args.load_ms / 1000)),
+    ):
+        between = gaps(timeline)
+        print(f"  {label:<30} gap between tracks: mean {statistics.mean(between):7.1f} ms, "
+              f"max {max(between):7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from helpers import convert_to_xlam_tool
+from prompt_builder import PromptBuilder
+from tools_definition import tools
+
+
+def legacy_prompt(user_command):
+    # The prompt as App.generate_tool_calls used to build it on every request
+    task_instruction = """
+        You are an expert in composing functions for a Windows Automation Assistant. Your task is to generate JSON-formatted tool calls based on user commands. The output MUST strictly adhere to the following JSON format, and NO other text MUST be included. If no function call is needed, please make tool_calls an empty list '[]'. and remember that programs are stored at C:\\Program Files
+        """.strip()
+
+    format_instruction = """
+        The output MUST strictly adhere to the following JSON format, and NO other text MUST be included.
+        The example format is as follows. Please make sure the parameter type is correct. If no function call is needed, please make tool_calls an empty list '[]'.
+        ```json
+        {
+            "tool_calls": [
+            {"name": "func_name1", "arguments": {"argument1": "value1", "argument2": "value2"}},
+            ... (more tool calls as required)
+            ]
+        }
+        ```
+        """.strip()
+
+    xlam_format_tools = convert_to_xlam_tool(tools)
+
+    return f"""
+        [BEGIN OF TASK INSTRUCTION]
+        {task_instruction}
+        [END OF TASK INSTRUCTION]
+
+        [BEGIN OF AVAILABLE TOOLS]
+        {json.dumps(xlam_format_tools)}
+        [END OF AVAILABLE TOOLS]
+
+        [BEGIN OF FORMAT INSTRUCTION]
+        {format_instruction}
+        [END OF FORMAT INSTRUCTION]
+
+        [BEGIN OF QUERY]
+        {user_command}
+        [END OF QUERY]
+        """
+
+
+def estimate_tokens(text):
+    # No tokenizer is bundled; ~4 bytes per token is close for English and JSON
+    return len(text.encode("utf-8")) // 4
+
+
+def time_builds(build, iterations):
+    started = time.perf_counter()
+    for i in range(iterations):
+        build(f"set a {i} minute timer")
+    return (time.perf_counter() - started) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prompt build time and size, legacy vs cached prefix")
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    query = "set a 5 minute timer"
+    builder = PromptBuilder(tools)
+    legacy = legacy_prompt(query)
+    cached = builder.build(query)
+
+    legacy_seconds = time_builds(legacy_prompt, args.iterations)
+    cached_seconds = time_builds(builder.build, args.iterations)
+
+    print(f"{'':<16}{'build time':>14}{'bytes':>10}{'~tokens':>10}")
+    print(f"{'legacy':<16}{legacy_seconds * 1e6:>11.2f} us{len(legacy.encode()):>10}{estimate_tokens(legacy):>10}")
+    print(f"{'cached prefix':<16}{cached_seconds * 1e6:>11.2f} us{len(cached.encode()):>10}{estimate_tokens(cached):>10}")
+    prefixes_match = builder.build("a").startswith(builder.prefix) and builder.build("b").startswith(builder.prefix)
+    print(f"prefix bytes shared across queries: {len(builder.prefix.encode())} (stable: {prefixes_match})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reminder_store import ReminderStore, ReminderService
+from scheduler import TimerScheduler
+
+
+def populate(path, count):
+    # Reminders spread over the next year, a handful of them recurring
+    store = ReminderStore(path)
+    now = time.time()
+    rows = []
+    for i in range(count):
+        frequency = "daily" if i % 50 == 0 else None
+        rows.append((now + random.uniform(0, 365 * 86400), "Reminder", f"Reminder {i}", "SystemAsterisk",
+                     "09:00" if frequency else None, frequency))
+    store.add_many(rows)
+    store.close()
+
+
+def cold_start(path, window):
+    started = time.perf_counter()
+    store = ReminderStore(path)
+    scheduler = TimerScheduler()
+    service = ReminderService(store, scheduler, lambda title, message, sound: None, window=window)
+    service.start()
+    elapsed = time.perf_counter() - started
+    pending = scheduler.pending()
+    store.close()
+    return elapsed, pending
+
+
+def full_rehydrate(path):
+    started = time.perf_counter()
+    store = ReminderStore(path)
+    scheduler = TimerScheduler()
+    for row in store.due_between(None, float("inf")):
+        scheduler.call_at(row["fire_at"], lambda: None)
+    elapsed = time.perf_counter() - started
+    pending = scheduler.pending()
+    store.close()
+    return elapsed, pending
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup time of the persistent reminder store")
+    parser.add_argument("--reminders", type=int, default=100000)
+    parser.add_argument("--window", type=float, default=3600, help="Due-soon window in seconds")
+    parser.add_argument("--budget-ms", type=float, default=250, help="Fail if lazy startup exceeds this")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "reminders.db")
+        started = time.perf_counter()
+        populate(path, args.reminders)
+        print(f"populated {args.reminders} reminders in {time.perf_counter() - started:.2f} s")
+
+        lazy_seconds, lazy_pending = cold_start(path, args.window)
+        full_seconds, full_pending = full_rehydrate(path)
+        print(f"lazy window load:  {lazy_seconds * 1000:.1f} ms ({lazy_pending} timers scheduled)")
+        print(f"full rehydration:  {full_seconds * 1000:.1f} ms ({full_pending} timers scheduled)")
+
+    if lazy_seconds * 1000 > args.budget_ms:
+        print(f"FAIL: startup exceeded budget of {args.budget_ms:.0f} ms")
+        sys.exit(1)
+    print(f"OK: startup within budget of {args.budget_ms:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
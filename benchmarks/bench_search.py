@@ -0,0 +1,79 @@
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from file_walker import DEFAULT_WORKERS, walk_files
+
+
+def build_tree(root, files, per_dir=100, fanout=10):
+    # Directories nested `fanout` wide, `per_dir` empty files in each, plus a
+    # node_modules folder that searches should skip
+    created = 0
+    level = [root]
+    while created < files:
+        next_level = []
+        for directory in level:
+            for d in range(fanout):
+                sub = os.path.join(directory, f"d{d}")
+                os.makedirs(sub, exist_ok=True)
+                next_level.append(sub)
+                for f in range(per_dir):
+                    if created >= files:
+                        break
+                    extension = ".txt" if f % 10 == 0 else ".dat"
+                    open(os.path.join(sub, f"file{f}{extension}"), "w").close()
+                    created += 1
+                if created >= files:
+                    break
+            if created >= files:
+                break
+        level = next_level
+    modules = os.path.join(root, "node_modules", "pkg")
+    os.makedirs(modules, exist_ok=True)
+    for f in range(per_dir):
+        open(os.path.join(modules, f"module{f}.txt"), "w").close()
+
+
+def timed(label, search):
+    started = time.perf_counter()
+    first = None
+    count = 0
+    for _ in search():
+        if first is None:
+            first = time.perf_counter() - started
+        count += 1
+    total = time.perf_counter() - started
+    print(f"{label:<34} {count:>8} matches  first {first * 1000 if first is not None else 0:8.1f} ms  "
+          f"total {total * 1000:9.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="glob.glob vs parallel scandir walker")
+    parser.add_argument("--files", type=int, default=100000, help="Use 1000000 for the full-size tree")
+    parser.add_argument("--root", help="Existing directory to search instead of a synthetic tree")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = args.root
+        if root is None:
+            root = tmp
+            started = time.perf_counter()
+            build_tree(root, args.files)
+            print(f"built synthetic tree of {args.files} files in {time.perf_counter() - started:.1f} s")
+
+        timed("glob.glob (legacy)", lambda: glob.glob(os.path.join(root, "**", "*.txt"), recursive=True))
+        timed(f"walk_files ({args.workers} workers)",
+              lambda: walk_files(root, "*.txt", exclude=[], workers=args.workers))
+        timed("walk_files, default excludes", lambda: walk_files(root, "*.txt", workers=args.workers))
+        timed("walk_files, max_results=100", lambda: walk_files(root, "*.txt", max_results=100, workers=args.workers))
+        timed("walk_files, max_depth=1", lambda: walk_files(root, "*.txt", max_depth=1, workers=args.workers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+import argparse
+import asyncio
+import http.client
+import itertools
+import json
+import os
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from types import SimpleNamespace
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO)
+
+
+class FakeAgents:
+    # Stands in for Mistral.agents: answers every prompt with one create_file
+    # call after `latency` seconds, streamed in a few chunks
+    def __init__(self, latency):
+        self.latency = latency
+        self.files = itertools.count()
+
+    def _response(self):
+        call = {"name": "create_file", "arguments": {"file_path": f"out/{next(self.files)}.txt", "content": "ok"}}
+        return "```json\n" + json.dumps({"tool_calls": [call]}) + "\n```"
+
+    def complete(self, agent_id, messages):
+        time.sleep(self.latency)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=self._response()))])
+
+    def stream(self, agent_id, messages):
+        response = self._response()
+        for i in range(0, len(response), 32):
+            time.sleep(self.latency / (len(response) / 32))
+            delta = SimpleNamespace(content=response[i:i + 32])
+            yield SimpleNamespace(data=SimpleNamespace(choices=[SimpleNamespace(delta=delta)]))
+
+    async def stream_async(self, agent_id, messages):
+        response = self._response()
+
+        async def events():
+            for i in range(0, len(response), 32):
+                await asyncio.sleep(self.latency / (len(response) / 32))
+                delta = SimpleNamespace(content=response[i:i + 32])
+                yield SimpleNamespace(data=SimpleNamespace(choices=[SimpleNamespace(delta=delta)]))
+        return events()
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path):
+        super().__init__("localhost")
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.path)
+
+
+def request(connection, method, path, body=None):
+    headers = {"Content-Type": "application/json"} if body is not None else {}
+    connection.request(method, path, body=json.dumps(body) if body is not None else None, headers=headers)
+    response = connection.getresponse()
+    return response.status, response
+
+
+def client(connect, label, index, commands, latencies, rejected):
+    # Submits its commands one after another and streams each one's results
+    connection = connect()
+    for n in range(commands):
+        started = time.perf_counter()
+        status, response = request(connection, "POST", "/commands",
+                                   {"command": f"{label} client {index} note {n}", "key": f"client-{index}"})
+        body = json.loads(response.read())
+        if status == 429:
+            rejected.append(1)
+            time.sleep(0.05)
+            continue
+        status, response = request(connection, "GET", f"/commands/{body['id']}/stream")
+        lines = [json.loads(line) for line in response.read().decode().splitlines()]
+        assert lines[-1]["status"] == "done", lines
+        latencies.append(time.perf_counter() - started)
+    connection.close()
+
+
+def serve(app, **listen):
+    import uvicorn
+    server = uvicorn.Server(uvicorn.Config(app, log_level="warning", **listen))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server, thread
+
+
+def run(connect, label, clients, commands):
+    latencies = []
+    rejected = []
+    started = time.perf_counter()
+    threads = [threading.Thread(target=client, args=(connect, label, i, commands, latencies, rejected))
+               for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, latencies, len(rejected)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent clients against the headless server (fake LLM)")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--commands", type=int, default=10, help="Commands per client")
+    parser.add_argument("--llm-ms", type=int, default=200, help="Simulated model latency per command")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # tools keeps its databases in the data folder and the fake model's
+        # files land under out/; every command is distinct, so none is
+        # answered from the response cache
+        os.environ["AI_PC_TOOLS_DATA"] = workdir
+        os.chdir(workdir)
+        os.makedirs("out")
+        import logging
+        from assistant import Assistant
+        from server import create_app
+        logging.disable(logging.INFO)
+
+        assistant = Assistant(output=lambda text: None, cache_path=os.path.join(workdir, "cache.json"))
+        assistant.use_client(SimpleNamespace(agents=FakeAgents(args.llm_ms / 1000)))
+        app = create_app(assistant)
+        socket_path = os.path.join(workdir, "assistant.sock")
+        total = args.clients * args.commands
+        print(f"{args.clients} clients x {args.commands} commands, {args.llm_ms} ms per model call, "
+              f"{assistant.pipeline.max_in_flight} model requests at a time")
+        for label, listen, connect in (
+            ("tcp 127.0.0.1", {"host": "127.0.0.1", "port": args.port},
+             lambda: http.client.HTTPConnection("127.0.0.1", args.port)),
+            ("unix socket", {"uds": socket_path}, lambda: UnixHTTPConnection(socket_path)),
+        ):
+            server, thread = serve(app, **listen)
+            seconds, latencies, rejected = run(connect, label, args.clients, args.commands)
+            server.should_exit = True
+            thread.join()
+            latencies.sort()
+            print(f"  {label:<14} {len(latencies)}/{total} done in {seconds:6.2f} s "
+                  f"({len(latencies) / seconds:6.1f} commands/s), latency p50 "
+                  f"{statistics.median(latencies) * 1000:6.0f} ms, p95 "
+                  f"{latencies[int(len(latencies) * 0.95) - 1] * 1000:6.0f} ms, {rejected} rejected (429)")
+        metrics = assistant.pipeline.metrics()
+        print(f"  pipeline: max pending {metrics['max_pending']}, "
+              f"max model calls in flight {metrics['max_llm_in_flight']}, loop lag max {metrics['loop_lag_max_ms']} ms")
+        created = len(os.listdir(os.path.join(workdir, "out")))
+        assert created == metrics["completed"], (created, metrics)
+        os.chdir(REPO)
+    os._exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+import argparse
+import email
+import hashlib
+import multiprocessing
+import os
+import smtplib
+import socketserver
+import sys
+import tempfile
+import time
+import tracemalloc
+from email import encoders
+from email.mime.base import MIMEBase
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from smtp_pool import OutgoingMessage, SendQueue, SmtpPool
+
+# The first sink hangs up on sessions idle this long, like a real server would
+SINK_IDLE_SECONDS = 2
+
+
+class SinkHandler(socketserver.StreamRequestHandler):
+    # Accepts everything: EHLO, AUTH PLAIN, MAIL, RCPT, DATA, RSET, NOOP, QUIT
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        self.timeout = self.server.idle_timeout
+        super().setup()
+
+    def reply(self, text):
+        self.wfile.write(text.encode() + b"\r\n")
+
+    def handle(self):
+        self.reply("220 sink ready")
+        try:
+            while line := self.rfile.readline():
+                verb = line[:4].upper()
+                if verb in (b"EHLO", b"HELO"):
+                    self.reply("250-sink\r\n250-AUTH PLAIN\r\n250 8BITMIME")
+                elif verb == b"AUTH":
+                    self.reply("235 authenticated")
+                elif verb == b"DATA":
+                    self.reply("354 go ahead")
+                    self.receive()
+                    self.reply("250 queued")
+                elif verb == b"QUIT":
+                    self.reply("221 bye")
+                    return
+                else:
+                    self.reply("250 ok")
+        except (TimeoutError, OSError):
+            return
+
+    def receive(self):
+        save = self.server.save_dir
+        out = open(os.path.join(save, f"{time.monotonic_ns()}.eml"), "wb") if save else None
+        while (line := self.rfile.readline()) != b".\r\n":
+            if out:
+                out.write(line[1:] if line.startswith(b"..") else line)
+        if out:
+            out.close()
+
+
+def serve(port_pipe, save_dir, idle_timeout):
+    server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), SinkHandler)
+    server.daemon_threads = True
+    server.save_dir = save_dir
+    server.idle_timeout = idle_timeout
+    port_pipe.send(server.server_address[1])
+    server.serve_forever()
+
+
+def start_sink(save_dir=None, idle_timeout=None):
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=serve, args=(child, save_dir, idle_timeout), daemon=True)
+    process.start()
+    return process, parent.recv()
+
+
+def legacy_send(port, recipient, subject, body, attachment_path=None):
+    # The old send_email: build the whole message in memory, new session per message
+    msg = MIMEMultipart()
+    msg['From'] = 'bench@example.com'
+    msg['To'] = recipient
+    msg['Subject'] = subject
+    msg.attach(MIMEText(body, 'plain'))
+    if attachment_path:
+        attachment = open(attachment_path, "rb")
+        part = MIMEBase('application', 'octet-stream')
+        part.set_payload(attachment.read())
+        encoders.encode_base64(part)
+        part.add_header('Content-Disposition', f"attachment; filename= {os.path.basename(attachment_path)}")
+        msg.attach(part)
+    server = smtplib.SMTP('127.0.0.1', port)
+    server.login('bench@example.com', 'password')
+    text = msg.as_string()
+    server.sendmail('bench@example.com', recipient, text)
+    server.quit()
+
+
+def pooled(port):
+    def connect():
+        conn = smtplib.SMTP("127.0.0.1", port)
+        conn.login("bench@example.com", "password")
+        return conn
+    return SendQueue(SmtpPool(connect))
+
+
+def timed(action):
+    tracemalloc.start()
+    started = time.perf_counter()
+    action()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="send_email: session per message vs pooled, streaming sender")
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--attachment-mb", type=int, default=100)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sink, port = start_sink(idle_timeout=SINK_IDLE_SECONDS)
+        body = "Hello,\n\nThis is a benchmark message.\n.\nThe line above starts with a dot.\n"
+
+        elapsed, _ = timed(lambda: [legacy_send(port, "to@example.com", f"Message {i}", body)
+                                    for i in range(args.messages)])
+        print(f"{args.messages} small messages")
+        print(f"  new session per message: {args.messages / elapsed:8.0f} msg/s")
+
+        sender = pooled(port)
+
+        def burst():
+            futures = [sender.submit(OutgoingMessage("bench@example.com", "to@example.com", f"Message {i}", body))
+                       for i in range(args.messages)]
+            for future in futures:
+                future.result()
+        elapsed, _ = timed(burst)
+        print(f"  pooled send queue:       {args.messages / elapsed:8.0f} msg/s")
+
+        time.sleep(SINK_IDLE_SECONDS + 0.5)
+        started = time.perf_counter()
+        sender.submit(OutgoingMessage("bench@example.com", "to@example.com", "After idle", body)).result()
+        print(f"  send after the server dropped the idle session: {time.perf_counter() - started:.3f} s (reconnected)")
+        sender.close()
+        sink.terminate()
+
+        path = os.path.join(tmp, "attachment.bin")
+        with open(path, "wb") as f:
+            for _ in range(args.attachment_mb):
+                f.write(os.urandom(1024 * 1024))
+        print(f"One {args.attachment_mb} MB attachment (peak traced Python memory in the sender)")
+
+        sink, port = start_sink()
+        elapsed, peak = timed(lambda: legacy_send(port, "to@example.com", "Attachment", body, path))
+        print(f"  in-memory MIME:   {elapsed:6.2f} s  {peak / 1024 / 1024:8.1f} MB")
+        sink.terminate()
+
+        received = os.path.join(tmp, "received")
+        os.makedirs(received)
+        sink, port = start_sink(received)
+        sender = pooled(port)
+        message = OutgoingMessage("bench@example.com", "to@example.com", "Attachment", body, [path])
+        elapsed, peak = timed(lambda: sender.submit(message).result())
+        print(f"  streamed:         {elapsed:6.2f} s  {peak / 1024 / 1024:8.1f} MB")
+        sender.close()
+        sink.terminate()
+
+        # The sink saved what it received; check the attachment survived intact
+        with open(os.path.join(received, os.listdir(received)[0]), "rb") as f:
+            parsed = email.message_from_binary_file(f)
+        parts = parsed.get_payload()
+        with open(path, "rb") as f:
+            expected = hashlib.sha256(f.read()).hexdigest()
+        assert parts[0].get_payload(decode=True).decode() == body
+        assert hashlib.sha256(parts[1].get_payload(decode=True)).hexdigest() == expected
+        print("  streamed message parsed back and the attachment matches")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Must not be imported just by starting the app; each loads on first use
+HEAVY_MODULES = (
+    "mistralai", "speech_recognition", "vlc", "pyautogui", "selenium", "googleapiclient",
+    "pycaw", "gtts", "plyer", "win32api",
+)
+
+FIRST_FRAME = """
+import sys, time, importlib
+started = float(sys.argv[1])
+sys.path.insert(0, sys.argv[2])
+for name in sys.argv[3:]:
+    importlib.import_module(name)
+from gui import App
+app = App()
+app.update()
+print(time.time() - started)
+app.destroy()
+import os
+os._exit(0)
+"""
+
+
+def run(code, *args, importtime=False, cwd=None):
+    command = [sys.executable] + (["-X", "importtime"] if importtime else []) + ["-c", code] + list(args)
+    return subprocess.run(command, capture_output=True, text=True, cwd=cwd)
+
+
+def import_profile(module, cwd):
+    # (total ms, [(cumulative ms, module imported directly by it)]) from python -X importtime
+    result = run(f"import sys; sys.path.insert(0, {REPO!r}); import {module}; import os; os._exit(0)",
+                 importtime=True, cwd=cwd)
+    if result.returncode != 0:
+        return None, result.stderr.strip().splitlines()[-1]
+    top = []
+    total = 0
+    for line in result.stderr.splitlines():
+        fields = line[len("import time:"):].split("|")
+        if not line.startswith("import time:") or len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        cumulative = int(fields[1]) / 1000
+        # One leading space at the top level, two more per level of nesting
+        depth = len(fields[2]) - len(fields[2].lstrip())
+        if depth == 1 and fields[2].strip() == module:
+            total = cumulative
+        elif depth == 3:
+            top.append((cumulative, fields[2].strip()))
+    return total, sorted(top, reverse=True)
+
+
+def heavy_loaded(module, cwd):
+    code = (f"import sys; sys.path.insert(0, {REPO!r}); import {module}; "
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules)); import os; os._exit(0)")
+    result = run(code, cwd=cwd)
+    if result.returncode != 0:
+        return None
+    return [name for name in result.stdout.strip().split(",") if name]
+
+
+def first_frame(cwd, eager):
+    result = run(FIRST_FRAME, str(time.time()), REPO, *eager, cwd=cwd)
+    if result.returncode != 0:
+        return None, result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed"
+    return float(result.stdout.strip().splitlines()[-1]) * 1000, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Startup cost: import time of the tool layer and time to first frame")
+    parser.add_argument("--max-ms", type=float, default=None,
+                        help="Exit with an error if importing tools (or the first frame) takes longer")
+    parser.add_argument("--top", type=int, default=8)
+    args = parser.parse_args()
+    failures = []
+
+    with tempfile.TemporaryDirectory() as cwd:
+        # The imports open tools' stores; keep them out of the real data folder
+        os.environ["AI_PC_TOOLS_DATA"] = cwd
+        for module in ("tools", "gui"):
+            total, top = import_profile(module, cwd)
+            if total is None:
+                print(f"import {module}: unavailable here ({top})")
+                continue
+            print(f"import {module}: {total:.0f} ms cumulative; slowest direct imports:")
+            for ms, name in top[:args.top]:
+                print(f"  {ms:8.1f} ms  {name}")
+            loaded = heavy_loaded(module, cwd)
+            if loaded:
+                failures.append(f"import {module} loaded {', '.join(loaded)} eagerly")
+            else:
+                print(f"  none of {', '.join(HEAVY_MODULES)} loaded")
+            if args.max_ms is not None and module == "tools" and total > args.max_ms:
+                failures.append(f"import tools took {total:.0f} ms, budget {args.max_ms:.0f} ms")
+
+        # The old startup imported the Mistral client and audio stacks before the window
+        eager = [name for name in ("mistralai", "speech_recognition", "vlc") if run(f"import {name}").returncode == 0]
+        for label, preload in (("lazy (current)", []), ("eager mistralai/speech_recognition/vlc", eager)):
+            if preload is eager and not eager:
+                print(f"first frame, {label}: none of those modules are installed here")
+                continue
+            ms, error = first_frame(cwd, preload)
+            if ms is None:
+                print(f"first frame, {label}: unavailable here ({error})")
+                continue
+            print(f"first frame, {label}: {ms:.0f} ms after launch")
+            if args.max_ms is not None and not preload and ms > args.max_ms:
+                failures.append(f"first frame took {ms:.0f} ms, budget {args.max_ms:.0f} ms")
+
+    for failure in failures:
+        print(f"REGRESSION: {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
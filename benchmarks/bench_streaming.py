@@ -0,0 +1,91 @@
+import argparse
+import json
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from helpers import extract_json
+from streaming import stream_tool_calls
+
+RESPONSE = "```json\n" + json.dumps({
+    "tool_calls": [
+        {"name": "create_folder", "arguments": {"folder_path": "C:\\reports\\2024"}},
+        {"name": "create_file", "arguments": {"file_path": "C:\\reports\\2024\\notes.txt",
+                                               "content": "brackets } ] { [ and \"quotes\" survive"}},
+        {"name": "move_file", "arguments": {"source": "C:\\a.txt", "destination": "C:\\reports\\2024"}},
+        {"name": "set_timer", "arguments": {"duration": "5m", "message": "check the reports"}},
+    ]
+}, indent=4) + "\n```"
+
+
+class FakeAgents:
+    # Stands in for Mistral.agents, emitting the response a few characters at a time
+    def __init__(self, response, chunk_size, token_delay):
+        self.response = response
+        self.chunk_size = chunk_size
+        self.token_delay = token_delay
+
+    def _chunks(self):
+        for i in range(0, len(self.response), self.chunk_size):
+            time.sleep(self.token_delay)
+            yield self.response[i:i + self.chunk_size]
+
+    def complete(self, agent_id, messages):
+        content = "".join(self._chunks())
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    def stream(self, agent_id, messages):
+        for chunk in self._chunks():
+            delta = SimpleNamespace(content=chunk)
+            yield SimpleNamespace(data=SimpleNamespace(choices=[SimpleNamespace(delta=delta)]))
+
+
+def run_blocking(client):
+    started = time.perf_counter()
+    response = client.agents.complete(agent_id="fake", messages=[])
+    calls = extract_json(response.choices[0].message.content)["tool_calls"]
+    first_action = time.perf_counter() - started
+    return calls, first_action, time.perf_counter() - started
+
+
+def run_streaming(client):
+    started = time.perf_counter()
+    calls = []
+    first_action = []
+
+    def on_tool_call(call):
+        if not first_action:
+            first_action.append(time.perf_counter() - started)
+        calls.append(call)
+
+    stream_tool_calls(client, "fake", "prompt", on_tool_call)
+    return calls, first_action[0], time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time to first tool call, blocking vs streaming")
+    parser.add_argument("--chunk-size", type=int, default=4, help="Characters per streamed token")
+    parser.add_argument("--token-delay", type=float, default=0.005, help="Seconds between tokens")
+    args = parser.parse_args()
+
+    client = SimpleNamespace(agents=FakeAgents(RESPONSE, args.chunk_size, args.token_delay))
+    blocking_calls, blocking_first, blocking_total = run_blocking(client)
+    streaming_calls, streaming_first, streaming_total = run_streaming(client)
+
+    # Every chunking of the response must parse to the same calls as extract_json
+    expected = extract_json(RESPONSE)["tool_calls"]
+    assert blocking_calls == expected and streaming_calls == expected
+    for chunk_size in (1, 2, 3, 7, 64):
+        chunked = SimpleNamespace(agents=FakeAgents(RESPONSE, chunk_size, 0))
+        assert run_streaming(chunked)[0] == expected, f"chunk size {chunk_size} parsed differently"
+
+    print(f"{len(expected)} tool calls, {len(RESPONSE)} response characters")
+    print(f"blocking:  first action {blocking_first * 1000:7.1f} ms, total {blocking_total * 1000:7.1f} ms")
+    print(f"streaming: first action {streaming_first * 1000:7.1f} ms, total {streaming_total * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
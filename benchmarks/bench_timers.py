@@ -0,0 +1,114 @@
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import TimerScheduler
+
+
+def rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def report(name, lateness, threads, rss_before, rss_after, setup_seconds):
+    lateness_ms = sorted(x * 1000 for x in lateness)
+    p99 = lateness_ms[int(len(lateness_ms) * 0.99) - 1]
+    print(f"{name}")
+    print(f"  timers fired:     {len(lateness_ms)}")
+    print(f"  setup time:       {setup_seconds * 1000:.1f} ms")
+    print(f"  peak threads:     {threads}")
+    print(f"  RSS delta:        {rss_after - rss_before:.1f} MB")
+    print(f"  jitter p50/p99/max: {statistics.median(lateness_ms):.2f} / {p99:.2f} / {lateness_ms[-1]:.2f} ms")
+
+
+def spread_delays(count, window):
+    # Deadlines spread evenly over the window, starting one second out
+    return [1.0 + window * i / count for i in range(count)]
+
+
+def bench_thread_per_timer(count, window):
+    lateness = []
+    lock = threading.Lock()
+    done = threading.Event()
+
+    def timer_thread(deadline):
+        time.sleep(max(0, deadline - time.monotonic()))
+        late = time.monotonic() - deadline
+        with lock:
+            lateness.append(late)
+            if len(lateness) == count:
+                done.set()
+
+    rss_before = rss_mb()
+    started = time.monotonic()
+    for delay in spread_delays(count, window):
+        thread = threading.Thread(target=timer_thread, args=(started + delay,))
+        thread.daemon = True
+        thread.start()
+    setup_seconds = time.monotonic() - started
+    threads = threading.active_count()
+    rss_after = rss_mb()
+    done.wait()
+    report("thread per timer (ThreadManager)", lateness, threads, rss_before, rss_after, setup_seconds)
+
+
+def bench_scheduler(count, window):
+    lateness = []
+    done = threading.Event()
+    scheduler = TimerScheduler()
+    scheduler.start()
+
+    def fire(deadline):
+        lateness.append(time.monotonic() - deadline)
+        if len(lateness) == count:
+            done.set()
+
+    rss_before = rss_mb()
+    started = time.monotonic()
+    for delay in spread_delays(count, window):
+        deadline = started + delay
+        scheduler.call_at(deadline, fire, deadline)
+    setup_seconds = time.monotonic() - started
+    threads = threading.active_count()
+    rss_after = rss_mb()
+    done.wait()
+    scheduler.stop()
+    report("single scheduler thread (TimerScheduler)", lateness, threads, rss_before, rss_after, setup_seconds)
+
+
+def bench_cancel(count):
+    scheduler = TimerScheduler()
+    handles = [scheduler.call_later(3600 + i, lambda: None) for i in range(count)]
+    started = time.perf_counter()
+    for handle in handles[::2]:
+        scheduler.cancel(handle)
+    elapsed = time.perf_counter() - started
+    print(f"cancel {count // 2} of {count} pending timers: {elapsed / (count // 2) * 1e6:.2f} us per cancel")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare thread-per-timer against the shared timer scheduler")
+    parser.add_argument("--timers", type=int, default=2000, help="Timers for the thread-per-timer run")
+    parser.add_argument("--scheduler-timers", type=int, default=50000, help="Timers for the scheduler run")
+    parser.add_argument("--window", type=float, default=5.0, help="Seconds over which deadlines are spread")
+    args = parser.parse_args()
+
+    bench_scheduler(args.scheduler_timers, args.window)
+    bench_thread_per_timer(args.timers, args.window)
+    bench_cancel(args.scheduler_timers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from scheduler import TimerScheduler
+from tool_executor import ToolExecutor
+
+
+def sample_tool(arguments):
+    time.sleep(arguments["seconds"])
+    if arguments.get("fail"):
+        raise OSError("disk full")
+    return arguments["index"]
+
+
+def bench_thread_per_call(calls, seconds):
+    # What execute_tool_calls used to do: one fresh thread per call, no result
+    peak = threading.active_count()
+    started = time.perf_counter()
+    threads = []
+    for i in range(calls):
+        thread = threading.Thread(target=sample_tool, args=({"seconds": seconds, "index": i},), daemon=True)
+        thread.start()
+        threads.append(thread)
+        peak = max(peak, threading.active_count())
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    print(f"thread per call: {calls} calls in {elapsed * 1000:.0f} ms, peak threads {peak}, results: none")
+
+
+def bench_executor(calls, seconds, workers):
+    scheduler = TimerScheduler()
+    scheduler.start()
+    executor = ToolExecutor(max_workers=workers, scheduler=scheduler)
+    peak = threading.active_count()
+    started = time.perf_counter()
+    futures = [
+        executor.submit("sample_tool", sample_tool, {"seconds": seconds, "index": i, "fail": i % 100 == 0})
+        for i in range(calls)
+    ]
+    results = []
+    for future in futures:
+        results.append(future.result())
+        peak = max(peak, threading.active_count())
+    elapsed = time.perf_counter() - started
+    failures = sum(not r["success"] for r in results)
+    correct = all(r["result"] == i for i, r in enumerate(results) if r["success"])
+    waits = sorted(r["queue_wait"] for r in results)
+    print(f"executor ({workers} workers): {calls} calls in {elapsed * 1000:.0f} ms, peak threads {peak}, "
+          f"{failures} failures reported, results correct: {correct}, "
+          f"queue wait p50 {waits[len(waits) // 2] * 1000:.0f} ms / max {waits[-1] * 1000:.0f} ms")
+
+    timed_out = executor.submit("slow_tool", sample_tool, {"seconds": 1.0, "index": 0}, timeout=0.1).result()
+    print(f"timeout: success={timed_out['success']} error={timed_out['error']!r} "
+          f"after {timed_out['duration'] * 1000:.0f} ms")
+    executor.shutdown()
+    scheduler.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Burst of tool calls: thread per call vs bounded executor")
+    parser.add_argument("--calls", type=int, default=1000)
+    parser.add_argument("--seconds", type=float, default=0.005, help="Simulated work per call")
+    parser.add_argument("--workers", type=int, default=8)
+    args = parser.parse_args()
+
+    bench_thread_per_call(args.calls, args.seconds)
+    bench_executor(args.calls, args.seconds, args.workers)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from prompt_builder import PromptBuilder
+from tool_selector import ToolSelector
+from tools_definition import tools
+
+QUERIES = [
+    "set a 5 minute timer",
+    "wake me up at 07:30 with an alarm",
+    "remind me to call mom in 2h",
+    "mute volume",
+    "take a screenshot to C:\\shots\\a.png",
+    "zip report.docx and data.csv into backup.zip",
+    "move notes.txt into the archive folder",
+    "find all pdf files in my documents",
+    "email bob@example.com the quarterly numbers",
+    "shut down the computer in 10 minutes",
+    "open notepad",
+    "what's the weather like",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tool subset selection latency and prompt size reduction")
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    selector = ToolSelector(tools, top_k=args.top_k)
+    print(f"index build: {(time.perf_counter() - started) * 1000:.2f} ms over {len(tools)} tools\n")
+
+    builder = PromptBuilder(tools, selector=selector)
+    for query in QUERIES:
+        selected = selector.select(query)
+        prompt = builder.build(query)
+        names = "ALL (fallback)" if selected is tools else ", ".join(tool["name"] for tool in selected)
+        print(f"{query!r:<48} {len(prompt):>6} bytes  {names}")
+
+    for i in range(args.iterations):
+        builder.build(QUERIES[i % len(QUERIES)])
+
+    print()
+    for key, value in builder.metrics().items():
+        print(f"{key:<24}{value:.4f}" if isinstance(value, float) else f"{key:<24}{value}")
+
+
+if __name__ == "__main__":
+    main()
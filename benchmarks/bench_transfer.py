@@ -0,0 +1,78 @@
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transfer import PER_DEVICE_WORKERS, transfer
+
+
+def make_files(root, count, size):
+    os.makedirs(root, exist_ok=True)
+    block = os.urandom(min(size, 1024 * 1024))
+    for i in range(count):
+        with open(os.path.join(root, f"file{i}.bin"), "wb") as f:
+            written = 0
+            while written < size:
+                f.write(block[: size - written])
+                written += len(block[: size - written])
+
+
+def legacy(source, destination):
+    # One shutil.copy2 per file, as one copy_file tool call per file did
+    os.makedirs(destination, exist_ok=True)
+    for name in os.listdir(source):
+        shutil.copy2(os.path.join(source, name), os.path.join(destination, name))
+
+
+def run(label, tmp, source, total_mb, per_device):
+    print(label)
+    started = time.perf_counter()
+    legacy(source, os.path.join(tmp, "legacy"))
+    elapsed = time.perf_counter() - started
+    print(f"  shutil.copy2 per file: {elapsed:6.2f} s  {total_mb / elapsed:8.1f} MB/s")
+    started = time.perf_counter()
+    stats = transfer([(source, os.path.join(tmp, "engine"))], per_device=per_device)
+    elapsed = time.perf_counter() - started
+    print(f"  transfer engine:       {elapsed:6.2f} s  {total_mb / elapsed:8.1f} MB/s  ({stats['files']} files)")
+    shutil.rmtree(os.path.join(tmp, "legacy"))
+    shutil.rmtree(os.path.join(tmp, "engine"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk copy: shutil.copy2 per file vs the transfer engine")
+    parser.add_argument("--small-files", type=int, default=5000)
+    parser.add_argument("--small-kb", type=int, default=4)
+    parser.add_argument("--huge-files", type=int, default=4)
+    parser.add_argument("--huge-mb", type=int, default=256)
+    parser.add_argument("--per-device", type=int, default=PER_DEVICE_WORKERS, help="Concurrent copies per device pair")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        small = os.path.join(tmp, "small")
+        make_files(small, args.small_files, args.small_kb * 1024)
+        run(f"{args.small_files} files of {args.small_kb} KB", tmp, small, args.small_files * args.small_kb / 1024,
+            args.per_device)
+        shutil.rmtree(small)
+
+        huge = os.path.join(tmp, "huge")
+        make_files(huge, args.huge_files, args.huge_mb * 1024 * 1024)
+        run(f"{args.huge_files} files of {args.huge_mb} MB", tmp, huge, args.huge_files * args.huge_mb, args.per_device)
+
+        # Interrupted copy: half of one file already sits in a .part file
+        target = os.path.join(tmp, "resume")
+        os.makedirs(target)
+        with open(os.path.join(huge, "file0.bin"), "rb") as source, \
+                open(os.path.join(target, "file0.bin.part"), "wb") as part:
+            part.write(source.read(args.huge_mb * 1024 * 1024 // 2))
+        started = time.perf_counter()
+        stats = transfer([(os.path.join(huge, "file0.bin"), os.path.join(target, "file0.bin"))])
+        print(f"resumed copy: {stats['resumed_bytes'] / 1024 / 1024:.0f} MB reused, "
+              f"{time.perf_counter() - started:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
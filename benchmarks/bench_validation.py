@@ -0,0 +1,105 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tool_registry import ToolArgumentError, ToolRegistry
+from tools_definition import tools
+
+CASES = {
+    "valid create_file": ("create_file", {"file_path": "notes/todo.txt", "content": "buy milk"}),
+    "coerce pomodoro cycles": ("set_pomodoro_timer", {"work_duration": "25m", "break_duration": "5m", "cycles": "5"}),
+    "coerce volume level/mute": ("volume_control", {"level": "40", "mute": "false"}),
+    "copy_file with 20 pairs": ("copy_file", {"pairs": [{"source": f"a{i}.txt", "destination": f"b{i}.txt"}
+                                                         for i in range(20)]}),
+    "invalid enum": ("system_control", {"action": "explode"}),
+    "missing required": ("compress_files", {"files": ["a.txt"]}),
+}
+
+
+def interpret(schema, value, where, errors):
+    # The same checks, reading the schema dict on every call
+    kind = schema.get("type")
+    if kind == "object":
+        if not isinstance(value, dict):
+            errors.append(where)
+            return value
+        for name in schema.get("required", []):
+            if value.get(name) is None:
+                errors.append(f"{where}.{name}")
+        result = dict(value)
+        for name, prop in schema.get("properties", {}).items():
+            if value.get(name) is not None:
+                result[name] = interpret(prop, value[name], f"{where}.{name}", errors)
+        value = result
+    elif kind == "array":
+        value = [interpret(schema.get("items", {}), item, where, errors) for item in value]
+    elif kind == "integer":
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            errors.append(where)
+    elif kind == "boolean" and isinstance(value, str):
+        value = value.lower() in ("true", "yes", "1")
+    elif kind == "string" and not isinstance(value, str):
+        value = str(value)
+    if "enum" in schema and value not in schema["enum"]:
+        errors.append(where)
+    return value
+
+
+def per_call(function, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cost of validating tool arguments per call")
+    parser.add_argument("--repeat", type=int, default=20000)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    registry = ToolRegistry()
+    schemas = {}
+    for definition in tools:
+        registry.register(definition["name"], lambda arguments: True, definition.get("parameters"))
+        schemas[definition["name"]] = dict(definition.get("parameters", {}), type="object")
+    print(f"compiled {len(tools)} validators in {(time.perf_counter() - started) * 1000:.2f} ms")
+
+    def compiled(name, arguments):
+        try:
+            registry.validate(name, arguments)
+        except ToolArgumentError:
+            pass
+
+    print(f"  {'case':<28}{'compiled':>12}{'interpreted':>14}")
+    for label, (name, arguments) in CASES.items():
+        fast = per_call(lambda: compiled(name, arguments), args.repeat)
+        slow = per_call(lambda: interpret(schemas[name], arguments, "", []), args.repeat)
+        print(f"  {label:<28}{fast:9.2f} us{slow:11.2f} us")
+
+    plan = [{"name": name, "arguments": arguments} for name, arguments in CASES.values()] * 2
+    cost = per_call(lambda: registry.validate_calls(plan), args.repeat // 10)
+    calls, errors = registry.validate_calls(plan)
+    print(f"  plan of {len(plan)} calls: {cost:.2f} us, {len(errors)} errors found, {len(calls)} calls accepted")
+
+    # Before: a bad call was only discovered when the tool failed on a worker thread
+    def fail(arguments):
+        raise ValueError("invalid arguments")
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        def dispatch_and_fail():
+            try:
+                pool.submit(fail, {}).result()
+            except ValueError:
+                pass
+        late = per_call(dispatch_and_fail, args.repeat // 10)
+    print(f"  failing on a worker thread instead: {late:.2f} us per bad call")
+
+
+if __name__ == "__main__":
+    main()
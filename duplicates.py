@@ -0,0 +1,201 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from file_walker import DEFAULT_EXCLUDES, compile_pattern, compile_pattern_set
+
+# Bytes hashed from each end of a file before deciding it needs a full hash
+SAMPLE_SIZE = 64 * 1024
+BUFFER_SIZE = 1024 * 1024
+# hashlib and file reads release the GIL, so threads hash in parallel
+HASH_WORKERS = min(8, (os.cpu_count() or 1) * 2)
+
+
+class HashCache:
+    # (path, size, mtime) -> sample and full hashes, so rescans only hash
+    # files that are new or changed
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            "path TEXT PRIMARY KEY, "
+            "size INTEGER NOT NULL, "
+            "mtime_ns INTEGER NOT NULL, "
+            "sample TEXT, "
+            "full TEXT)"
+        )
+
+    def lookup(self, files):
+        # {path: (sample, full)} for entries whose size and mtime still match
+        found = {}
+        with self._lock:
+            for path, size, mtime_ns in files:
+                row = self._conn.execute(
+                    "SELECT sample, full FROM hashes WHERE path = ? AND size = ? AND mtime_ns = ?",
+                    (path, size, mtime_ns),
+                ).fetchone()
+                if row is not None:
+                    found[path] = row
+        return found
+
+    def store(self, rows):
+        # rows of (path, size, mtime_ns, sample, full); None keeps a known value
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT INTO hashes (path, size, mtime_ns, sample, full) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (path) DO UPDATE SET "
+                "sample = coalesce(excluded.sample, CASE WHEN size = excluded.size AND mtime_ns = excluded.mtime_ns "
+                "THEN sample END), "
+                "full = coalesce(excluded.full, CASE WHEN size = excluded.size AND mtime_ns = excluded.mtime_ns "
+                "THEN full END), "
+                "size = excluded.size, mtime_ns = excluded.mtime_ns",
+                rows,
+            )
+            self._conn.execute("COMMIT")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def scan_files(directory, pattern="*", recursive=True, min_size=1, exclude=None):
+    # Regular files as (path, size, mtime_ns), one path per inode so hard links are not reported
+    regex = compile_pattern(pattern)
+    skip = compile_pattern_set(DEFAULT_EXCLUDES if exclude is None else exclude)
+    files = []
+    seen = set()
+    stack = [directory]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = list(os.scandir(current))
+        except OSError as e:
+            logging.debug(f"Skipping unreadable directory {current}: {e}")
+            continue
+        for entry in entries:
+            if skip is not None and skip.match(entry.name):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive:
+                        stack.append(entry.path)
+                    continue
+                if not entry.is_file(follow_symlinks=False) or not regex.match(entry.name):
+                    continue
+                info = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            if info.st_size < min_size:
+                continue
+            inode = (info.st_dev, info.st_ino)
+            if info.st_ino and inode in seen:
+                continue
+            seen.add(inode)
+            files.append((entry.path, info.st_size, info.st_mtime_ns))
+    return files
+
+
+def sample_hash(path, size):
+    # Head and tail; files no longer than both samples are hashed whole, so
+    # their sample hash is also their full hash
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        if size <= 2 * SAMPLE_SIZE:
+            digest.update(f.read())
+        else:
+            digest.update(f.read(SAMPLE_SIZE))
+            f.seek(-SAMPLE_SIZE, os.SEEK_END)
+            digest.update(f.read(SAMPLE_SIZE))
+    return digest.hexdigest()
+
+
+def full_hash(path):
+    digest = hashlib.blake2b(digest_size=32)
+    buffer = bytearray(BUFFER_SIZE)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        while read := f.readinto(view):
+            digest.update(view[:read])
+    return digest.hexdigest()
+
+
+def _collisions(files, key):
+    groups = {}
+    for item in files:
+        groups.setdefault(key(item), []).append(item)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def _hash_all(pool, function, files, known, index, stats, stat_name):
+    # {path: hash} for `files` (path, size, mtime_ns), taken from `known`
+    # where cached and computed by function(item) on the pool otherwise
+    hashes = {}
+    missing = []
+    for item in files:
+        cached = known.get(item[0])
+        if cached is not None and cached[index] is not None:
+            hashes[item[0]] = cached[index]
+        else:
+            missing.append(item)
+    for item, result in zip(missing, pool.map(lambda item: _safe(function, item), missing)):
+        if result is not None:
+            hashes[item[0]] = result
+    stats[stat_name] += len(missing)
+    stats["cache_hits"] += len(files) - len(missing)
+    return hashes
+
+
+def _safe(function, item):
+    try:
+        return function(item)
+    except OSError as e:
+        logging.debug(f"Could not hash {item[0]}: {e}")
+        return None
+
+
+def find_duplicates(directory, pattern="*", recursive=True, min_size=1, exclude=None, cache=None,
+                    workers=HASH_WORKERS):
+    # Groups identical files in three passes, each only over the survivors of
+    # the last: equal size, equal head/tail sample hash, equal full hash.
+    # Returns (groups, stats); groups are lists of paths, most wasted bytes first.
+    started = time.perf_counter()
+    directory = os.path.abspath(directory)
+    files = scan_files(directory, pattern, recursive, min_size, exclude)
+    stats = {"files": len(files), "sampled": 0, "fully_hashed": 0, "cache_hits": 0}
+    by_size = [item for group in _collisions(files, lambda item: item[1]) for item in group]
+    known = cache.lookup(by_size) if cache is not None else {}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        samples = _hash_all(pool, lambda item: sample_hash(item[0], item[1]), by_size, known, 0, stats, "sampled")
+        sampled = [item for item in by_size if item[0] in samples]
+        candidates = _collisions(sampled, lambda item: (item[1], samples[item[0]]))
+        # Small files were hashed whole by the sample pass
+        needs_full = [item for group in candidates for item in group if item[1] > 2 * SAMPLE_SIZE]
+        fulls = _hash_all(pool, lambda item: full_hash(item[0]), needs_full, known, 1, stats, "fully_hashed")
+
+    if cache is not None:
+        cache.store([(path, size, mtime_ns, samples.get(path), fulls.get(path))
+                     for path, size, mtime_ns in by_size if path in samples])
+
+    groups = []
+    for group in candidates:
+        if group[0][1] <= 2 * SAMPLE_SIZE:
+            groups.append(group)
+            continue
+        hashed = [item for item in group if item[0] in fulls]
+        groups.extend(_collisions(hashed, lambda item: fulls[item[0]]))
+    groups.sort(key=lambda group: group[0][1] * (len(group) - 1), reverse=True)
+    stats["groups"] = len(groups)
+    stats["duplicate_files"] = sum(len(group) - 1 for group in groups)
+    stats["wasted_bytes"] = sum(group[0][1] * (len(group) - 1) for group in groups)
+    stats["seconds"] = time.perf_counter() - started
+    logging.debug(f"Duplicate scan of {directory}: {stats}")
+    return [sorted(path for path, _, _ in group) for group in groups], stats
@@ -0,0 +1,324 @@
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from file_walker import DEFAULT_EXCLUDES, compile_pattern, compile_pattern_set
+
+# Paths compare case-insensitively on Windows, like the file system does
+PATH_COLLATION = " COLLATE NOCASE" if os.name == "nt" else ""
+
+# Shortest literal the trigram index can look up
+MIN_LITERAL = 3
+
+_WILDCARDS = re.compile(r"\[[^\]]*\]|[*?]")
+
+
+def name_part(pattern):
+    return re.split(r"[\\/]", pattern)[-1]
+
+
+def longest_literal(pattern):
+    # Longest run of plain characters in the name part of a glob pattern
+    return max(_WILDCARDS.split(name_part(pattern)), key=len, default="")
+
+
+def literal_prefix(pattern):
+    # Plain characters before the first wildcard in the name part
+    return _WILDCARDS.split(name_part(pattern))[0]
+
+
+def path_range(directory):
+    # Bounds that select every path below directory with a single index range scan
+    prefix = directory if directory.endswith(os.sep) else directory + os.sep
+    return prefix, prefix[:-1] + chr(ord(os.sep) + 1)
+
+
+class FileIndex:
+    # On-disk index of names, sizes and mtimes under a set of root folders.
+    # Names go through an FTS5 trigram table, so substring and glob queries
+    # read a handful of index pages instead of walking the tree. Refreshes
+    # only rescan directories whose mtime changed since the last pass.
+    def __init__(self, path, roots=(), exclude=None, max_age=600):
+        self.path = path
+        self.roots = [os.path.abspath(root) for root in roots]
+        self.exclude_names = DEFAULT_EXCLUDES if exclude is None else exclude
+        self.exclude = compile_pattern_set(self.exclude_names)
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        # Separate writer connection: WAL lets searches run while a refresh writes
+        self._conn = self._connect()
+        self._writer = self._connect()
+        self.trigram = True
+        self._create_schema()
+        self.stats = {"queries": 0, "index_hits": 0, "fallbacks": 0, "refreshes": 0, "rescanned_dirs": 0}
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _create_schema(self):
+        conn = self._writer
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "id INTEGER PRIMARY KEY, "
+            f"path TEXT NOT NULL UNIQUE{PATH_COLLATION}, "
+            f"parent TEXT NOT NULL{PATH_COLLATION}, "
+            f"name TEXT NOT NULL{PATH_COLLATION}, "
+            "size INTEGER, "
+            "mtime REAL, "
+            "is_dir INTEGER NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS entries_parent ON entries (parent)")
+        conn.execute("CREATE INDEX IF NOT EXISTS entries_name ON entries (name)")
+        conn.execute(f"CREATE TABLE IF NOT EXISTS dirs (path TEXT PRIMARY KEY{PATH_COLLATION}, mtime REAL)")
+        conn.execute(f"CREATE TABLE IF NOT EXISTS roots (path TEXT PRIMARY KEY{PATH_COLLATION}, refreshed_at REAL)")
+        try:
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS names USING fts5("
+                "name, content='entries', content_rowid='id', tokenize='trigram')"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS entries_ai AFTER INSERT ON entries BEGIN "
+                "INSERT INTO names (rowid, name) VALUES (new.id, new.name); END"
+            )
+            conn.execute(
+                "CREATE TRIGGER IF NOT EXISTS entries_ad AFTER DELETE ON entries BEGIN "
+                "INSERT INTO names (names, rowid, name) VALUES ('delete', old.id, old.name); END"
+            )
+        except sqlite3.OperationalError as e:
+            # SQLite older than 3.34 has no trigram tokenizer; queries scan the path range instead
+            logging.debug(f"Trigram index unavailable, falling back to range scans: {e}")
+            self.trigram = False
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def close(self):
+        with self._refresh_lock, self._lock:
+            self._conn.close()
+            self._writer.close()
+
+    # Refreshing
+
+    def refresh(self, roots=None):
+        # Brings the index up to date; returns False if another refresh is running
+        if not self._refresh_lock.acquire(blocking=False):
+            return False
+        try:
+            for root in roots or self.roots:
+                started = time.perf_counter()
+                rescanned = self._refresh_root(os.path.abspath(root))
+                self.stats["refreshes"] += 1
+                self.stats["rescanned_dirs"] += rescanned
+                logging.debug(f"Refreshed file index for {root}: {rescanned} directories rescanned "
+                              f"in {time.perf_counter() - started:.2f}s")
+            return True
+        finally:
+            self._refresh_lock.release()
+
+    def _refresh_root(self, root):
+        conn = self._writer
+        conn.execute("BEGIN")
+        try:
+            known = conn.execute("SELECT 1 FROM roots WHERE path = ?", (root,)).fetchone()
+            if known is None:
+                self._delete_tree(root)
+                rescanned = self._scan_tree(root)
+            else:
+                rescanned = 0
+                low, high = path_range(root)
+                dirs = conn.execute(
+                    "SELECT path, mtime FROM dirs WHERE path = ? OR (path >= ? AND path < ?)", (root, low, high)
+                ).fetchall()
+                for directory, mtime in dirs:
+                    try:
+                        current = os.stat(directory).st_mtime
+                    except OSError:
+                        self._delete_tree(directory)
+                        continue
+                    if current != mtime:
+                        rescanned += self._rescan_dir(directory, current)
+            conn.execute(
+                "INSERT OR REPLACE INTO roots (path, refreshed_at) VALUES (?, ?)", (root, time.time())
+            )
+            conn.execute("COMMIT")
+            return rescanned
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _list_dir(self, directory):
+        # Non-excluded children of directory as (path, name, size, mtime, is_dir)
+        children = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if self.exclude is not None and self.exclude.match(entry.name):
+                        continue
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                        info = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    children.append((entry.path, entry.name, None if is_dir else info.st_size,
+                                     info.st_mtime, is_dir))
+        except OSError as e:
+            logging.debug(f"Skipping unreadable directory {directory}: {e}")
+        return children
+
+    def _scan_tree(self, top):
+        conn = self._writer
+        scanned = 0
+        stack = [top]
+        while stack:
+            directory = stack.pop()
+            try:
+                mtime = os.stat(directory).st_mtime
+            except OSError:
+                continue
+            children = self._list_dir(directory)
+            conn.executemany(
+                "INSERT INTO entries (path, parent, name, size, mtime, is_dir) VALUES (?, ?, ?, ?, ?, ?)",
+                [(path, directory, name, size, child_mtime, is_dir)
+                 for path, name, size, child_mtime, is_dir in children],
+            )
+            conn.execute("INSERT OR REPLACE INTO dirs (path, mtime) VALUES (?, ?)", (directory, mtime))
+            stack.extend(path for path, _, _, _, is_dir in children if is_dir)
+            scanned += 1
+        return scanned
+
+    def _rescan_dir(self, directory, mtime):
+        # Applies the difference between the stored and current listing of one directory
+        conn = self._writer
+        stored = {
+            name: (entry_id, path, is_dir)
+            for entry_id, path, name, is_dir in conn.execute(
+                "SELECT id, path, name, is_dir FROM entries WHERE parent = ?", (directory,)
+            )
+        }
+        rescanned = 1
+        for path, name, size, child_mtime, is_dir in self._list_dir(directory):
+            previous = stored.pop(name, None)
+            if previous is not None and bool(previous[2]) == is_dir:
+                conn.execute("UPDATE entries SET size = ?, mtime = ? WHERE id = ?", (size, child_mtime, previous[0]))
+                continue
+            if previous is not None:
+                self._delete_entry(*previous)
+            conn.execute(
+                "INSERT INTO entries (path, parent, name, size, mtime, is_dir) VALUES (?, ?, ?, ?, ?, ?)",
+                (path, directory, name, size, child_mtime, is_dir),
+            )
+            if is_dir:
+                rescanned += self._scan_tree(path)
+        for entry_id, path, is_dir in stored.values():
+            self._delete_entry(entry_id, path, is_dir)
+        conn.execute("UPDATE dirs SET mtime = ? WHERE path = ?", (mtime, directory))
+        return rescanned
+
+    def _delete_entry(self, entry_id, path, is_dir):
+        self._writer.execute("DELETE FROM entries WHERE id = ?", (entry_id,))
+        if is_dir:
+            self._delete_tree(path)
+
+    def _delete_tree(self, directory):
+        low, high = path_range(directory)
+        self._writer.execute("DELETE FROM entries WHERE path >= ? AND path < ?", (low, high))
+        self._writer.execute("DELETE FROM dirs WHERE path = ? OR (path >= ? AND path < ?)", (directory, low, high))
+
+    # Querying
+
+    def _covering_root(self, directory):
+        with self._lock:
+            for root, refreshed_at in self._conn.execute("SELECT path, refreshed_at FROM roots"):
+                if os.path.normcase(directory) == os.path.normcase(root) or \
+                        os.path.normcase(directory).startswith(os.path.normcase(root.rstrip(os.sep) + os.sep)):
+                    return root, refreshed_at
+        return None, None
+
+    def is_fresh(self, directory, max_depth=None):
+        root, refreshed_at = self._covering_root(directory)
+        if root is None or time.time() - refreshed_at > self.max_age:
+            return False
+        # No folder the search would read may have changed since it was indexed;
+        # one stat per folder is still far cheaper than listing them all
+        low, high = path_range(directory)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, mtime FROM dirs WHERE path = ? OR (path >= ? AND path < ?)", (directory, low, high)
+            ).fetchall()
+        if not any(len(path) < len(low) for path, _ in rows):
+            return False
+        for path, mtime in rows:
+            # Entries at max_depth live in folders max_depth levels down
+            depth = path[len(low):].count(os.sep) + 1 if len(path) >= len(low) else 0
+            if max_depth is not None and depth > max_depth:
+                continue
+            try:
+                if os.stat(path).st_mtime != mtime:
+                    return False
+            except OSError:
+                return False
+        return True
+
+    def search(self, directory, pattern, recursive=True, max_results=None, max_depth=None, exclude=None):
+        # Matching paths from the index, or None when the index cannot answer
+        # (directory not indexed, index stale, or excludes the index skipped)
+        self.stats["queries"] += 1
+        directory = os.path.abspath(directory)
+        if exclude is not None and not set(self.exclude_names) <= set(exclude):
+            self.stats["fallbacks"] += 1
+            return None
+        if not recursive:
+            max_depth = 0
+        if not self.is_fresh(directory, max_depth):
+            self.stats["fallbacks"] += 1
+            return None
+        extra_exclude = compile_pattern_set(set(exclude or ()) - set(self.exclude_names))
+        match_relative = "/" in pattern or "\\" in pattern
+        regex = compile_pattern(pattern)
+        low, high = path_range(directory)
+        literal = longest_literal(pattern)
+        prefix = literal_prefix(pattern)
+
+        # Cheapest lookup first: one directory, an exact name, trigrams, a name prefix,
+        # and only then every path under the directory
+        if max_depth == 0:
+            sql = "SELECT path, name FROM entries WHERE parent = ?"
+            params = (directory,)
+        elif prefix and prefix == name_part(pattern):
+            sql = "SELECT path, name FROM entries WHERE name = ? AND path >= ? AND path < ?"
+            params = (prefix, low, high)
+        elif self.trigram and len(literal) >= MIN_LITERAL:
+            sql = ("SELECT e.path, e.name FROM names JOIN entries e ON e.id = names.rowid "
+                   "WHERE names MATCH ? AND e.path >= ? AND e.path < ?")
+            params = ('"' + literal.replace('"', '""') + '"', low, high)
+        elif prefix:
+            sql = "SELECT path, name FROM entries WHERE name >= ? AND name < ? AND path >= ? AND path < ?"
+            params = (prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1), low, high)
+        else:
+            sql = "SELECT path, name FROM entries WHERE path >= ? AND path < ?"
+            params = (low, high)
+
+        results = []
+        with self._lock:
+            for path, name in self._conn.execute(sql, params):
+                relative = path[len(low):]
+                parts = re.split(r"[\\/]", relative)
+                if max_depth is not None and len(parts) - 1 > max_depth:
+                    continue
+                if extra_exclude is not None and any(extra_exclude.match(part) for part in parts):
+                    continue
+                if not regex.match(relative if match_relative else name):
+                    continue
+                results.append(path)
+                if max_results is not None and len(results) >= max_results:
+                    break
+        self.stats["index_hits"] += 1
+        return results
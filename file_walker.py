@@ -0,0 +1,141 @@
+import fnmatch
+import logging
+import os
+import queue
+import re
+import threading
+
+# Directory names skipped unless the caller passes its own exclude list
+DEFAULT_EXCLUDES = ["node_modules", ".git", "__pycache__", "$Recycle.Bin", "System Volume Information"]
+
+# Scanning is mostly syscalls, but more threads than cores only adds GIL contention
+DEFAULT_WORKERS = min(8, (os.cpu_count() or 1) * 2)
+
+_DONE = object()
+
+
+def compile_pattern(pattern):
+    flags = re.IGNORECASE if os.name == "nt" else 0
+    return re.compile(fnmatch.translate(pattern), flags)
+
+
+def compile_pattern_set(patterns):
+    # One regex for all exclude globs; None when there is nothing to exclude
+    if not patterns:
+        return None
+    flags = re.IGNORECASE if os.name == "nt" else 0
+    return re.compile("|".join(f"(?:{fnmatch.translate(p)})" for p in patterns), flags)
+
+
+class _Walk:
+    def __init__(self, directory, pattern, max_depth, exclude, cancel_event, workers):
+        self.directory = directory
+        self.pattern = compile_pattern(pattern)
+        # Patterns with a separator match the path relative to the search root
+        self.match_relative = "/" in pattern or "\\" in pattern
+        self.exclude = compile_pattern_set(exclude)
+        self.max_depth = max_depth
+        # The caller's event is only read; stopping the walk sets our own
+        self.cancel_event = cancel_event
+        self.stop_event = threading.Event()
+        self.dirs = queue.Queue()
+        # Bounded so a slow consumer throttles the walkers instead of buffering everything
+        self.results = queue.Queue(maxsize=4096)
+        self.pending = 1
+        self.lock = threading.Lock()
+        self.dirs.put((directory, 0))
+        self.threads = [
+            threading.Thread(target=self._worker, name=f"walker-{i}", daemon=True) for i in range(workers)
+        ]
+        for thread in self.threads:
+            thread.start()
+
+    def stopped(self):
+        return self.stop_event.is_set() or (self.cancel_event is not None and self.cancel_event.is_set())
+
+    def _emit(self, item):
+        while not self.stopped():
+            try:
+                self.results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _worker(self):
+        while not self.stopped():
+            try:
+                item = self.dirs.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if item is _DONE:
+                return
+            path, depth = item
+            try:
+                self._scan(path, depth)
+            finally:
+                with self.lock:
+                    self.pending -= 1
+                    finished = self.pending == 0
+                if finished:
+                    for _ in self.threads:
+                        self.dirs.put(_DONE)
+                    self._emit(_DONE)
+
+    def _scan(self, path, depth):
+        try:
+            entries = os.scandir(path)
+        except OSError as e:
+            logging.debug(f"Skipping unreadable directory {path}: {e}")
+            return
+        # Matches are handed over once per directory to keep queue traffic low
+        matches = []
+        descend = self.max_depth is None or depth < self.max_depth
+        with entries:
+            for entry in entries:
+                name = entry.name
+                if self.exclude is not None and self.exclude.match(name):
+                    continue
+                target = os.path.relpath(entry.path, self.directory) if self.match_relative else name
+                if self.pattern.match(target):
+                    matches.append(entry.path)
+                if descend:
+                    try:
+                        is_dir = entry.is_dir(follow_symlinks=False)
+                    except OSError:
+                        is_dir = False
+                    if is_dir:
+                        with self.lock:
+                            self.pending += 1
+                        self.dirs.put((entry.path, depth + 1))
+        if matches:
+            self._emit(matches)
+
+
+def walk_files(directory, pattern="*", recursive=True, max_results=None, max_depth=None,
+               exclude=None, cancel_event=None, workers=DEFAULT_WORKERS):
+    # Yields paths under directory whose name matches pattern, while a pool of
+    # threads scans directories in parallel. Stops after max_results matches,
+    # when cancel_event is set, or when the caller closes the generator.
+    if not recursive:
+        max_depth = 0
+    exclude = DEFAULT_EXCLUDES if exclude is None else exclude
+    walk = _Walk(directory, pattern, max_depth, exclude, cancel_event, workers)
+    found = 0
+    try:
+        while max_results is None or found < max_results:
+            try:
+                item = walk.results.get(timeout=0.1)
+            except queue.Empty:
+                if walk.stopped():
+                    return
+                continue
+            if item is _DONE:
+                return
+            for path in item:
+                if max_results is not None and found >= max_results:
+                    return
+                found += 1
+                yield path
+    finally:
+        walk.stop_event.set()
@@ -1,7 +1,3 @@
-from gui import *
-from tools_definition import *
-from helpers import *
-from tools import *
 import json
 import re
 import logging
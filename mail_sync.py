@@ -0,0 +1,237 @@
+import email.errors
+import email.header
+import email.parser
+import email.utils
+import logging
+import re
+import sqlite3
+import threading
+import time
+
+# Header fields kept locally; fetched with BODY.PEEK so nothing is marked as read
+HEADER_FIELDS = ("FROM", "SUBJECT", "DATE", "MESSAGE-ID")
+FETCH_BATCH = 500
+
+_UID = re.compile(rb"UID (\d+)")
+# compat32 header-only parsing; policy.default builds a header object per
+# field and is an order of magnitude slower on large mailboxes
+_PARSER = email.parser.BytesHeaderParser()
+
+
+def uid_ranges(uids):
+    # Compact IMAP sequence set: [1, 2, 3, 7, 9, 10] -> "1:3,7,9:10"
+    parts = []
+    start = previous = None
+    for uid in uids:
+        if previous is not None and uid == previous + 1:
+            previous = uid
+            continue
+        if start is not None:
+            parts.append(f"{start}:{previous}" if previous != start else str(start))
+        start = previous = uid
+    if start is not None:
+        parts.append(f"{start}:{previous}" if previous != start else str(start))
+    return ",".join(parts)
+
+
+def _decode(value):
+    if value is None:
+        return ""
+    value = str(value)
+    if "=?" not in value:
+        return value
+    try:
+        return str(email.header.make_header(email.header.decode_header(value)))
+    except (UnicodeDecodeError, LookupError, email.errors.HeaderParseError):
+        return value
+
+
+def parse_headers(raw):
+    message = _PARSER.parsebytes(raw)
+    date = _decode(message.get("Date"))
+    try:
+        timestamp = email.utils.parsedate_to_datetime(date).timestamp() if date else None
+    except (TypeError, ValueError):
+        timestamp = None
+    return {
+        "sender": _decode(message.get("From")),
+        "subject": _decode(message.get("Subject")),
+        "date": date,
+        "date_ts": timestamp,
+        "message_id": _decode(message.get("Message-ID")),
+    }
+
+
+class HeaderCache:
+    # Local copy of message headers per mailbox, plus the UIDVALIDITY and
+    # highest UID seen so the next sync only asks for newer messages
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS mailboxes ("
+            "mailbox TEXT PRIMARY KEY, "
+            "uidvalidity INTEGER, "
+            "last_uid INTEGER NOT NULL DEFAULT 0, "
+            "synced_at REAL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS headers ("
+            "mailbox TEXT NOT NULL, "
+            "uid INTEGER NOT NULL, "
+            "sender TEXT, "
+            "subject TEXT, "
+            "date TEXT, "
+            "date_ts REAL, "
+            "message_id TEXT, "
+            "PRIMARY KEY (mailbox, uid))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS headers_date ON headers (mailbox, date_ts)")
+
+    def state(self, mailbox):
+        # (uidvalidity, last_uid, synced_at), or (None, 0, None) for a mailbox never synced
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT uidvalidity, last_uid, synced_at FROM mailboxes WHERE mailbox = ?", (mailbox,)
+            ).fetchone()
+        return row or (None, 0, None)
+
+    def reset(self, mailbox, uidvalidity):
+        # UIDVALIDITY changed: every cached UID is meaningless now
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute("DELETE FROM headers WHERE mailbox = ?", (mailbox,))
+            self._conn.execute(
+                "INSERT OR REPLACE INTO mailboxes (mailbox, uidvalidity, last_uid, synced_at) VALUES (?, ?, 0, NULL)",
+                (mailbox, uidvalidity),
+            )
+            self._conn.execute("COMMIT")
+
+    def add(self, mailbox, rows, last_uid):
+        # rows of (uid, headers dict); last_uid is committed with them so an
+        # interrupted sync resumes after the last stored batch
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO headers (mailbox, uid, sender, subject, date, date_ts, message_id) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(mailbox, uid, h["sender"], h["subject"], h["date"], h["date_ts"], h["message_id"])
+                 for uid, h in rows],
+            )
+            self._conn.execute("UPDATE mailboxes SET last_uid = max(last_uid, ?) WHERE mailbox = ?", (last_uid, mailbox))
+            self._conn.execute("COMMIT")
+
+    def mark_synced(self, mailbox):
+        with self._lock:
+            self._conn.execute("UPDATE mailboxes SET synced_at = ? WHERE mailbox = ?", (time.time(), mailbox))
+
+    def uids(self, mailbox):
+        with self._lock:
+            return {row[0] for row in self._conn.execute("SELECT uid FROM headers WHERE mailbox = ?", (mailbox,))}
+
+    def remove(self, mailbox, uids):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany("DELETE FROM headers WHERE mailbox = ? AND uid = ?", [(mailbox, uid) for uid in uids])
+            self._conn.execute("COMMIT")
+
+    def count(self, mailbox):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM headers WHERE mailbox = ?", (mailbox,)).fetchone()[0]
+
+    def query(self, mailbox, limit=10, sender=None, subject=None, since=None):
+        # Newest first; sender and subject are case-insensitive substrings,
+        # since is an epoch timestamp
+        sql = "SELECT uid, sender, subject, date FROM headers WHERE mailbox = ?"
+        params = [mailbox]
+        if sender:
+            sql += " AND sender LIKE ?"
+            params.append(f"%{sender}%")
+        if subject:
+            sql += " AND subject LIKE ?"
+            params.append(f"%{subject}%")
+        if since is not None:
+            sql += " AND date_ts >= ?"
+            params.append(since)
+        sql += " ORDER BY date_ts DESC, uid DESC LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [{"uid": uid, "from": s, "subject": subj, "date": date} for uid, s, subj, date in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class MailSync:
+    # Incremental, header-only IMAP sync. `connect` returns a logged-in
+    # imaplib.IMAP4 (or anything with the same select/response/uid/logout).
+    def __init__(self, connect, cache, mailbox="INBOX", batch=FETCH_BATCH):
+        self.connect = connect
+        self.cache = cache
+        self.mailbox = mailbox
+        self.batch = batch
+        self._lock = threading.Lock()
+
+    def sync(self):
+        # Returns the number of new messages stored
+        with self._lock:
+            started = time.perf_counter()
+            conn = self.connect()
+            try:
+                added = self._sync(conn)
+            finally:
+                try:
+                    conn.logout()
+                except Exception as e:
+                    logging.debug(f"IMAP logout failed: {e}")
+            logging.debug(f"Synced {added} new message headers from {self.mailbox} "
+                          f"in {time.perf_counter() - started:.2f}s")
+            return added
+
+    def _sync(self, conn):
+        typ, data = conn.select(self.mailbox, readonly=True)
+        if typ != "OK":
+            raise RuntimeError(f"Cannot open mailbox {self.mailbox}: {data}")
+        exists = int(data[0])
+        _, validity = conn.response("UIDVALIDITY")
+        uidvalidity = int(validity[0]) if validity and validity[0] else None
+        cached_validity, last_uid, _ = self.cache.state(self.mailbox)
+        if cached_validity != uidvalidity:
+            if cached_validity is not None:
+                logging.info(f"UIDVALIDITY of {self.mailbox} changed, resyncing headers")
+            self.cache.reset(self.mailbox, uidvalidity)
+            last_uid = 0
+
+        # "n:*" always matches the highest UID, even when it is below n
+        typ, data = conn.uid("SEARCH", None, f"UID {last_uid + 1}:*")
+        new = sorted(uid for uid in map(int, data[0].split()) if uid > last_uid) if typ == "OK" else []
+        fields = " ".join(HEADER_FIELDS)
+        for i in range(0, len(new), self.batch):
+            chunk = new[i:i + self.batch]
+            typ, data = conn.uid("FETCH", uid_ranges(chunk), f"(UID BODY.PEEK[HEADER.FIELDS ({fields})])")
+            if typ != "OK":
+                raise RuntimeError(f"Header fetch failed: {data}")
+            rows = []
+            for item in data:
+                if isinstance(item, tuple):
+                    match = _UID.search(item[0])
+                    if match:
+                        rows.append((int(match.group(1)), parse_headers(item[1])))
+            self.cache.add(self.mailbox, rows, chunk[-1])
+
+        # Messages were deleted on the server: drop them locally. Only UIDs
+        # cross the wire, and only when the counts disagree.
+        if self.cache.count(self.mailbox) != exists:
+            typ, data = conn.uid("SEARCH", None, "ALL")
+            if typ == "OK":
+                live = set(map(int, data[0].split()))
+                self.cache.remove(self.mailbox, self.cache.uids(self.mailbox) - live)
+        self.cache.mark_synced(self.mailbox)
+        return len(new)
+
+    def latest(self, limit=10, sender=None, subject=None, since=None):
+        return self.cache.query(self.mailbox, limit, sender, subject, since)
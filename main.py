@@ -1,12 +1,10 @@
-import threading
-import time
-from gui import App
-from tools_definition import *
-from helpers import *
-from tools import *
 import logging
 
 def main():
+    # Imported here rather than at the top: worker processes started with
+    # spawn re-import this module and must not load the GUI and tools
+    from gui import App
+
     # Configure logging
     logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
     
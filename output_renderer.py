@@ -0,0 +1,53 @@
+import queue
+
+
+class OutputRenderer:
+    # Drains result messages on the Tk event loop in batches, one insert per
+    # flush, and keeps the textbox to at most max_lines lines by dropping the
+    # oldest ones. `after` is the widget's after() scheduling method.
+    def __init__(self, widget, result_queue, after, flush_interval_ms=50, max_batch=1000, max_lines=5000):
+        self.widget = widget
+        self.result_queue = result_queue
+        self.after = after
+        self.flush_interval_ms = flush_interval_ms
+        self.max_batch = max_batch
+        self.max_lines = max_lines
+        self.lines = 0
+        self.stats = {"flushes": 0, "messages": 0, "trimmed_lines": 0}
+        self._running = False
+
+    def start(self):
+        if not self._running:
+            self._running = True
+            self.after(self.flush_interval_ms, self._tick)
+
+    def stop(self):
+        self._running = False
+
+    def _tick(self):
+        if not self._running:
+            return
+        self.flush()
+        self.after(self.flush_interval_ms, self._tick)
+
+    def flush(self):
+        batch = []
+        try:
+            while len(batch) < self.max_batch:
+                batch.append(self.result_queue.get_nowait())
+        except queue.Empty:
+            pass
+        if not batch:
+            return 0
+        text = "".join(batch)
+        self.widget.insert("end", text)
+        self.lines += text.count("\n")
+        if self.lines > self.max_lines:
+            excess = self.lines - self.max_lines
+            self.widget.delete("1.0", f"{excess + 1}.0")
+            self.lines -= excess
+            self.stats["trimmed_lines"] += excess
+        self.widget.see("end")
+        self.stats["flushes"] += 1
+        self.stats["messages"] += len(batch)
+        return len(batch)
@@ -0,0 +1,262 @@
+import logging
+import os
+import posixpath
+import threading
+import time
+from concurrent.futures import Future
+
+# Which path arguments each tool reads from and writes to
+TOOL_PATHS = {
+    "create_file": ([], ["file_path"]),
+    "create_folder": ([], ["folder_path"]),
+    "move_file": ([], ["source", "destination"]),
+    "copy_file": (["source"], ["destination"]),
+    "delete_file": ([], ["file_path"]),
+    "rename_file": ([], ["old_path"]),
+    "batch_rename": ([], ["directory"]),
+    "delete_files": ([], ["directory"]),
+    "create_files": ([], ["directory"]),
+    "compress_files": (["files"], ["output_path"]),
+    "extract_archive": (["archive_path"], ["extract_path"]),
+    "search_files": (["directory"], []),
+    "find_duplicates": (["directory"], []),
+    "launch_application": (["app_path"], []),
+    "take_screenshot": ([], ["output_path"]),
+    "send_email": (["attachment_path"], []),
+}
+
+# Path-like arguments of tools not listed above are treated as writes
+PATH_ARGUMENTS = {
+    "file_path", "folder_path", "source", "destination", "output_path", "archive_path",
+    "extract_path", "old_path", "directory", "files", "attachment_path",
+}
+
+# Tools that must wait for everything before them, e.g. shutting the machine down
+BARRIER_TOOLS = {"system_control"}
+
+
+def normalize_path(path):
+    # Compare Windows paths the same way on every platform
+    path = posixpath.normpath(os.path.expanduser(str(path)).replace("\\", "/"))
+    return path.lower() if os.name == "nt" else path
+
+
+def _collect(arguments, keys):
+    paths = []
+    for key in keys:
+        value = arguments.get(key)
+        if isinstance(value, (list, tuple)):
+            paths.extend(normalize_path(v) for v in value if v)
+        elif value:
+            paths.append(normalize_path(value))
+    return paths
+
+
+def tool_paths(tool_call):
+    name = tool_call.get("name")
+    arguments = tool_call.get("arguments") or {}
+    if not isinstance(arguments, dict):
+        return [], []
+    if name in TOOL_PATHS:
+        reads, writes = TOOL_PATHS[name]
+        reads, writes = _collect(arguments, reads), _collect(arguments, writes)
+        if name in ("copy_file", "move_file"):
+            for pair in arguments.get("pairs") or []:
+                if isinstance(pair, dict):
+                    target = writes if name == "move_file" else reads
+                    target.extend(_collect(pair, ["source"]))
+                    writes.extend(_collect(pair, ["destination"]))
+        if name == "send_email":
+            for message in arguments.get("messages") or []:
+                if isinstance(message, dict):
+                    reads.extend(_collect(message, ["attachment_path"]))
+        if name == "create_files" and isinstance(arguments.get("files"), dict):
+            base = arguments.get("directory")
+            writes.extend(normalize_path(posixpath.join(str(base), str(path)) if base else path)
+                          for path in arguments["files"])
+        if name == "rename_file" and arguments.get("old_path") and arguments.get("new_name"):
+            directory = posixpath.dirname(normalize_path(arguments["old_path"]))
+            writes.append(normalize_path(posixpath.join(directory, str(arguments["new_name"]))))
+        return reads, writes
+    return [], _collect(arguments, sorted(PATH_ARGUMENTS & set(arguments)))
+
+
+def paths_overlap(a, b):
+    # Equal paths, or one inside the other
+    if a == b:
+        return True
+    shorter, longer = (a, b) if len(a) < len(b) else (b, a)
+    return longer.startswith(shorter.rstrip("/") + "/")
+
+
+def _conflicts(first, second):
+    first_reads, first_writes = first
+    second_reads, second_writes = second
+    for written in first_writes:
+        if any(paths_overlap(written, p) for p in second_reads + second_writes):
+            return True
+    for written in second_writes:
+        if any(paths_overlap(written, p) for p in first_reads):
+            return True
+    return False
+
+
+def build_plan(tool_calls):
+    # Returns one set of dependency indices per tool call. A call depends on
+    # every earlier call that touches an overlapping path where at least one
+    # side writes, on anything listed in its "depends_on" field (indices or
+    # "id" values), and on everything before it if it is a barrier tool.
+    ids = {call.get("id"): i for i, call in enumerate(tool_calls) if isinstance(call, dict) and call.get("id") is not None}
+    paths = [tool_paths(call) for call in tool_calls]
+    return [_dependencies(i, tool_calls, paths, ids) for i in range(len(tool_calls))]
+
+
+def _dependencies(i, tool_calls, paths, ids):
+    # Dependencies of call i on the calls before it (see build_plan)
+    call = tool_calls[i]
+    deps = set()
+    if call.get("name") in BARRIER_TOOLS:
+        deps.update(range(i))
+    for j in range(i):
+        if tool_calls[j].get("name") in BARRIER_TOOLS or _conflicts(paths[j], paths[i]):
+            deps.add(j)
+    explicit = call.get("depends_on") or []
+    if not isinstance(explicit, list):
+        explicit = [explicit]
+    for ref in explicit:
+        index = ids.get(ref, ref)
+        if isinstance(index, int) and 0 <= index < i:
+            deps.add(index)
+        else:
+            logging.warning(f"Ignoring unknown or forward dependency {ref!r} of tool call {i}")
+    return deps
+
+
+def critical_path(plan, results):
+    # Longest chain of dependent tool durations
+    longest = []
+    previous = []
+    for i, deps in enumerate(plan):
+        duration = results[i].get("duration") or 0.0
+        best = max(deps, key=lambda d: longest[d], default=None)
+        longest.append(duration + (longest[best] if best is not None else 0.0))
+        previous.append(best)
+    if not longest:
+        return [], 0.0
+    end = max(range(len(longest)), key=lambda i: longest[i])
+    path = []
+    node = end
+    while node is not None:
+        path.append(node)
+        node = previous[node]
+    return path[::-1], longest[end]
+
+
+def execute_plan(tool_calls, submit):
+    # Runs independent calls in parallel and dependent ones in order. submit
+    # takes a tool call and returns a Future resolving to its result record.
+    return start_plan(tool_calls, submit).result()
+
+
+def start_plan(tool_calls, submit):
+    # Non-blocking execute_plan: returns a Future resolving to (results,
+    # report), so an event loop can await the plan without holding a thread
+    plan = StreamingPlan(submit)
+    for call in tool_calls:
+        plan.add(call)
+    return plan.close()
+
+
+class StreamingPlan:
+    # A plan that grows one call at a time, e.g. while the model's response
+    # is still streaming in. Each added call gets the same dependencies on
+    # earlier calls as in build_plan and runs as soon as they have finished;
+    # close() returns a Future resolving to (results, report) once every
+    # added call is done.
+    def __init__(self, submit):
+        self.submit = submit
+        self.tool_calls = []
+        self.plan = []
+        self.results = []
+        self._paths = []
+        self._ids = {}
+        self._dependents = []
+        self._waiting = []
+        self._futures = []
+        self._remaining = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._finished = Future()
+        self._started = time.perf_counter()
+
+    def add(self, call):
+        # Returns a Future resolving to this call's result record
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Plan is already closed")
+            i = len(self.tool_calls)
+            self.tool_calls.append(call)
+            self._paths.append(tool_paths(call))
+            deps = _dependencies(i, self.tool_calls, self._paths, self._ids)
+            if isinstance(call, dict) and call.get("id") is not None:
+                self._ids[call["id"]] = i
+            self.plan.append(deps)
+            self.results.append(None)
+            self._dependents.append([])
+            self._futures.append(Future())
+            pending = [d for d in deps if self.results[d] is None]
+            for dep in pending:
+                self._dependents[dep].append(i)
+            self._waiting.append(len(pending))
+            self._remaining += 1
+        if not pending:
+            self._launch(i)
+        return self._futures[i]
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            done = self._remaining == 0
+        if done:
+            self._finished.set_result(self._summarize())
+        return self._finished
+
+    def _skip(self, i, reason):
+        call = self.tool_calls[i]
+        return {"tool": call.get("name"), "arguments": call.get("arguments", {}),
+                "success": False, "result": None, "error": reason, "duration": 0.0}
+
+    def _launch(self, i):
+        failed = [d for d in self.plan[i] if not self.results[d]["success"]]
+        if failed:
+            name = self.tool_calls[failed[0]].get("name")
+            self._complete(i, self._skip(i, f"Skipped because {name} (call {failed[0]}) failed"))
+            return
+        self.submit(self.tool_calls[i]).add_done_callback(lambda future: self._complete(i, future.result()))
+
+    def _complete(self, i, result):
+        ready = []
+        with self._lock:
+            self.results[i] = result
+            for dependent in self._dependents[i]:
+                self._waiting[dependent] -= 1
+                if self._waiting[dependent] == 0:
+                    ready.append(dependent)
+            self._remaining -= 1
+            done = self._closed and self._remaining == 0
+        self._futures[i].set_result(result)
+        for dependent in ready:
+            self._launch(dependent)
+        if done:
+            self._finished.set_result(self._summarize())
+
+    def _summarize(self):
+        path, path_seconds = critical_path(self.plan, self.results)
+        report = {
+            "wall_seconds": time.perf_counter() - self._started,
+            "tool_seconds": sum(result.get("duration") or 0.0 for result in self.results),
+            "critical_path": [self.tool_calls[i].get("name") for i in path],
+            "critical_path_seconds": path_seconds,
+            "dependencies": [sorted(deps) for deps in self.plan],
+        }
+        return self.results, report
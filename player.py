@@ -0,0 +1,227 @@
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+# A backend plays one track at a time:
+#   prepare(path) -> handle   load and start parsing a track, ahead of time
+#   play(handle)              switch to it immediately
+#   stop()
+#   set_end_callback(fn)      fn(handle) is called, from any thread, when a track ends
+#   close()
+
+
+class VlcBackend:
+    # One libvlc instance and player for the whole session
+    def __init__(self):
+        import vlc
+        self._vlc = vlc
+        self._instance = vlc.Instance()
+        self._player = self._instance.media_player_new()
+        self._on_end = None
+
+    def prepare(self, path):
+        media = self._instance.media_new(path)
+        media.parse_with_options(self._vlc.MediaParseFlag.local, 0)
+        # Per media, so the callback names the track that ended even if
+        # another one has been started since
+        media.event_manager().event_attach(self._vlc.EventType.MediaStateChanged, self._state_changed, media)
+        return media
+
+    def play(self, media):
+        self._player.set_media(media)
+        self._player.play()
+
+    def stop(self):
+        self._player.stop()
+
+    def set_end_callback(self, callback):
+        self._on_end = callback
+
+    def _state_changed(self, event, media):
+        # Runs on a libvlc thread, which must not call back into libvlc
+        if event.u.new_state == self._vlc.State.Ended and self._on_end is not None:
+            self._on_end(media)
+
+    def close(self):
+        self._player.stop()
+        self._player.release()
+        self._instance.release()
+
+
+class FakeBackend:
+    # Headless stand-in: a track "plays" for durations.get(path, default)
+    # seconds, prepare() takes load_seconds, and every start and end is
+    # recorded in timeline as (event, path, time.perf_counter())
+    def __init__(self, default_duration=1.0, durations=None, load_seconds=0.0):
+        self.default_duration = default_duration
+        self.durations = durations or {}
+        self.load_seconds = load_seconds
+        self.timeline = []
+        self._timer = None
+        self._on_end = None
+        self._lock = threading.Lock()
+
+    def prepare(self, path):
+        time.sleep(self.load_seconds)
+        return (path, self.durations.get(path, self.default_duration))
+
+    def play(self, handle):
+        with self._lock:
+            self._cancel()
+            self.timeline.append(("start", handle[0], time.perf_counter()))
+            self._timer = threading.Timer(handle[1], self._ended, args=(handle,))
+            self._timer.daemon = True
+            self._timer.start()
+
+    def stop(self):
+        with self._lock:
+            self._cancel()
+
+    def _cancel(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def set_end_callback(self, callback):
+        self._on_end = callback
+
+    def _ended(self, handle):
+        with self._lock:
+            self.timeline.append(("end", handle[0], time.perf_counter()))
+            self._timer = None
+        if self._on_end is not None:
+            self._on_end(handle)
+
+    def close(self):
+        self.stop()
+
+
+class PlayerService:
+    # Playlist over a single backend. The track after the current one is
+    # prepared while the current one plays, and the backend's end-of-track
+    # callback starts it, so there is no polling and no load between tracks.
+    # on_release(path) is called once for every path given to play() or
+    # enqueue() when the player is done with it (finished, skipped, replaced,
+    # stopped or failed to load), e.g. to unpin it in a cache.
+    def __init__(self, backend, on_release=None):
+        self.backend = backend
+        self.on_release = on_release
+        self._lock = threading.Lock()
+        self._queue = deque()  # (title, path)
+        self._current = None  # (title, handle, path)
+        self._prepared = None  # (path, handle) for the head of the queue
+        self._ended = queue.Queue()
+        backend.set_end_callback(self._ended.put)
+        threading.Thread(target=self._run, name="player", daemon=True).start()
+
+    def play(self, title, path):
+        # Replace the current track; the queue is kept
+        try:
+            handle = self.backend.prepare(path)
+        except Exception:
+            self._release(path)
+            raise
+        with self._lock:
+            self._start(title, handle, path)
+        logging.debug(f"Playing {title}")
+
+    def enqueue(self, title, path):
+        # Plays now if nothing is playing, otherwise after the queued tracks
+        with self._lock:
+            if self._current is None and not self._queue:
+                self._queue.append((title, path))
+                self._advance()
+            else:
+                self._queue.append((title, path))
+                self._preload()
+            return len(self._queue)
+
+    def skip(self):
+        # Next queued track, or silence; returns the new title or None
+        with self._lock:
+            self._advance()
+            return self._current[0] if self._current else None
+
+    def stop(self):
+        with self._lock:
+            released = [path for _, path in self._queue]
+            if self._current is not None:
+                released.append(self._current[2])
+            self._queue.clear()
+            self._prepared = None
+            self._current = None
+            self.backend.stop()
+        for path in released:
+            self._release(path)
+
+    def status(self):
+        with self._lock:
+            return {
+                "playing": self._current[0] if self._current else None,
+                "queue": [title for title, _ in self._queue],
+            }
+
+    def close(self):
+        self.stop()
+        self._ended.put(None)
+        self.backend.close()
+
+    def _release(self, path):
+        if self.on_release is not None:
+            try:
+                self.on_release(path)
+            except Exception as e:
+                logging.error(f"Failed to release {path}: {e}")
+
+    def _start(self, title, handle, path):
+        if self._current is not None:
+            self._release(self._current[2])
+        self._current = (title, handle, path)
+        self.backend.play(handle)
+        self._preload()
+
+    def _preload(self):
+        # Prepare the head of the queue while the current track plays
+        if not self._queue or (self._prepared and self._prepared[0] == self._queue[0][1]):
+            return
+        path = self._queue[0][1]
+        try:
+            self._prepared = (path, self.backend.prepare(path))
+        except Exception as e:
+            logging.error(f"Failed to load {path}: {e}")
+            self._prepared = None
+
+    def _advance(self):
+        while self._queue:
+            title, path = self._queue.popleft()
+            if self._prepared and self._prepared[0] == path:
+                handle = self._prepared[1]
+            else:
+                try:
+                    handle = self.backend.prepare(path)
+                except Exception as e:
+                    logging.error(f"Skipping {title}, failed to load: {e}")
+                    self._release(path)
+                    continue
+            self._prepared = None
+            self._start(title, handle, path)
+            logging.debug(f"Playing {title}")
+            return
+        if self._current is not None:
+            self._release(self._current[2])
+        self._current = None
+        self.backend.stop()
+
+    def _run(self):
+        while True:
+            handle = self._ended.get()
+            if handle is None:
+                return
+            with self._lock:
+                # An end event for a track already skipped or replaced is stale
+                if self._current is None or self._current[1] is not handle:
+                    continue
+                logging.debug(f"{self._current[0]} has finished playing")
+                self._advance()
@@ -0,0 +1,100 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from helpers import convert_to_xlam_tool
+
+TASK_INSTRUCTION = (
+    "You are an expert in composing functions for a Windows Automation Assistant. "
+    "Your task is to generate JSON-formatted tool calls based on user commands. "
+    "The output MUST strictly adhere to the following JSON format, and NO other text MUST be included. "
+    "If no function call is needed, please make tool_calls an empty list '[]'. "
+    "and remember that programs are stored at C:\\Program Files. "
+    "When the same action applies to many files, emit one batch call (batch_rename, delete_files, "
+    "create_files, or copy_file/move_file with pairs) instead of one call per file."
+)
+
+FORMAT_INSTRUCTION = (
+    "The output MUST strictly adhere to the following JSON format, and NO other text MUST be included.\n"
+    "The example format is as follows. Please make sure the parameter type is correct. "
+    "If no function call is needed, please make tool_calls an empty list '[]'.\n"
+    "```json\n"
+    '{"tool_calls":[{"name":"func_name1","arguments":{"argument1":"value1","argument2":"value2"}}, '
+    "... (more tool calls as required)]}\n"
+    "```"
+)
+
+QUERY_SUFFIX = "\n[END OF QUERY]"
+
+
+def catalog_json(tools):
+    # Minified and deterministic so the same catalog always yields the same bytes
+    return json.dumps(convert_to_xlam_tool(tools), separators=(",", ":"))
+
+
+def build_prompt_prefix(tools):
+    return (
+        "[BEGIN OF TASK INSTRUCTION]\n"
+        f"{TASK_INSTRUCTION}\n"
+        "[END OF TASK INSTRUCTION]\n"
+        "[BEGIN OF AVAILABLE TOOLS]\n"
+        f"{catalog_json(tools)}\n"
+        "[END OF AVAILABLE TOOLS]\n"
+        "[BEGIN OF FORMAT INSTRUCTION]\n"
+        f"{FORMAT_INSTRUCTION}\n"
+        "[END OF FORMAT INSTRUCTION]\n"
+        "[BEGIN OF QUERY]\n"
+    )
+
+
+class PromptBuilder:
+    # The static part of the prompt is rendered once per tool catalog (or per
+    # selected subset of it) and only the query is spliced in per request,
+    # which keeps the prefix byte-stable for provider-side prompt caching.
+    def __init__(self, tools, selector=None, max_prefixes=64):
+        self.max_prefixes = max_prefixes
+        self._lock = threading.Lock()
+        self.set_tools(tools, selector)
+
+    def set_tools(self, tools, selector=None):
+        with self._lock:
+            self.tools = tools
+            self.selector = selector
+            self.prefix = build_prompt_prefix(tools)
+            self.catalog_hash = hashlib.sha256(self.prefix.encode("utf-8")).hexdigest()
+            self._prefixes = OrderedDict()
+            self.stats = {"prompts": 0, "prompt_bytes": 0, "full_prompt_bytes": 0}
+
+    def prefix_for(self, selected):
+        if selected is self.tools:
+            return self.prefix
+        key = tuple(tool["name"] for tool in selected)
+        with self._lock:
+            prefix = self._prefixes.get(key)
+            if prefix is not None:
+                self._prefixes.move_to_end(key)
+                return prefix
+        prefix = build_prompt_prefix(selected)
+        with self._lock:
+            self._prefixes[key] = prefix
+            if len(self._prefixes) > self.max_prefixes:
+                self._prefixes.popitem(last=False)
+        return prefix
+
+    def build(self, query):
+        selected = self.selector.select(query) if self.selector else self.tools
+        prompt = self.prefix_for(selected) + query + QUERY_SUFFIX
+        with self._lock:
+            self.stats["prompts"] += 1
+            self.stats["prompt_bytes"] += len(prompt)
+            self.stats["full_prompt_bytes"] += len(self.prefix) + len(query) + len(QUERY_SUFFIX)
+        return prompt
+
+    def metrics(self):
+        with self._lock:
+            metrics = dict(self.stats)
+        full = metrics["full_prompt_bytes"]
+        metrics["prompt_size_reduction"] = 1 - metrics["prompt_bytes"] / full if full else 0.0
+        if self.selector:
+            metrics.update(self.selector.metrics())
+        return metrics
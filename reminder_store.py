@@ -0,0 +1,155 @@
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+
+class ReminderStore:
+    # SQLite in WAL mode, indexed by next fire time (epoch seconds) so the
+    # due-soon window can be read with a single index range scan.
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS reminders ("
+            "id INTEGER PRIMARY KEY, "
+            "fire_at REAL NOT NULL, "
+            "title TEXT NOT NULL, "
+            "message TEXT, "
+            "sound TEXT, "
+            "schedule_time TEXT, "
+            "frequency TEXT)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS reminders_fire_at ON reminders (fire_at)")
+
+    def add(self, fire_at, title, message, sound, schedule_time=None, frequency=None):
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO reminders (fire_at, title, message, sound, schedule_time, frequency) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (fire_at, title, message, sound, schedule_time, frequency),
+            )
+            return cursor.lastrowid
+
+    def add_many(self, rows):
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.executemany(
+                "INSERT INTO reminders (fire_at, title, message, sound, schedule_time, frequency) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.execute("COMMIT")
+
+    def due_between(self, after, until):
+        # Reminders with after < fire_at <= until; after=None means no lower bound
+        with self._lock:
+            if after is None:
+                cursor = self._conn.execute(
+                    "SELECT * FROM reminders WHERE fire_at <= ? ORDER BY fire_at", (until,)
+                )
+            else:
+                cursor = self._conn.execute(
+                    "SELECT * FROM reminders WHERE fire_at > ? AND fire_at <= ? ORDER BY fire_at",
+                    (after, until),
+                )
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def reschedule(self, reminder_id, fire_at):
+        with self._lock:
+            self._conn.execute("UPDATE reminders SET fire_at = ? WHERE id = ?", (fire_at, reminder_id))
+
+    def remove(self, reminder_id):
+        with self._lock:
+            self._conn.execute("DELETE FROM reminders WHERE id = ?", (reminder_id,))
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM reminders").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def next_fire_time(schedule_time, frequency, previous=None):
+    # Next wall-clock fire time (epoch seconds) of a recurring reminder.
+    # Weekly reminders keep the weekday of their previous fire time.
+    now = datetime.now()
+    if frequency == "hourly":
+        return (now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)).timestamp()
+    if frequency == "weekly" and previous is not None:
+        occurrence = datetime.fromtimestamp(previous) + timedelta(weeks=1)
+        while occurrence <= now:
+            occurrence += timedelta(weeks=1)
+        return occurrence.timestamp()
+    target = datetime.strptime(schedule_time, "%H:%M").time()
+    occurrence = datetime.combine(now.date(), target)
+    if occurrence <= now:
+        occurrence += timedelta(days=1)
+    if frequency == "workdays":
+        while occurrence.weekday() >= 5:
+            occurrence += timedelta(days=1)
+    return occurrence.timestamp()
+
+
+class ReminderService:
+    # Keeps only reminders due within `window` seconds in the scheduler and
+    # pulls the next slice from the store before the current one runs out.
+    def __init__(self, store, scheduler, fire, window=3600):
+        self.store = store
+        self.scheduler = scheduler
+        self.fire = fire
+        self.window = window
+        self._lock = threading.Lock()
+        self._loaded_until = None
+
+    def start(self):
+        self._load_window()
+
+    def add(self, fire_at, title, message, sound, schedule_time=None, frequency=None):
+        # Insert under the lock so a concurrent window load can't schedule it twice
+        with self._lock:
+            reminder_id = self.store.add(fire_at, title, message, sound, schedule_time, frequency)
+            if self._loaded_until is not None and fire_at <= self._loaded_until:
+                self._schedule({
+                    "id": reminder_id,
+                    "fire_at": fire_at,
+                    "title": title,
+                    "message": message,
+                    "sound": sound,
+                    "schedule_time": schedule_time,
+                    "frequency": frequency,
+                })
+        return reminder_id
+
+    def _schedule(self, row):
+        self.scheduler.call_later(row["fire_at"] - time.time(), self._fire, row)
+
+    def _load_window(self):
+        with self._lock:
+            until = time.time() + self.window
+            rows = self.store.due_between(self._loaded_until, until)
+            for row in rows:
+                self._schedule(row)
+            self._loaded_until = until
+        logging.debug(f"Loaded {len(rows)} stored reminders due in the next {self.window} seconds")
+        self.scheduler.call_later(self.window / 2, self._load_window)
+
+    def _fire(self, row):
+        try:
+            self.fire(row["title"], row["message"], row["sound"])
+        finally:
+            if row["frequency"]:
+                fire_at = next_fire_time(row["schedule_time"], row["frequency"], row["fire_at"])
+                self.store.reschedule(row["id"], fire_at)
+                with self._lock:
+                    if fire_at <= self._loaded_until:
+                        self._schedule(dict(row, fire_at=fire_at))
+            else:
+                self.store.remove(row["id"])
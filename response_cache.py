@@ -0,0 +1,109 @@
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Tool calls that must always come from a fresh model response
+DESTRUCTIVE_TOOLS = {"delete_file", "delete_files", "system_control"}
+
+
+def normalize_command(command):
+    # Case is kept because it can matter in file contents, paths and messages
+    return re.sub(r"\s+", " ", command).strip().rstrip(".!?")
+
+
+class ResponseCache:
+    # LRU cache of command -> tool_calls JSON keyed on the normalized command
+    # and the prompt catalog hash, so changing the tools invalidates entries.
+    def __init__(self, max_entries=256, ttl=3600, path=None, bypass_tools=DESTRUCTIVE_TOOLS):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.path = path
+        self.bypass_tools = set(bypass_tools)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "bypassed": 0}
+        if path:
+            self._load()
+
+    def _key(self, command, catalog_hash):
+        return f"{catalog_hash}:{normalize_command(command)}"
+
+    def get(self, command, catalog_hash, bypass=False):
+        if bypass:
+            return None
+        key = self._key(command, catalog_hash)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats["misses"] += 1
+                return None
+            stored_at, payload = entry
+            if time.time() - stored_at > self.ttl:
+                del self._entries[key]
+                self.stats["expired"] += 1
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+        # Decode per hit so callers can't mutate the cached copy
+        return json.loads(payload)
+
+    def put(self, command, catalog_hash, tool_calls_json):
+        names = {call.get("name") for call in tool_calls_json.get("tool_calls", [])}
+        if names & self.bypass_tools:
+            with self._lock:
+                self.stats["bypassed"] += 1
+            return False
+        key = self._key(command, catalog_hash)
+        with self._lock:
+            self._entries[key] = (time.time(), json.dumps(tool_calls_json))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        if self.path:
+            self._save()
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        if self.path:
+            self._save()
+
+    def metrics(self):
+        with self._lock:
+            metrics = dict(self.stats, entries=len(self._entries))
+        lookups = metrics["hits"] + metrics["misses"]
+        metrics["hit_rate"] = metrics["hits"] / lookups if lookups else 0.0
+        return metrics
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                stored = json.load(f)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable response cache {self.path}: {e}")
+            return
+        now = time.time()
+        for key, stored_at, payload in stored[-self.max_entries:]:
+            if now - stored_at <= self.ttl:
+                self._entries[key] = (stored_at, payload)
+
+    def _save(self):
+        with self._lock:
+            stored = [[key, stored_at, payload] for key, (stored_at, payload) in self._entries.items()]
+        temp_path = f"{self.path}.tmp"
+        with self._save_lock:
+            try:
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump(stored, f)
+                os.replace(temp_path, self.path)
+            except OSError as e:
+                logging.warning(f"Failed to persist response cache: {e}")
@@ -0,0 +1,101 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+
+class TimerHandle:
+    __slots__ = ("deadline", "seq", "callback", "args", "cancelled")
+
+    def __init__(self, deadline, seq, callback, args):
+        self.deadline = deadline
+        self.seq = seq
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def __lt__(self, other):
+        return (self.deadline, self.seq) < (other.deadline, other.seq)
+
+
+class TimerScheduler:
+    # One thread sleeps until the earliest deadline in a min-heap. Cancelled
+    # entries stay in the heap and are skipped when popped; the heap is
+    # rebuilt once they make up more than half of it.
+    def __init__(self):
+        self._heap = []
+        self._counter = itertools.count()
+        self._cancelled = 0
+        self._condition = threading.Condition()
+        self._stopped = False
+        self._thread = None
+
+    def start(self):
+        with self._condition:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stopped = False
+            self._thread = threading.Thread(target=self._run, name="timer-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+        self._thread = None
+
+    def call_at(self, deadline, callback, *args):
+        # deadline is a time.monotonic() timestamp
+        with self._condition:
+            handle = TimerHandle(deadline, next(self._counter), callback, args)
+            heapq.heappush(self._heap, handle)
+            if self._heap[0] is handle:
+                self._condition.notify()
+        return handle
+
+    def call_later(self, delay, callback, *args):
+        return self.call_at(time.monotonic() + max(0, delay), callback, *args)
+
+    def cancel(self, handle):
+        with self._condition:
+            if handle.cancelled:
+                return False
+            handle.cancelled = True
+            self._cancelled += 1
+            if self._cancelled > len(self._heap) // 2:
+                self._heap = [h for h in self._heap if not h.cancelled]
+                heapq.heapify(self._heap)
+                self._cancelled = 0
+            self._condition.notify()
+            return True
+
+    def pending(self):
+        with self._condition:
+            return len(self._heap) - self._cancelled
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._stopped:
+                    while self._heap and self._heap[0].cancelled:
+                        heapq.heappop(self._heap)
+                        self._cancelled -= 1
+                    if not self._heap:
+                        self._condition.wait()
+                        continue
+                    timeout = self._heap[0].deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    self._condition.wait(timeout)
+                if self._stopped:
+                    return
+                handle = heapq.heappop(self._heap)
+                # Mark as done so a late cancel() is a no-op
+                handle.cancelled = True
+            try:
+                handle.callback(*handle.args)
+            except Exception as e:
+                logging.error(f"Timer callback failed: {e}")
@@ -0,0 +1,185 @@
+import argparse
+import asyncio
+import json
+import logging
+import os
+import signal
+import threading
+import time
+from collections import OrderedDict
+from queue import Full
+from typing import Optional
+
+import uvicorn
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+from assistant import Assistant
+from tools import signal_handler
+
+# Finished commands kept for get-result; the oldest are dropped first
+MAX_KEPT_COMMANDS = 1000
+
+# Longest a get-result request may wait for new output
+MAX_WAIT_SECONDS = 60
+
+class CommandRequest(BaseModel):
+    command: str
+    # Commands with the same key run their tools in submission order, e.g.
+    # one key per client session; without one a command runs alongside
+    # everything else
+    key: Optional[str] = None
+    # Ask the model again instead of replaying a cached translation
+    fresh: bool = False
+
+class CommandRecord:
+    # Output of one command. Written from the assistant's loop and tool
+    # threads, read by request handlers on uvicorn's event loop, which are
+    # woken through that loop rather than by polling.
+    def __init__(self, command, loop):
+        self.id = None
+        self.command = command
+        self.status = "pending"
+        self.output = []
+        self.submitted_at = time.time()
+        self.finished_at = None
+        self._loop = loop
+        self._changed = asyncio.Event()
+
+    def write(self, text):
+        self.output.append(text.rstrip("\n"))
+        self._loop.call_soon_threadsafe(self._notify)
+
+    def finish(self, success):
+        self.status = "done" if success else "failed"
+        self.finished_at = time.time()
+        self._loop.call_soon_threadsafe(self._notify)
+
+    @property
+    def finished(self):
+        return self.finished_at is not None
+
+    def _notify(self):
+        # A fresh event per change, so every waiter sees the next one
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def wait(self, seen, timeout):
+        # Until there is output past index `seen`, the command finishes or
+        # the timeout expires
+        deadline = self._loop.time() + timeout
+        while len(self.output) <= seen and not self.finished:
+            remaining = deadline - self._loop.time()
+            if remaining <= 0:
+                return
+            try:
+                await asyncio.wait_for(self._changed.wait(), remaining)
+            except asyncio.TimeoutError:
+                return
+
+    def to_dict(self, since=0):
+        output = self.output[since:]
+        return {
+            "id": self.id,
+            "command": self.command,
+            "status": self.status,
+            "output": output,
+            "next": since + len(output),
+            "seconds": round((self.finished_at or time.time()) - self.submitted_at, 3),
+        }
+
+def create_app(assistant):
+    app = FastAPI(title="Assistant")
+    records = OrderedDict()
+    lock = threading.Lock()
+
+    def find(command_id):
+        with lock:
+            record = records.get(command_id)
+        if record is None:
+            raise HTTPException(status_code=404, detail=f"Unknown command {command_id}")
+        return record
+
+    def forget_finished():
+        with lock:
+            for command_id in [i for i, r in records.items() if r.finished][:len(records) - MAX_KEPT_COMMANDS]:
+                del records[command_id]
+
+    @app.post("/commands", status_code=202)
+    async def submit_command(request: CommandRequest):
+        if assistant.mistral_client is None:
+            raise HTTPException(status_code=503, detail="Mistral client not initialized")
+        record = CommandRecord(request.command, asyncio.get_running_loop())
+        try:
+            record.id = assistant.submit(request.command, output=record.write, on_done=record.finish,
+                                         key=request.key, fresh=request.fresh)
+        except Full:
+            raise HTTPException(status_code=429, detail="Too many pending commands")
+        with lock:
+            records[record.id] = record
+        if len(records) > MAX_KEPT_COMMANDS:
+            forget_finished()
+        return {"id": record.id, "status": record.status}
+
+    @app.get("/commands/{command_id}")
+    async def get_result(command_id: int, since: int = 0, wait: float = 0):
+        # With wait > 0 this long-polls: it returns as soon as there is output
+        # past `since` or the command has finished
+        record = find(command_id)
+        if wait > 0:
+            await record.wait(since, min(wait, MAX_WAIT_SECONDS))
+        return record.to_dict(since)
+
+    @app.get("/commands/{command_id}/stream")
+    async def stream_results(command_id: int):
+        # Newline-delimited JSON: {"output": line} as each line arrives, then
+        # {"status": ..., "seconds": ...} once the command has finished
+        record = find(command_id)
+
+        async def lines():
+            sent = 0
+            while True:
+                await record.wait(sent, MAX_WAIT_SECONDS)
+                for line in record.output[sent:]:
+                    yield json.dumps({"output": line}) + "\n"
+                    sent += 1
+                if record.finished and sent == len(record.output):
+                    final = record.to_dict(sent)
+                    yield json.dumps({"status": final["status"], "seconds": final["seconds"]}) + "\n"
+                    return
+        return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+    @app.get("/metrics")
+    async def metrics():
+        with lock:
+            pending = sum(1 for record in records.values() if not record.finished)
+            kept = len(records)
+        return {"pipeline": assistant.pipeline.metrics(), "pending_commands": pending, "kept_commands": kept}
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the assistant without a window, behind a local HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--uds", default=None, help="Listen on this Unix socket instead of host:port")
+    parser.add_argument("--api-key", default=os.environ.get("MISTRAL_API_KEY"),
+                        help="Mistral API key (default: $MISTRAL_API_KEY)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+    if not args.api_key:
+        parser.error("a Mistral API key is required (--api-key or MISTRAL_API_KEY)")
+
+    assistant = Assistant(output=logging.info)
+    assistant.connect(args.api_key)
+    uvicorn.run(create_app(assistant), host=args.host, port=args.port, uds=args.uds, log_level="info")
+
+    # uvicorn replaces the tools' signal handlers while it runs, so shut the
+    # tools down the same way once it has stopped
+    assistant.pipeline.stop()
+    signal_handler(signal.SIGTERM, None)
+
+if __name__ == "__main__":
+    main()
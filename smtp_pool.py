@@ -0,0 +1,253 @@
+import base64
+import email.policy
+import email.utils
+import logging
+import mimetypes
+import os
+import queue
+import re
+import smtplib
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from email.header import Header
+from email.mime.base import MIMEBase
+from email.mime.text import MIMEText
+
+# Connections idle longer than this are closed instead of reused
+IDLE_TIMEOUT = 60
+# Attachment bytes encoded per step; a multiple of 57 so every base64 line is full
+ATTACHMENT_CHUNK = 57 * 16 * 1024
+LINE_LENGTH = 76
+# DATA is written in pieces of about this size; many small writes stall on Nagle
+SEND_BUFFER = 256 * 1024
+
+_POLICY = email.policy.compat32.clone(linesep="\r\n")
+_LEADING_DOT = re.compile(rb"^\.", re.MULTILINE)
+
+
+def _header_bytes(part):
+    return b"".join(_POLICY.fold_binary(name, value) for name, value in part.items()) + b"\r\n"
+
+
+def _base64_lines(data):
+    encoded = base64.b64encode(data)
+    return b"\r\n".join(encoded[i:i + LINE_LENGTH] for i in range(0, len(encoded), LINE_LENGTH)) + b"\r\n"
+
+
+class OutgoingMessage:
+    # A multipart message whose attachments are read and base64-encoded
+    # chunk by chunk while it is sent, so file size does not cost memory.
+    # chunks() can be called again to resend after a reconnect.
+    def __init__(self, sender, recipients, subject, body, attachments=()):
+        self.sender = sender
+        if isinstance(recipients, str):
+            recipients = recipients.split(",")
+        self.recipients = [recipient.strip() for recipient in recipients if recipient.strip()]
+        if not self.recipients:
+            raise ValueError("No recipient given")
+        self.subject = subject or ""
+        self.body = body or ""
+        self.attachments = [path for path in attachments if path]
+        for path in self.attachments:
+            if not os.path.isfile(path):
+                raise FileNotFoundError(f"Attachment not found: {path}")
+
+    def _attachment_header(self, path):
+        content_type, encoding = mimetypes.guess_type(path)
+        if content_type is None or encoding is not None:
+            content_type = "application/octet-stream"
+        part = MIMEBase(*content_type.split("/", 1))
+        del part["MIME-Version"]
+        name = os.path.basename(path)
+        part.add_header("Content-Disposition", "attachment",
+                        filename=name if name.isascii() else ("utf-8", "", name))
+        part["Content-Transfer-Encoding"] = "base64"
+        return _header_bytes(part)
+
+    def chunks(self):
+        boundary = f"=={uuid.uuid4().hex}=="
+        subject = self.subject if self.subject.isascii() else Header(self.subject, "utf-8").encode()
+        headers = [
+            ("From", self.sender),
+            ("To", ", ".join(self.recipients)),
+            ("Subject", subject),
+            ("Date", email.utils.formatdate(localtime=True)),
+            ("Message-ID", email.utils.make_msgid()),
+            ("MIME-Version", "1.0"),
+            ("Content-Type", f'multipart/mixed; boundary="{boundary}"'),
+        ]
+        yield b"".join(_POLICY.fold_binary(name, value) for name, value in headers) + b"\r\n"
+        delimiter = f"--{boundary}\r\n".encode()
+        text = MIMEText(self.body, "plain", "utf-8")
+        del text["MIME-Version"]
+        # Base64 never starts a line with ".", the text part may
+        yield delimiter + _LEADING_DOT.sub(b"..", text.as_bytes(policy=_POLICY)) + b"\r\n"
+        for path in self.attachments:
+            yield delimiter + self._attachment_header(path)
+            with open(path, "rb") as f:
+                while data := f.read(ATTACHMENT_CHUNK):
+                    yield _base64_lines(data)
+        yield f"--{boundary}--\r\n".encode()
+
+
+def send_message(conn, message):
+    # smtplib.sendmail wants the whole message as one string; this streams
+    # DATA from message.chunks() instead
+    code, reply = conn.mail(message.sender)
+    if code != 250:
+        conn.rset()
+        raise smtplib.SMTPSenderRefused(code, reply, message.sender)
+    refused = {}
+    for recipient in message.recipients:
+        code, reply = conn.rcpt(recipient)
+        if code not in (250, 251):
+            refused[recipient] = (code, reply)
+    if len(refused) == len(message.recipients):
+        conn.rset()
+        raise smtplib.SMTPRecipientsRefused(refused)
+    code, reply = conn.docmd("DATA")
+    if code != 354:
+        conn.rset()
+        raise smtplib.SMTPDataError(code, reply)
+    pending = []
+    size = 0
+    for chunk in message.chunks():
+        pending.append(chunk)
+        size += len(chunk)
+        if size >= SEND_BUFFER:
+            conn.send(b"".join(pending))
+            pending = []
+            size = 0
+    pending.append(b".\r\n")
+    conn.send(b"".join(pending))
+    code, reply = conn.getreply()
+    if code != 250:
+        raise smtplib.SMTPDataError(code, reply)
+    return refused
+
+
+def _close(conn):
+    try:
+        conn.quit()
+    except (smtplib.SMTPException, OSError):
+        conn.close()
+
+
+class SmtpPool:
+    # Logged-in SMTP sessions kept open between sends. `connect` returns a
+    # ready smtplib.SMTP (STARTTLS and login done); at most `size` are open.
+    def __init__(self, connect, size=1, idle_timeout=IDLE_TIMEOUT):
+        self.connect = connect
+        self.idle_timeout = idle_timeout
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _acquire(self):
+        self._slots.acquire()
+        self.prune()
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()[0], True
+        try:
+            return self.connect(), False
+        except BaseException:
+            self._slots.release()
+            raise
+
+    def _release(self, conn, broken=False):
+        if broken:
+            _close(conn)
+        else:
+            with self._lock:
+                self._idle.append((conn, time.monotonic()))
+        self._slots.release()
+
+    def prune(self):
+        # Close sessions the server has probably timed out anyway
+        now = time.monotonic()
+        with self._lock:
+            expired = [conn for conn, used in self._idle if now - used > self.idle_timeout]
+            self._idle = [(conn, used) for conn, used in self._idle if now - used <= self.idle_timeout]
+        for conn in expired:
+            _close(conn)
+
+    def send(self, message):
+        conn, reused = self._acquire()
+        try:
+            try:
+                refused = send_message(conn, message)
+            except (smtplib.SMTPServerDisconnected, ConnectionError) as e:
+                if not reused:
+                    raise
+                # The server dropped a pooled session while it sat idle
+                logging.debug(f"Pooled SMTP session was closed ({e}), reconnecting")
+                _close(conn)
+                conn = self.connect()
+                refused = send_message(conn, message)
+        except (smtplib.SMTPResponseException, smtplib.SMTPRecipientsRefused):
+            # Refused sender, recipients or data: the session itself is fine
+            self._release(conn)
+            raise
+        except BaseException:
+            self._release(conn, broken=True)
+            raise
+        self._release(conn)
+        return refused
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            _close(conn)
+
+
+class SendQueue:
+    # Background senders that drain queued messages over the pool's
+    # sessions, so a burst of messages shares one login
+    def __init__(self, pool, workers=1):
+        self.pool = pool
+        self.workers = workers
+        self._queue = queue.Queue()
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def submit(self, message):
+        future = Future()
+        self._queue.put((message, future))
+        with self._lock:
+            if not self._threads:
+                for i in range(self.workers):
+                    thread = threading.Thread(target=self._run, name=f"smtp-sender-{i}", daemon=True)
+                    thread.start()
+                    self._threads.append(thread)
+        return future
+
+    def _run(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=self.pool.idle_timeout)
+            except queue.Empty:
+                self.pool.prune()
+                continue
+            if item is None:
+                return
+            message, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self.pool.send(message))
+            except Exception as e:
+                logging.error(f"Failed to send email to {', '.join(message.recipients)}: {e}")
+                future.set_exception(e)
+
+    def close(self):
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join()
+        self.pool.close()
@@ -0,0 +1,102 @@
+import json
+import logging
+import re
+
+TOOL_CALLS_ARRAY = re.compile(r'"tool_calls"\s*:\s*\[')
+
+
+class ToolCallStreamParser:
+    # Incrementally scans the ```json block of a streamed response and emits
+    # each element of the tool_calls array as soon as its closing brace arrives.
+    def __init__(self):
+        self.text = ""
+        self.done = False
+        self._block_start = None
+        self._pos = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._element_start = None
+
+    def feed(self, chunk):
+        self.text += chunk
+        calls = []
+        if self.done:
+            return calls
+        if self._block_start is None:
+            marker = self.text.find("```json")
+            if marker == -1:
+                return calls
+            self._block_start = marker + len("```json")
+        if self._pos is None:
+            match = TOOL_CALLS_ARRAY.search(self.text, self._block_start)
+            if not match:
+                return calls
+            self._pos = match.end()
+
+        text = self.text
+        for i in range(self._pos, len(text)):
+            char = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                if self._depth == 0:
+                    self._element_start = i
+                self._depth += 1
+            elif char in "}]":
+                if self._depth == 0:
+                    # Closing bracket of the tool_calls array itself
+                    self.done = True
+                    self._pos = i + 1
+                    return calls
+                self._depth -= 1
+                if self._depth == 0:
+                    element = text[self._element_start:i + 1]
+                    try:
+                        calls.append(json.loads(element))
+                    except json.JSONDecodeError as e:
+                        logging.error(f"Skipping malformed streamed tool call: {e}")
+        self._pos = len(text)
+        return calls
+
+
+def stream_tool_calls(client, agent_id, prompt, on_tool_call):
+    # Streams an agent completion, handing each complete tool call to
+    # on_tool_call while the rest of the response is still arriving.
+    # Returns the full response text.
+    parser = ToolCallStreamParser()
+    response = client.agents.stream(
+        agent_id=agent_id,
+        messages=[{"role": "user", "content": prompt},],
+    )
+    for event in response:
+        chunk = event.data.choices[0].delta.content
+        if not chunk:
+            continue
+        for call in parser.feed(chunk):
+            on_tool_call(call)
+    return parser.text
+
+
+async def stream_tool_calls_async(client, agent_id, prompt, on_tool_call):
+    # stream_tool_calls for an event loop: the response is awaited chunk by
+    # chunk (Mistral's agents.stream_async), so no thread waits on the model
+    parser = ToolCallStreamParser()
+    response = await client.agents.stream_async(
+        agent_id=agent_id,
+        messages=[{"role": "user", "content": prompt},],
+    )
+    async for event in response:
+        chunk = event.data.choices[0].delta.content
+        if not chunk:
+            continue
+        for call in parser.feed(chunk):
+            on_tool_call(call)
+    return parser.text
@@ -0,0 +1,68 @@
+import io
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+from archives import extract_members, list_archive, safe_target
+
+
+def make_zip(path, members):
+    with zipfile.ZipFile(path, "w") as zf:
+        for name, data in members.items():
+            zf.writestr(name, data)
+
+
+def make_tar(path, members, links=()):
+    with tarfile.open(path, "w:gz") as tf:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tf.addfile(info, io.BytesIO(data))
+        for name, target in links:
+            info = tarfile.TarInfo(name)
+            info.type = tarfile.SYMTYPE
+            info.linkname = target
+            tf.addfile(info)
+
+
+@pytest.mark.parametrize("name", ["../evil.txt", "a/../../evil.txt", "/etc/evil", "C:/evil.txt", "..\\evil.txt", ""])
+def test_safe_target_rejects_escaping_names(tmp_path, name):
+    assert safe_target(str(tmp_path), name) is None
+
+
+def test_safe_target_keeps_nested_names(tmp_path):
+    assert safe_target(str(tmp_path), "./a/b.txt") == os.path.join(str(tmp_path), "a", "b.txt")
+
+
+def test_zip_traversal_members_are_rejected(tmp_path):
+    archive = str(tmp_path / "a.zip")
+    out = tmp_path / "out"
+    make_zip(archive, {"ok/file.txt": b"fine", "../evil.txt": b"bad", "/abs.txt": b"bad"})
+    stats = extract_members(archive, str(out))
+    assert sorted(stats["rejected"]) == ["../evil.txt", "/abs.txt"]
+    assert stats["members"] == 1
+    assert (out / "ok" / "file.txt").read_bytes() == b"fine"
+    assert not (tmp_path / "evil.txt").exists()
+
+
+def test_tar_links_and_traversal_are_rejected(tmp_path):
+    archive = str(tmp_path / "a.tar.gz")
+    out = tmp_path / "out"
+    make_tar(archive, {"ok.txt": b"fine", "../evil.txt": b"bad"}, links=[("link", "/etc/passwd")])
+    stats = extract_members(archive, str(out))
+    assert sorted(stats["rejected"]) == ["../evil.txt", "link"]
+    assert os.listdir(out) == ["ok.txt"]
+    assert not (tmp_path / "evil.txt").exists()
+
+
+def test_include_and_exclude_select_members(tmp_path):
+    archive = str(tmp_path / "a.zip")
+    out = tmp_path / "out"
+    make_zip(archive, {"docs/a.txt": b"a", "docs/b.log": b"b", "img/c.txt": b"c"})
+    stats = extract_members(archive, str(out), include=["*.txt"], exclude=["img/*"])
+    assert stats["members"] == 1 and stats["skipped"] == 2
+    assert (out / "docs" / "a.txt").exists()
+    assert not (out / "img").exists()
+    assert [m["name"] for m in list_archive(archive)] == ["docs/a.txt", "docs/b.log", "img/c.txt"]
@@ -0,0 +1,123 @@
+import os
+import threading
+
+import pytest
+
+from audio_cache import AudioCache, normalize_query
+
+
+class FakeDownloader:
+    # Writes `size` bytes unique to the query; counts calls per query
+    def __init__(self, size=100):
+        self.size = size
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def __call__(self, query, directory):
+        with self.lock:
+            self.calls[query] = self.calls.get(query, 0) + 1
+        path = os.path.join(directory, "track.mp3")
+        with open(path, "wb") as f:
+            f.write(query.encode().ljust(self.size, b"\0"))
+        return path
+
+
+@pytest.fixture
+def downloader():
+    return FakeDownloader()
+
+
+def test_normalize_query():
+    assert normalize_query("Bohemian Rhapsody - Queen") == normalize_query("bohemian  rhapsody queen")
+
+
+def test_hit_does_not_download_again(tmp_path, downloader):
+    cache = AudioCache(str(tmp_path), download=downloader)
+    first = cache.get("Song A")
+    assert cache.get("song a") == first
+    assert cache.lookup("SONG  A") == first
+    assert downloader.calls == {"Song A": 1}
+    cache.close()
+
+
+def test_least_recently_played_is_evicted_past_max_bytes(tmp_path, downloader):
+    cache = AudioCache(str(tmp_path), max_bytes=250, download=downloader)
+    a = cache.get("a")
+    b = cache.get("b")
+    cache.get("a")  # a is now the most recently played
+    c = cache.get("c")
+    assert os.path.exists(a) and os.path.exists(c)
+    assert not os.path.exists(b)
+    assert cache.lookup("b") is None
+    assert cache.stats() == {"tracks": 2, "queries": 2, "bytes": 200}
+    cache.close()
+
+
+def test_newest_track_is_kept_even_over_the_cap(tmp_path):
+    cache = AudioCache(str(tmp_path), max_bytes=50, download=FakeDownloader(size=100))
+    path = cache.get("big")
+    assert os.path.exists(path)
+    assert cache.stats()["tracks"] == 1
+    cache.close()
+
+
+def test_pinned_track_is_not_evicted_until_unpinned(tmp_path, downloader):
+    cache = AudioCache(str(tmp_path), max_bytes=250, download=downloader)
+    playing = cache.get("a", pin=True)
+    queued = cache.get("b", pin=True)
+    cache.get("b", pin=True)  # queued twice
+    cache.get("c")
+    assert os.path.exists(playing) and os.path.exists(queued)
+    assert cache.stats()["bytes"] == 300
+    cache.unpin(playing)
+    assert not os.path.exists(playing) and cache.stats()["bytes"] == 200
+    cache.get("d")
+    cache.unpin(queued)
+    assert os.path.exists(queued)
+    cache.unpin(queued)
+    cache.get("e")
+    assert not os.path.exists(queued)
+    cache.close()
+
+
+def test_index_survives_reopen(tmp_path, downloader):
+    cache = AudioCache(str(tmp_path), download=downloader)
+    path = cache.get("a")
+    cache.close()
+    reopened = AudioCache(str(tmp_path), download=downloader)
+    assert reopened.lookup("a") == path
+    assert reopened.stats()["bytes"] == 100
+    reopened.close()
+
+
+def test_concurrent_misses_share_one_download(tmp_path):
+    release = threading.Event()
+
+    class SlowDownloader(FakeDownloader):
+        def __call__(self, query, directory):
+            release.wait(5)
+            return super().__call__(query, directory)
+
+    downloader = SlowDownloader()
+    cache = AudioCache(str(tmp_path), download=downloader)
+    paths = []
+    threads = [threading.Thread(target=lambda: paths.append(cache.get("same song"))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(set(paths)) == 1 and len(paths) == 4
+    assert downloader.calls == {"same song": 1}
+    cache.close()
+
+
+def test_failed_download_is_not_cached(tmp_path):
+    def failing(query, directory):
+        raise FileNotFoundError("no audio")
+
+    cache = AudioCache(str(tmp_path), download=failing)
+    with pytest.raises(FileNotFoundError):
+        cache.get("missing")
+    assert cache.lookup("missing") is None
+    cache.close()
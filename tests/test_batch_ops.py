@@ -0,0 +1,108 @@
+import os
+
+import pytest
+
+from batch_ops import delete_matching, rename_matching, write_files
+
+
+def make(directory, names):
+    for name in names:
+        (directory / name).write_text(name)
+
+
+def contents(directory):
+    return {path.name: path.read_text() for path in directory.iterdir()}
+
+
+def test_swap_goes_through_temporary_names(tmp_path):
+    make(tmp_path, ["a.txt", "b.txt"])
+    summary = rename_matching(str(tmp_path), "*.txt", regex=r"^(a|b)", template=None,
+                              replacement=lambda m: "b" if m.group(1) == "a" else "a")
+    assert summary == {"done": 2, "failed": 0}
+    assert contents(tmp_path) == {"a.txt": "b.txt", "b.txt": "a.txt"}
+
+
+def test_chain_renames_every_file(tmp_path):
+    make(tmp_path, ["1.txt", "2.txt", "3.txt"])
+    summary = rename_matching(str(tmp_path), "*.txt", template="{n}.txt", start=2)
+    assert summary == {"done": 3, "failed": 0}
+    assert contents(tmp_path) == {"2.txt": "1.txt", "3.txt": "2.txt", "4.txt": "3.txt"}
+
+
+def test_collisions_are_reported_and_leave_files_alone(tmp_path):
+    make(tmp_path, ["a.txt", "b.txt", "keep.log"])
+    summary = rename_matching(str(tmp_path), "*.txt", template="keep.log")
+    assert summary["done"] == 0 and summary["failed"] == 2
+    assert contents(tmp_path) == {"a.txt": "a.txt", "b.txt": "b.txt", "keep.log": "keep.log"}
+
+
+def failing_rename(monkeypatch, target):
+    # Fails the first rename of a temporary name onto `target`
+    rename = os.rename
+    failed = []
+
+    def fake(source, destination):
+        if not failed and source.endswith(".renaming") and os.path.basename(destination) == target:
+            failed.append(destination)
+            raise PermissionError("denied")
+        rename(source, destination)
+
+    monkeypatch.setattr(os, "rename", fake)
+
+
+def swap(tmp_path):
+    return rename_matching(str(tmp_path), "*.txt", regex=r"^(a|b)",
+                           replacement=lambda m: "b" if m.group(1) == "a" else "a")
+
+
+def test_failed_second_phase_restores_without_overwriting(tmp_path, monkeypatch):
+    make(tmp_path, ["a.txt", "b.txt"])
+    failing_rename(monkeypatch, "b.txt")
+    summary = swap(tmp_path)
+    assert summary["done"] == 0 and summary["failed"] == 2
+    assert contents(tmp_path) == {"a.txt": "a.txt", "b.txt": "b.txt"}
+
+
+def test_unrestorable_file_is_reported_with_its_temporary_name(tmp_path, monkeypatch):
+    make(tmp_path, ["a.txt", "b.txt"])
+    failing_rename(monkeypatch, "a.txt")
+    summary = swap(tmp_path)
+    assert summary["done"] == 1 and "left as" in summary["errors"]["b.txt"]
+    temporary = summary["errors"]["b.txt"].rsplit("left as ", 1)[1]
+    assert contents(tmp_path) == {"b.txt": "a.txt", temporary: "b.txt"}
+
+
+def test_dry_run_changes_nothing(tmp_path):
+    make(tmp_path, ["a.txt"])
+    summary = rename_matching(str(tmp_path), "*.txt", template="{stem}-{n}{ext}", dry_run=True)
+    assert summary["dry_run"] and summary["preview"] == ["a.txt -> a-1.txt"]
+    assert os.listdir(tmp_path) == ["a.txt"]
+
+
+def test_rename_needs_regex_or_template(tmp_path):
+    with pytest.raises(ValueError):
+        rename_matching(str(tmp_path), "*")
+
+
+def test_no_temporary_names_are_left_behind(tmp_path):
+    make(tmp_path, [f"{n}.txt" for n in range(1, 6)])
+    rename_matching(str(tmp_path), "*.txt", template="{n}.txt", start=0)
+    assert sorted(os.listdir(tmp_path)) == [f"{n}.txt" for n in range(5)]
+
+
+def test_delete_matching_only_removes_matching_files(tmp_path):
+    make(tmp_path, ["a.tmp", "b.txt"])
+    (tmp_path / "sub").mkdir()
+    make(tmp_path / "sub", ["c.tmp"])
+    assert delete_matching(str(tmp_path), "*.tmp") == {"done": 1, "failed": 0}
+    assert delete_matching(str(tmp_path), "*.tmp", recursive=True) == {"done": 1, "failed": 0}
+    assert sorted(os.listdir(tmp_path)) == ["b.txt", "sub"]
+
+
+def test_write_files_creates_parents_and_respects_overwrite(tmp_path):
+    summary = write_files({"x/a.txt": "1", "x/y/b.txt": None}, directory=str(tmp_path))
+    assert summary == {"done": 2, "failed": 0}
+    assert (tmp_path / "x" / "y" / "b.txt").read_text() == ""
+    summary = write_files({"x/a.txt": "2"}, directory=str(tmp_path), overwrite=False)
+    assert summary["failed"] == 1
+    assert (tmp_path / "x" / "a.txt").read_text() == "1"
@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+from file_index import FileIndex
+
+
+@pytest.fixture
+def indexed(tmp_path):
+    root = tmp_path / "root"
+    (root / "a" / "b").mkdir(parents=True)
+    (root / "a" / "b" / "old.txt").write_text("")
+    (root / "top.txt").write_text("")
+    index = FileIndex(str(tmp_path / "index.db"), [str(root)])
+    index.refresh()
+    yield index, root
+    index.close()
+
+
+def bump(path):
+    # Some file systems keep coarse directory mtimes; move them on explicitly
+    stat = os.stat(path)
+    os.utime(path, (stat.st_atime, stat.st_mtime + 5))
+
+
+def test_answers_from_the_index_while_fresh(indexed):
+    index, root = indexed
+    assert {os.path.basename(path) for path in index.search(str(root), "*.txt")} == {"old.txt", "top.txt"}
+    assert index.stats["index_hits"] == 1
+
+
+def test_change_in_a_subfolder_makes_a_recursive_search_fall_back(indexed):
+    index, root = indexed
+    (root / "a" / "b" / "new.txt").write_text("")
+    bump(root / "a" / "b")
+    assert index.search(str(root), "*.txt") is None
+    # A search that does not reach that folder can still use the index
+    assert [os.path.basename(path) for path in index.search(str(root), "*.txt", recursive=False)] == ["top.txt"]
+    index.refresh()
+    assert {os.path.basename(path) for path in index.search(str(root), "*.txt")} == {"old.txt", "new.txt", "top.txt"}
+
+
+def test_unindexed_directory_is_not_fresh(indexed, tmp_path):
+    index, _ = indexed
+    assert index.search(str(tmp_path), "*.txt") is None
@@ -0,0 +1,27 @@
+import threading
+
+from file_walker import walk_files
+
+
+def make_tree(root):
+    for folder in ["a", "a/b", "c"]:
+        (root / folder).mkdir()
+        (root / folder / "x.txt").write_text(folder)
+    (root / "skip.log").write_text("")
+
+
+def test_finds_matches_in_every_folder(tmp_path):
+    make_tree(tmp_path)
+    found = sorted(path[len(str(tmp_path)) + 1:].replace("\\", "/") for path in walk_files(str(tmp_path), "*.txt"))
+    assert found == ["a/b/x.txt", "a/x.txt", "c/x.txt"]
+
+
+def test_caller_event_is_read_but_never_set(tmp_path):
+    make_tree(tmp_path)
+    cancel = threading.Event()
+    assert len(list(walk_files(str(tmp_path), "*.txt", cancel_event=cancel))) == 3
+    assert len(list(walk_files(str(tmp_path), "*.txt", max_results=1, cancel_event=cancel))) == 1
+    assert not cancel.is_set()
+    # The same event can be shared by later walks and still cancel them
+    cancel.set()
+    assert list(walk_files(str(tmp_path), "*.txt", cancel_event=cancel)) == []
@@ -0,0 +1,134 @@
+import re
+
+import pytest
+
+from mail_sync import HeaderCache, MailSync, uid_ranges
+
+
+class FakeImap:
+    # The select/response/uid/logout subset of imaplib.IMAP4 that MailSync
+    # uses, over an in-memory mailbox. Every command is recorded.
+    def __init__(self, server):
+        self.server = server
+        self.commands = []
+
+    def select(self, mailbox, readonly=False):
+        return "OK", [str(len(self.server.uids)).encode()]
+
+    def response(self, code):
+        return code, [str(self.server.uidvalidity).encode()]
+
+    def uid(self, command, *args):
+        self.commands.append((command,) + args)
+        uids = sorted(self.server.uids)
+        if command == "SEARCH":
+            criteria = args[1]
+            if criteria != "ALL":
+                low = int(re.fullmatch(r"UID (\d+):\*", criteria).group(1))
+                # Like a real server, n:* always includes the highest UID
+                uids = [uid for uid in uids if uid >= low] or uids[-1:]
+            return "OK", [" ".join(map(str, uids)).encode()]
+        if command == "FETCH":
+            wanted = set()
+            for part in args[0].split(","):
+                low, _, high = part.partition(":")
+                wanted.update(range(int(low), int(high or low) + 1))
+            data = []
+            for uid in uids:
+                if uid in wanted:
+                    headers = (f"From: sender{uid}@example.com\r\nSubject: Message {uid}\r\n"
+                               f"Date: Mon, 02 Sep 2024 10:{uid % 60:02d}:00 +0000\r\n"
+                               f"Message-ID: <{uid}@example>\r\n\r\n").encode()
+                    data.append((f"{uid} (UID {uid} BODY[HEADER.FIELDS (FROM)] {{{len(headers)}}}".encode(), headers))
+                    data.append(b")")
+            return "OK", data
+        raise AssertionError(f"unexpected command {command}")
+
+    def logout(self):
+        pass
+
+
+class FakeServer:
+    def __init__(self, uids, uidvalidity=1):
+        self.uids = list(uids)
+        self.uidvalidity = uidvalidity
+        self.connections = []
+
+    def connect(self):
+        conn = FakeImap(self)
+        self.connections.append(conn)
+        return conn
+
+    def fetched(self):
+        # UIDs named by the FETCH commands of the latest connection
+        return [args[1] for args in self.connections[-1].commands if args[0] == "FETCH"]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = HeaderCache(str(tmp_path / "mail_cache.db"))
+    yield cache
+    cache.close()
+
+
+def test_uid_ranges():
+    assert uid_ranges([1, 2, 3, 7, 9, 10]) == "1:3,7,9:10"
+    assert uid_ranges([5]) == "5"
+    assert uid_ranges([]) == ""
+
+
+def test_sync_only_fetches_past_high_water_mark(cache):
+    server = FakeServer(range(1, 11))
+    sync = MailSync(server.connect, cache, batch=4)
+    assert sync.sync() == 10
+    assert server.fetched() == ["1:4", "5:8", "9:10"]
+    assert cache.state("INBOX")[:2] == (1, 10)
+
+    # Nothing new: "11:*" still answers the highest UID, which is not refetched
+    assert sync.sync() == 0
+    assert server.fetched() == []
+
+    server.uids.extend([11, 12, 15])
+    assert sync.sync() == 3
+    assert server.fetched() == ["11:12,15"]
+    assert cache.state("INBOX")[1] == 15
+    assert [m["uid"] for m in sync.latest(limit=3)] == [15, 12, 11]
+
+
+def test_sync_drops_messages_deleted_on_server(cache):
+    server = FakeServer(range(1, 6))
+    sync = MailSync(server.connect, cache)
+    sync.sync()
+    server.uids.remove(3)
+    assert sync.sync() == 0
+    assert cache.uids("INBOX") == {1, 2, 4, 5}
+
+
+def test_uidvalidity_change_resets_cache(cache):
+    server = FakeServer(range(1, 6), uidvalidity=1)
+    sync = MailSync(server.connect, cache)
+    sync.sync()
+
+    # The server renumbered the mailbox: old UIDs mean nothing any more
+    server.uidvalidity = 2
+    server.uids = [1, 2]
+    assert sync.sync() == 2
+    assert server.fetched() == ["1:2"]
+    assert cache.state("INBOX")[:2] == (2, 2)
+    assert cache.uids("INBOX") == {1, 2}
+
+
+def test_cache_survives_reopen(tmp_path):
+    path = str(tmp_path / "mail_cache.db")
+    server = FakeServer(range(1, 4))
+    cache = HeaderCache(path)
+    MailSync(server.connect, cache).sync()
+    cache.close()
+
+    cache = HeaderCache(path)
+    try:
+        assert MailSync(server.connect, cache).sync() == 0
+        assert server.fetched() == []
+        assert cache.query("INBOX", sender="sender2")[0]["subject"] == "Message 2"
+    finally:
+        cache.close()
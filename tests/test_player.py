@@ -0,0 +1,172 @@
+import sys
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from player import FakeBackend, PlayerService
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise AssertionError("timed out")
+        time.sleep(0.005)
+
+
+def starts(backend):
+    return [path for event, path, _ in backend.timeline if event == "start"]
+
+
+@pytest.fixture
+def backend():
+    return FakeBackend(default_duration=0.1, load_seconds=0.05)
+
+
+@pytest.fixture
+def service(backend):
+    service = PlayerService(backend)
+    yield service
+    service.close()
+
+
+def test_queue_plays_in_order_without_gaps(backend, service):
+    for name in ("a", "b", "c"):
+        service.enqueue(name.upper(), name)
+    wait_for(lambda: service.status()["playing"] is None)
+    assert starts(backend) == ["a", "b", "c"]
+
+    # The next track was prepared while the previous one played, so the
+    # switch does not include the load time
+    times = {(event, path): at for event, path, at in backend.timeline}
+    for ended, started in (("a", "b"), ("b", "c")):
+        assert times[("start", started)] - times[("end", ended)] < backend.load_seconds
+
+
+def test_enqueue_reports_queue_length(backend, service):
+    assert service.enqueue("A", "a") == 0
+    assert service.enqueue("B", "b") == 1
+    assert service.status() == {"playing": "A", "queue": ["B"]}
+
+
+def test_skip_and_stop():
+    backend = FakeBackend(default_duration=10)
+    service = PlayerService(backend)
+    service.enqueue("A", "a")
+    service.enqueue("B", "b")
+    assert service.skip() == "B"
+    assert service.skip() is None
+    assert starts(backend) == ["a", "b"]
+    service.enqueue("C", "c")
+    service.stop()
+    assert service.status() == {"playing": None, "queue": []}
+    service.close()
+
+
+def test_stale_end_event_is_ignored():
+    backend = FakeBackend(default_duration=10)
+    service = PlayerService(backend)
+    service.enqueue("A", "a")
+    service.enqueue("B", "b")
+    old = backend.prepare("a")
+    service.play("X", "x")
+    # An end event for a track that is no longer current must not advance
+    backend._on_end(old)
+    time.sleep(0.05)
+    assert service.status() == {"playing": "X", "queue": ["B"]}
+    service.close()
+
+
+def test_every_track_is_released_once():
+    released = []
+    backend = FakeBackend(default_duration=10)
+    prepare = backend.prepare
+
+    def flaky_prepare(path):
+        if path == "bad":
+            raise OSError("unreadable")
+        return prepare(path)
+
+    backend.prepare = flaky_prepare
+    service = PlayerService(backend, on_release=released.append)
+    service.enqueue("A", "a")
+    service.enqueue("Bad", "bad")
+    service.enqueue("B", "b")
+    service.enqueue("C", "c")
+    assert released == []
+    service.play("X", "x")  # replaces a
+    assert service.skip() == "B"  # x done, bad fails to load
+    service.stop()  # b playing, c queued
+    assert sorted(released) == ["a", "b", "bad", "c", "x"]
+    with pytest.raises(OSError):
+        service.play("Bad", "bad")
+    assert released.count("bad") == 2
+    service.close()
+
+
+def test_finished_track_is_released():
+    released = []
+    backend = FakeBackend(default_duration=0.05)
+    service = PlayerService(backend, on_release=released.append)
+    service.enqueue("A", "a")
+    wait_for(lambda: released == ["a"])
+    service.close()
+
+
+def test_vlc_backend_reports_the_media_that_ended(monkeypatch):
+    # Minimal python-vlc stand-in: media state events carry their own media
+    from types import SimpleNamespace
+
+    class EventManager:
+        def __init__(self):
+            self.handlers = []
+
+        def event_attach(self, event_type, callback, *args):
+            self.handlers.append((event_type, callback, args))
+
+        def send(self, event_type, state):
+            for attached, callback, args in self.handlers:
+                if attached == event_type:
+                    callback(SimpleNamespace(u=SimpleNamespace(new_state=state)), *args)
+
+    class Media:
+        def __init__(self, path):
+            self.path = path
+            self.events = EventManager()
+
+        def parse_with_options(self, flags, timeout):
+            pass
+
+        def event_manager(self):
+            return self.events
+
+    class Player:
+        def set_media(self, media):
+            self.media = media
+
+        def play(self):
+            pass
+
+        def stop(self):
+            pass
+
+    vlc = SimpleNamespace(
+        EventType=SimpleNamespace(MediaStateChanged="state"),
+        State=SimpleNamespace(Playing="playing", Ended="ended"),
+        MediaParseFlag=SimpleNamespace(local=0),
+        Instance=lambda: SimpleNamespace(media_new=Media, media_player_new=Player),
+    )
+    monkeypatch.setitem(sys.modules, "vlc", vlc)
+    from player import VlcBackend
+
+    backend = VlcBackend()
+    ended = []
+    backend.set_end_callback(ended.append)
+    first = backend.prepare("a")
+    second = backend.prepare("b")
+    backend.play(first)
+    backend.play(second)
+    first.events.send("state", "playing")
+    first.events.send("state", "ended")
+    assert ended == [first]
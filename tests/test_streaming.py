@@ -0,0 +1,85 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+from streaming import ToolCallStreamParser, stream_tool_calls, stream_tool_calls_async
+
+CALLS = [
+    {"name": "create_folder", "arguments": {"folder_path": "notes"}},
+    {"name": "create_file", "arguments": {"file_path": "notes/a.txt", "content": "braces } and \"quotes\" {"}},
+    {"name": "open_file", "arguments": {"file_path": "notes/a.txt"}},
+]
+RESPONSE = "Here you go:\n```json\n" + json.dumps({"tool_calls": CALLS}, indent=2) + "\n```\nDone."
+
+
+def chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class FakeAgents:
+    # Streams RESPONSE in small chunks and records, for every dispatched
+    # call, how many chunks had been sent by then
+    def __init__(self, size=7):
+        self.chunks = chunks(RESPONSE, size)
+        self.sent = 0
+
+    def _event(self, chunk):
+        return SimpleNamespace(data=SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=chunk))]))
+
+    def stream(self, agent_id, messages):
+        for chunk in self.chunks:
+            self.sent += 1
+            yield self._event(chunk)
+
+    async def stream_async(self, agent_id, messages):
+        async def events():
+            for chunk in self.chunks:
+                self.sent += 1
+                yield self._event(chunk)
+        return events()
+
+
+def test_parser_emits_calls_in_order_for_any_chunking():
+    for size in (1, 3, 16, len(RESPONSE)):
+        parser = ToolCallStreamParser()
+        calls = []
+        for chunk in chunks(RESPONSE, size):
+            calls.extend(parser.feed(chunk))
+        assert calls == CALLS
+        assert parser.done
+        assert parser.text == RESPONSE
+
+
+def test_parser_ignores_text_before_json_block():
+    parser = ToolCallStreamParser()
+    assert parser.feed('"tool_calls": [{"name": "x"}] ') == []
+    assert parser.feed('```json\n{"tool_calls": [{"name": "y"}]}\n```') == [{"name": "y"}]
+
+
+def test_parser_skips_malformed_call():
+    parser = ToolCallStreamParser()
+    calls = parser.feed('```json\n{"tool_calls": [{"name": }, {"name": "ok"}]}\n```')
+    assert calls == [{"name": "ok"}]
+
+
+def test_stream_dispatches_each_call_before_the_stream_ends():
+    agents = FakeAgents()
+    client = SimpleNamespace(agents=agents)
+    dispatched = []
+    text = stream_tool_calls(client, "agent", "prompt", lambda call: dispatched.append((call, agents.sent)))
+    assert text == RESPONSE
+    assert [call for call, _ in dispatched] == CALLS
+    sent = [at for _, at in dispatched]
+    assert sent == sorted(sent)
+    assert sent[-1] < len(agents.chunks)
+
+
+def test_stream_async_dispatches_in_order():
+    agents = FakeAgents()
+    client = SimpleNamespace(agents=agents)
+    dispatched = []
+    text = asyncio.run(stream_tool_calls_async(
+        client, "agent", "prompt", lambda call: dispatched.append((call, agents.sent))))
+    assert text == RESPONSE
+    assert [call for call, _ in dispatched] == CALLS
+    assert dispatched[0][1] < dispatched[-1][1] < len(agents.chunks)
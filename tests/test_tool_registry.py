@@ -0,0 +1,65 @@
+import pytest
+
+from tool_registry import ToolArgumentError, ToolRegistry, compile_validator
+from tools_definition import tools
+
+PAIRS = {
+    "type": "object",
+    "properties": {
+        "source": {"type": "string"},
+        "destination": {"type": "string"},
+        "count": {"type": "integer"},
+        "pairs": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {"source": {"type": "string"}, "destination": {"type": "string"}},
+                "required": ["source", "destination"],
+            },
+        },
+    },
+    "anyOf": [{"required": ["source", "destination"]}, {"required": ["pairs"]}],
+}
+
+
+def test_coerces_common_model_slips():
+    validate = compile_validator("t", PAIRS)
+    assert validate({"source": "a", "destination": "b", "count": "5"})["count"] == 5
+    assert validate({"pairs": {"source": "a", "destination": "b"}})["pairs"] == [{"source": "a", "destination": "b"}]
+
+
+def test_reports_every_problem_with_its_path():
+    validate = compile_validator("t", PAIRS)
+    with pytest.raises(ToolArgumentError) as error:
+        validate({"count": "many", "pairs": [{"source": "a"}]})
+    assert "count: expected an integer" in str(error.value)
+    assert "pairs[0].destination: required" in str(error.value)
+
+
+@pytest.mark.parametrize("arguments", [{}, None, {"source": "a"}, {"destination": "b"}])
+def test_any_of_needs_one_complete_alternative(arguments):
+    validate = compile_validator("t", PAIRS)
+    with pytest.raises(ToolArgumentError, match="requires source and destination or pairs"):
+        validate(arguments)
+
+
+def test_validate_calls_splits_valid_and_invalid():
+    registry = ToolRegistry()
+    registry.register("copy", lambda arguments: True, PAIRS)
+    calls, errors = registry.validate_calls([
+        {"name": "copy", "arguments": {"source": "a", "destination": "b"}},
+        {"name": "copy", "arguments": {"source": "a"}},
+        {"name": "missing", "arguments": {}},
+    ])
+    assert [call["arguments"] for call in calls] == [{"source": "a", "destination": "b"}]
+    assert len(errors) == 2
+
+
+@pytest.mark.parametrize("arguments", [{}, {"subject": "hi", "body": "x"}, {"messages": [{"recipient": "a@b.c"}]}])
+def test_send_email_needs_a_complete_message(arguments):
+    schema = next(tool["parameters"] for tool in tools if tool["name"] == "send_email")
+    validate = compile_validator("send_email", schema)
+    with pytest.raises(ToolArgumentError):
+        validate(arguments)
+    validate({"recipient": "a@b.c", "subject": "hi", "body": "x"})
+    validate({"messages": [{"recipient": "a@b.c", "subject": "hi", "body": "x"}]})
@@ -0,0 +1,76 @@
+import os
+import shutil
+
+import pytest
+
+from tool_registry import ToolArgumentError, compile_validator
+from tools_definition import tools
+from transfer import RESUME_MIN_SIZE, copy_file, transfer
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def write(path, data=b"hello"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return path
+
+
+@pytest.mark.parametrize("move", [False, True])
+@pytest.mark.parametrize("destination", [".", "a.txt", "./sub/.."])
+def test_transfer_onto_itself_fails_and_keeps_the_file(workdir, move, destination):
+    (workdir / "sub").mkdir()
+    source = write(workdir / "a.txt")
+    stats = transfer([("a.txt", destination)], move=move)
+    assert len(stats["failed"]) == 1 and "same file" in stats["failed"][0][1]
+    assert source.read_bytes() == b"hello"
+
+
+def test_large_file_onto_itself_is_not_truncated(workdir):
+    data = os.urandom(RESUME_MIN_SIZE + 1)
+    source = write(workdir / "big.bin", data)
+    stats = transfer([("big.bin", ".")])
+    assert stats["failed"] and source.read_bytes() == data
+    assert not (workdir / "big.bin.part").exists()
+
+
+def test_copy_file_refuses_a_hard_link_of_the_source(workdir):
+    source = write(workdir / "a.txt")
+    os.link(source, workdir / "b.txt")
+    with pytest.raises(shutil.SameFileError):
+        copy_file(str(source), str(workdir / "b.txt"))
+    assert source.read_bytes() == b"hello"
+
+
+def test_other_pairs_still_run_next_to_a_self_copy(workdir):
+    write(workdir / "a.txt")
+    write(workdir / "tree" / "x" / "b.txt", b"b")
+    (workdir / "out").mkdir()
+    stats = transfer([("a.txt", "a.txt"), ("tree", "out"), ("a.txt", "out/c.txt")])
+    assert len(stats["failed"]) == 1 and stats["files"] == 2
+    assert (workdir / "out" / "tree" / "x" / "b.txt").read_bytes() == b"b"
+    assert (workdir / "out" / "c.txt").read_bytes() == b"hello"
+
+
+def test_move_renames_and_removes_the_source(workdir):
+    write(workdir / "a.txt")
+    (workdir / "out").mkdir()
+    stats = transfer([("a.txt", "out")], move=True)
+    assert stats["renamed"] == 1 and not stats["failed"]
+    assert not (workdir / "a.txt").exists() and (workdir / "out" / "a.txt").exists()
+
+
+@pytest.mark.parametrize("name", ["copy_file", "move_file"])
+@pytest.mark.parametrize("arguments", [{}, {"source": "a.txt"}, {"destination": "out"},
+                                       {"pairs": [{"source": "a.txt"}]}])
+def test_schema_rejects_calls_without_destinations(name, arguments):
+    schema = next(tool["parameters"] for tool in tools if tool["name"] == name)
+    validate = compile_validator(name, schema)
+    with pytest.raises(ToolArgumentError):
+        validate(arguments)
+    validate({"source": "a.txt", "destination": "out"})
+    validate({"pairs": [{"source": "a.txt", "destination": "out"}]})
@@ -0,0 +1,72 @@
+import logging
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+
+class ToolExecutor:
+    # Runs tool functions on a bounded thread pool. submit() returns a Future
+    # that resolves to a result record rather than raising, so callers always
+    # get the tool's outcome, timings and queue wait.
+    def __init__(self, max_workers=8, scheduler=None, timeouts=None, default_timeout=None):
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+        self.scheduler = scheduler
+        self.timeouts = timeouts or {}
+        self.default_timeout = default_timeout
+
+    def timeout_for(self, tool_name):
+        return self.timeouts.get(tool_name, self.default_timeout)
+
+    def submit(self, tool_name, func, arguments, timeout=None):
+        future = Future()
+        future.set_running_or_notify_cancel()
+        record = {
+            "tool": tool_name,
+            "arguments": arguments,
+            "success": False,
+            "result": None,
+            "error": None,
+            "queued_at": time.time(),
+        }
+        timeout = timeout if timeout is not None else self.timeout_for(tool_name)
+        queued = time.perf_counter()
+
+        def run():
+            started = time.perf_counter()
+            record["started_at"] = time.time()
+            record["queue_wait"] = started - queued
+            timer = None
+            if timeout is not None and self.scheduler is not None:
+                timer = self.scheduler.call_later(timeout, expire, started)
+            try:
+                result = func(arguments)
+                outcome = {"success": result is not False, "result": result}
+                if result is False:
+                    outcome["error"] = "Tool reported failure"
+            except Exception as e:
+                logging.error(f"Tool {tool_name} raised: {e}")
+                outcome = {"success": False, "error": str(e)}
+            if timer is not None:
+                self.scheduler.cancel(timer)
+            finish(started, outcome)
+
+        def expire(started):
+            # The worker thread can't be interrupted; the caller just stops waiting
+            finish(started, {"success": False, "error": f"Timed out after {timeout} s", "timed_out": True})
+
+        def finish(started, outcome):
+            if future.done():
+                return
+            finished = dict(record, **outcome)
+            finished["finished_at"] = time.time()
+            finished["duration"] = time.perf_counter() - started
+            try:
+                future.set_result(finished)
+            except Exception:
+                # Lost the race against the other of run() and expire()
+                pass
+
+        self.pool.submit(run)
+        return future
+
+    def shutdown(self, wait=True):
+        self.pool.shutdown(wait=wait)
@@ -0,0 +1,302 @@
+import functools
+import importlib
+import logging
+import threading
+import time
+
+# Optional dependencies are written as "module" or "module:attribute", e.g.
+# "speech_recognition" or "plyer:notification"
+
+
+def resolve(spec):
+    module_name, _, attribute = spec.partition(":")
+    module = importlib.import_module(module_name)
+    return getattr(module, attribute) if attribute else module
+
+
+def requires(**specs):
+    # Decorator: the first call imports each spec and binds it under its
+    # keyword in the function's module globals, so the body uses it like a
+    # top-level import without making every startup pay for it.
+    # An import error is raised to the caller and retried on the next call.
+    def decorate(func):
+        lock = threading.Lock()
+        loaded = []
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not loaded:
+                with lock:
+                    if not loaded:
+                        started = time.perf_counter()
+                        namespace = func.__globals__
+                        for name, spec in specs.items():
+                            if name not in namespace:
+                                namespace[name] = resolve(spec)
+                        loaded.append(time.perf_counter() - started)
+                        logging.debug(f"Loaded {', '.join(specs.values())} for {func.__name__} "
+                                      f"in {loaded[0] * 1000:.0f} ms")
+            return func(*args, **kwargs)
+
+        wrapper.requires = specs
+        wrapper.is_loaded = lambda: bool(loaded)
+        return wrapper
+    return decorate
+
+
+def preload(*modules):
+    # Imports modules on a background thread so they are ready before first
+    # use without delaying startup; returns the thread
+    def run():
+        for name in modules:
+            started = time.perf_counter()
+            try:
+                importlib.import_module(name)
+            except ImportError as e:
+                logging.warning(f"Could not preload {name}: {e}")
+                continue
+            logging.debug(f"Preloaded {name} in {(time.perf_counter() - started) * 1000:.0f} ms")
+    thread = threading.Thread(target=run, name="preload", daemon=True)
+    thread.start()
+    return thread
+
+
+class ToolArgumentError(ValueError):
+    pass
+
+
+_TRUE = {"true", "yes", "on", "1"}
+_FALSE = {"false", "no", "off", "0"}
+
+
+def _path(where):
+    # Paths are (parent, key) pairs, turned into "pairs[0].source" only
+    # when an error is reported
+    parts = []
+    while where:
+        where, key = where
+        parts.append(f"[{key}]" if type(key) is int else f".{key}")
+    return "".join(reversed(parts)).lstrip(".") or "arguments"
+
+
+def _type_error(errors, where, expected, value):
+    errors.append(f"{_path(where)}: expected {expected}, got {value!r}")
+    return value
+
+
+def _integer(value, where, errors):
+    if type(value) is int:
+        return value
+    if type(value) is float and value.is_integer():
+        return int(value)
+    if type(value) is str:
+        try:
+            return int(value.strip())
+        except ValueError:
+            try:
+                number = float(value)
+            except ValueError:
+                number = None
+            if number is not None and number.is_integer():
+                return int(number)
+    return _type_error(errors, where, "an integer", value)
+
+
+def _number(value, where, errors):
+    if type(value) in (int, float):
+        return value
+    if type(value) is str:
+        try:
+            return float(value.strip())
+        except ValueError:
+            pass
+    return _type_error(errors, where, "a number", value)
+
+
+def _string(value, where, errors):
+    if type(value) is str:
+        return value
+    if type(value) in (int, float):
+        return str(value)
+    return _type_error(errors, where, "a string", value)
+
+
+def _boolean(value, where, errors):
+    if type(value) is bool:
+        return value
+    if type(value) is str:
+        text = value.strip().lower()
+        if text in _TRUE:
+            return True
+        if text in _FALSE:
+            return False
+    if type(value) is int and value in (0, 1):
+        return bool(value)
+    return _type_error(errors, where, "true or false", value)
+
+
+def _anything(value, where, errors):
+    return value
+
+
+# type keyword -> (checker, Python type that needs no checking at all)
+_SCALARS = {
+    "integer": (_integer, int),
+    "number": (_number, float),
+    "string": (_string, str),
+    "boolean": (_boolean, bool),
+}
+
+
+def _compile(schema):
+    # schema -> (check(value, where, errors) returning the coerced value,
+    # type whose values pass unchanged or None); problems are appended to
+    # errors rather than raised
+    kind = schema.get("type")
+    if kind == "object":
+        check, exact = _compile_object(schema), None
+    elif kind == "array":
+        check, exact = _compile_array(schema), None
+    else:
+        check, exact = _SCALARS.get(kind, (_anything, object))
+    if "enum" in schema:
+        check, exact = _compile_enum(schema["enum"], check), None
+    return check, exact
+
+
+def _compile_enum(options, inner):
+    allowed = set(options)
+    # Case-insensitive for strings: "Daily" -> "daily"
+    folded = {option.lower(): option for option in options if isinstance(option, str)}
+    listing = ", ".join(map(str, options))
+
+    def check(value, where, errors):
+        value = inner(value, where, errors)
+        if value in allowed:
+            return value
+        if type(value) is str and value.lower() in folded:
+            return folded[value.lower()]
+        errors.append(f"{_path(where)}: {value!r} is not one of {listing}")
+        return value
+    return check
+
+
+def _compile_array(schema):
+    item, exact = _compile(schema["items"]) if "items" in schema else (_anything, object)
+
+    def check(value, where, errors):
+        if type(value) is not list:
+            if type(value) is tuple:
+                value = list(value)
+            elif type(value) in (str, int, float, dict):
+                # A lone value where a list is expected
+                value = [value]
+            else:
+                return _type_error(errors, where, "a list", value)
+        if exact is object:
+            return value
+        result = None
+        for i, element in enumerate(value):
+            if type(element) is exact:
+                continue
+            new = item(element, (where, i), errors)
+            if new is not element:
+                if result is None:
+                    result = list(value)
+                result[i] = new
+        return value if result is None else result
+    return check
+
+
+def _compile_object(schema):
+    properties = {name: _compile(prop) for name, prop in schema.get("properties", {}).items()}
+    required = tuple(schema.get("required", ()))
+    # anyOf of required lists: e.g. a single item's fields, or a batch of them
+    alternatives = [tuple(option.get("required", ())) for option in schema.get("anyOf", ())]
+    needs = " or ".join(" and ".join(names) for names in alternatives)
+
+    def check(value, where, errors):
+        if type(value) is not dict:
+            return _type_error(errors, where, "an object", value)
+        for name in required:
+            if value.get(name) is None:
+                errors.append(f"{_path((where, name))}: required")
+        if alternatives and not any(all(value.get(name) is not None for name in names) for names in alternatives):
+            errors.append(f"{_path(where)}: requires {needs}")
+        result = None
+        for name, item in value.items():
+            compiled = properties.get(name)
+            if compiled is None or item is None or type(item) is compiled[1]:
+                continue
+            new = compiled[0](item, (where, name), errors)
+            if new is not item:
+                if result is None:
+                    result = dict(value)
+                result[name] = new
+        return value if result is None else result
+    return check
+
+
+def compile_validator(name, parameters):
+    # One closure per tool, built once: validate(arguments) returns the
+    # arguments with "5" -> 5 style coercions applied, or raises
+    # ToolArgumentError listing every problem
+    check = _compile(dict(parameters or {}, type="object"))[0]
+
+    def validate(arguments):
+        errors = []
+        result = check({} if arguments is None else arguments, (), errors)
+        if errors:
+            raise ToolArgumentError(f"{name}: {'; '.join(errors)}")
+        return result
+    return validate
+
+
+class ToolRegistry:
+    # Tool name -> function and argument validator. Only registered tools can
+    # be called by name; each tool's optional dependencies load on its first
+    # call (see requires) and its validator is compiled once at registration.
+    def __init__(self):
+        self._tools = {}
+        self._validators = {}
+
+    def register(self, name, func, parameters=None):
+        self._tools[name] = func
+        self._validators[name] = compile_validator(name, parameters)
+
+    def get(self, name):
+        return self._tools.get(name)
+
+    def names(self):
+        return list(self._tools)
+
+    def __contains__(self, name):
+        return name in self._tools
+
+    def validate(self, name, arguments):
+        validator = self._validators.get(name)
+        if validator is None:
+            raise ToolArgumentError(f"Unknown tool {name!r}")
+        return validator(arguments)
+
+    def validate_calls(self, tool_calls):
+        # (calls with checked and coerced arguments, errors); nothing runs
+        calls = []
+        errors = []
+        for call in tool_calls:
+            try:
+                arguments = self.validate(call.get("name"), call.get("arguments"))
+            except ToolArgumentError as e:
+                errors.append(str(e))
+                continue
+            calls.append(call if arguments is call.get("arguments") else dict(call, arguments=arguments))
+        return calls, errors
+
+    def dependencies(self):
+        # {tool: {name: spec}} for tools with optional dependencies, and
+        # whether they have been imported yet
+        return {
+            name: {"requires": func.requires, "loaded": func.is_loaded()}
+            for name, func in self._tools.items()
+            if hasattr(func, "requires")
+        }
@@ -0,0 +1,129 @@
+import math
+import re
+import threading
+import time
+from collections import Counter
+
+try:
+    from rapidfuzz import process as fuzz_process
+except ImportError:
+    fuzz_process = None
+
+STOPWORDS = {
+    "a", "an", "the", "to", "of", "in", "on", "for", "at", "by", "and", "or", "with", "from",
+    "me", "my", "i", "it", "is", "be", "please", "can", "you", "this", "that", "into", "optional",
+}
+
+# Everyday words mapped onto the vocabulary used in tools_definition
+SYNONYMS = {
+    "find": "search", "locate": "search", "look": "search",
+    "open": "launch", "start": "launch", "run": "launch",
+    "shut": "shutdown", "reboot": "restart", "suspend": "sleep",
+    "zip": "compress", "unzip": "extract", "unpack": "extract",
+    "mail": "email", "inbox": "email", "sound": "volume", "loud": "volume", "quiet": "volume",
+    "wake": "alarm", "erase": "delete", "remove": "delete", "duplicate": "copy",
+    "capture": "screenshot", "google": "web", "browse": "web", "meeting": "event", "calendar": "event",
+}
+
+
+def stem(word):
+    # Light suffix stripping so "timers"/"reminding" meet "timer"/"remind"
+    for suffix in ("ing", "ed", "s"):
+        if len(word) > len(suffix) + 3 and word.endswith(suffix) and not word.endswith("ss"):
+            return word[: -len(suffix)]
+    return word
+
+
+def tokenize(text):
+    tokens = []
+    for word in re.findall(r"[a-z0-9]+", text.lower().replace("_", " ")):
+        if word in STOPWORDS or word.isdigit():
+            continue
+        word = stem(word)
+        tokens.append(SYNONYMS.get(word, word))
+    return tokens
+
+
+def tool_document(tool):
+    parts = [tool["name"], tool["name"], tool.get("description", "")]
+    for name, spec in tool.get("parameters", {}).get("properties", {}).items():
+        parts.append(name)
+        parts.append(spec.get("description", ""))
+        parts.extend(str(value) for value in spec.get("enum", []))
+    return tokenize(" ".join(parts))
+
+
+class ToolSelector:
+    # BM25 over each tool's name, description and parameter descriptions. The
+    # index is built once; queries that match nothing well fall back to the
+    # full catalog.
+    def __init__(self, tools, top_k=5, min_score=1.0, k1=1.2, b=0.75):
+        self.tools = tools
+        self.top_k = top_k
+        self.min_score = min_score
+        self.k1 = k1
+        self.b = b
+        self.documents = [Counter(tool_document(tool)) for tool in tools]
+        self.lengths = [sum(doc.values()) for doc in self.documents]
+        self.average_length = sum(self.lengths) / max(len(self.lengths), 1)
+        document_frequency = Counter(term for doc in self.documents for term in doc)
+        total = len(self.documents)
+        self.idf = {
+            term: math.log(1 + (total - count + 0.5) / (count + 0.5))
+            for term, count in document_frequency.items()
+        }
+        self.vocabulary = list(self.idf)
+        self._lock = threading.Lock()
+        self.stats = {"selections": 0, "fallbacks": 0, "selection_seconds": 0.0}
+
+    def _query_terms(self, query):
+        terms = []
+        for term in tokenize(query):
+            if term in self.idf:
+                terms.append(term)
+            elif fuzz_process is not None:
+                match = fuzz_process.extractOne(term, self.vocabulary, score_cutoff=85)
+                if match:
+                    terms.append(match[0])
+        return terms
+
+    def scores(self, query):
+        terms = self._query_terms(query)
+        scores = []
+        for doc, length in zip(self.documents, self.lengths):
+            score = 0.0
+            for term in terms:
+                frequency = doc.get(term)
+                if frequency:
+                    norm = self.k1 * (1 - self.b + self.b * length / self.average_length)
+                    score += self.idf[term] * frequency * (self.k1 + 1) / (frequency + norm)
+            scores.append(score)
+        return scores
+
+    def select(self, query):
+        # Returns the chosen tools in catalog order so equal selections render
+        # the same prompt prefix
+        started = time.perf_counter()
+        scores = self.scores(query)
+        ranked = sorted(range(len(scores)), key=lambda i: scores[i], reverse=True)[: self.top_k]
+        fallback = not ranked or scores[ranked[0]] < self.min_score
+        if fallback:
+            selected = self.tools
+        else:
+            chosen = {i for i in ranked if scores[i] > 0}
+            selected = [tool for i, tool in enumerate(self.tools) if i in chosen]
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.stats["selections"] += 1
+            self.stats["fallbacks"] += fallback
+            self.stats["selection_seconds"] += elapsed
+        return selected
+
+    def metrics(self):
+        with self._lock:
+            selections = self.stats["selections"]
+            return {
+                "selections": selections,
+                "fallbacks": self.stats["fallbacks"],
+                "avg_selection_ms": self.stats["selection_seconds"] * 1000 / selections if selections else 0.0,
+            }
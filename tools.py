@@ -1,79 +1,232 @@
 import os
-import shutil
-import tempfile
-import glob
 import subprocess
-import vlc
-import zipfile
-from gui import *
+import imaplib
+import smtplib
 from tools_definition import *
 from helpers import *
-from tools import *
 import logging
+import multiprocessing
 import time
 import threading
-import queue
 import signal
 import sys
+from datetime import datetime, timedelta
+from scheduler import TimerScheduler
+from reminder_store import ReminderStore, ReminderService, next_fire_time
+from tool_executor import ToolExecutor
+from planner import StreamingPlan, execute_plan
+from file_walker import walk_files
+from file_index import FileIndex
+from archives import compress_paths, extract_members, list_archive
+from transfer import transfer
+from batch_ops import delete_matching, rename_matching, summarize, write_files
+from duplicates import HashCache, find_duplicates as scan_duplicates
+from mail_sync import HeaderCache, MailSync
+from smtp_pool import OutgoingMessage, SendQueue, SmtpPool
+from audio_cache import AudioCache
+from player import PlayerService, VlcBackend
+from tool_registry import ToolArgumentError, ToolRegistry, requires
+from concurrent.futures import Future, ThreadPoolExecutor
+
+# Global timer scheduler shared by all timer, alarm and reminder tools
+timer_scheduler = None
+
+# Notifications and their sounds are shown on their own thread, in order, so
+# a slow notification backend never delays the timers behind it
+ALERT_WORKERS = 1
+alert_executor = None
+
+# Bounded pool that runs tool calls; timeouts are in seconds
+TOOL_WORKERS = 8
+DEFAULT_TOOL_TIMEOUT = 120
+TOOL_TIMEOUTS = {
+    "play_song": 600,
+    "compress_files": 3600,
+    "extract_archive": 3600,
+    "copy_file": 3600,
+    "move_file": 3600,
+    "send_email": 3600,
+}
+tool_executor = None
+
+# Reminders, caches and downloaded tracks are kept under one folder, created by
+# setup(); set AI_PC_TOOLS_DATA to keep them somewhere else
+DATA_DIR = os.environ.get("AI_PC_TOOLS_DATA") or os.path.join(os.path.expanduser("~"), ".ai-pc-tools")
+
+# Upper bound on search_files results unless the caller asks for more
+SEARCH_MAX_RESULTS = 1000
+
+# Optional on-disk filename index; empty roots leaves it off and every search walks the disk
+FILE_INDEX_PATH = os.path.join(DATA_DIR, "file_index.db")
+FILE_INDEX_ROOTS = []  # e.g. [os.path.expanduser("~")]
+FILE_INDEX_REFRESH_SECONDS = 300
+file_index = None
+
+# Remembers file hashes by (path, size, mtime) so repeated duplicate scans are incremental
+HASH_CACHE_PATH = os.path.join(DATA_DIR, "hash_cache.db")
+hash_cache = None
+
+# read_emails answers from a local header cache, syncing new headers at most this often
+IMAP_HOST = "imap.example.com"
+EMAIL_ADDRESS = "your_email@example.com"
+EMAIL_PASSWORD = "your_password"
+MAIL_CACHE_PATH = os.path.join(DATA_DIR, "mail_cache.db")
+MAIL_SYNC_SECONDS = 60
+mail_sync = None
+
+# send_email keeps one logged-in SMTP session open between messages
+SMTP_HOST = "smtp.example.com"
+SMTP_PORT = 587
+SMTP_CONNECTIONS = 1
+email_sender = None
+
+# play_song keeps downloaded tracks here, least recently played evicted past the size limit
+AUDIO_CACHE_DIR = os.path.join(DATA_DIR, "audio_cache")
+AUDIO_CACHE_MAX_BYTES = 2 * 1024 ** 3
+audio_cache = None
+
+# One long-lived VLC player with a playlist queue shared by the music tools,
+# started on the first music tool call since libvlc is slow to load
+music_player = None
+music_player_lock = threading.Lock()
+
+# Tools callable by name; see setup_tool_registry
+tool_registry = ToolRegistry()
+
+# Persistent store for timers, alarms and reminders so they survive restarts
+REMINDER_DB_PATH = os.path.join(DATA_DIR, "reminders.db")
+reminder_service = None
+
+def setup_alert_executor():
+    global alert_executor
+    alert_executor = ThreadPoolExecutor(max_workers=ALERT_WORKERS, thread_name_prefix="alert")
+
+def setup_timer_scheduler():
+    global timer_scheduler
+    timer_scheduler = TimerScheduler()
+    timer_scheduler.start()
+
+def setup_reminder_service():
+    global reminder_service
+    reminder_service = ReminderService(ReminderStore(REMINDER_DB_PATH), timer_scheduler, alert)
+    reminder_service.start()
+
+def setup_file_index():
+    global file_index
+    if not FILE_INDEX_ROOTS:
+        return
+    # Searches fall back to a live walk until a refresh newer than max_age covers them
+    file_index = FileIndex(FILE_INDEX_PATH, FILE_INDEX_ROOTS, max_age=2 * FILE_INDEX_REFRESH_SECONDS)
+    refresh_file_index()
+
+def refresh_file_index():
+    threading.Thread(target=file_index.refresh, name="file-index-refresh", daemon=True).start()
+    timer_scheduler.call_later(FILE_INDEX_REFRESH_SECONDS, refresh_file_index)
+
+def setup_hash_cache():
+    global hash_cache
+    hash_cache = HashCache(HASH_CACHE_PATH)
+
+def setup_mail_sync():
+    global mail_sync
+    mail_sync = MailSync(connect_imap, HeaderCache(MAIL_CACHE_PATH))
+
+def connect_imap():
+    mail = imaplib.IMAP4_SSL(IMAP_HOST)
+    mail.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
+    return mail
+
+def setup_email_sender():
+    global email_sender
+    email_sender = SendQueue(SmtpPool(connect_smtp, size=SMTP_CONNECTIONS), workers=SMTP_CONNECTIONS)
+
+def connect_smtp():
+    server = smtplib.SMTP(SMTP_HOST, SMTP_PORT)
+    server.starttls()
+    server.login(EMAIL_ADDRESS, EMAIL_PASSWORD)
+    return server
+
+def setup_audio_cache():
+    global audio_cache
+    audio_cache = AudioCache(AUDIO_CACHE_DIR, max_bytes=AUDIO_CACHE_MAX_BYTES)
+
+def get_music_player():
+    global music_player
+    with music_player_lock:
+        if music_player is None:
+            # Queued and playing tracks stay pinned in the cache until the player is done with them
+            music_player = PlayerService(VlcBackend(), on_release=audio_cache.unpin)
+    return music_player
+
+def setup_tool_registry():
+    # Every tool in tools_definition dispatches to the function of the same
+    # name, behind a validator compiled from its parameters
+    for definition in tools:
+        func = globals().get(definition["name"])
+        if callable(func):
+            tool_registry.register(definition["name"], func, definition.get("parameters"))
+        else:
+            logging.warning(f"Tool {definition['name']} has no implementation")
+
+def setup_tool_executor():
+    global tool_executor
+    tool_executor = ToolExecutor(
+        max_workers=TOOL_WORKERS,
+        scheduler=timer_scheduler,
+        timeouts=TOOL_TIMEOUTS,
+        default_timeout=DEFAULT_TOOL_TIMEOUT,
+    )
+
+def failed_tool_call(tool_name, arguments, error):
+    future = Future()
+    future.set_result({
+        "tool": tool_name,
+        "arguments": arguments,
+        "success": False,
+        "result": None,
+        "error": error
+    })
+    return future
+
+def submit_tool_call(tool):
+    # Returns a future resolving to a result record with the tool's return
+    # value or error, timestamps and queue wait
+    tool_name = tool.get("name")
+    arguments = tool.get("arguments", {})
+    logging.debug(f"Executing tool: {tool_name} with arguments: {arguments}")
+    
+    try:
+        func = tool_registry.get(tool_name)
+        if func is not None:
+            # Bad arguments fail here, before a worker is used
+            arguments = tool_registry.validate(tool_name, arguments)
+            return tool_executor.submit(tool_name, func, arguments)
+        logging.warning(f"Tool {tool_name} not found.")
+        return failed_tool_call(tool_name, arguments, "Tool not found")
+    except ToolArgumentError as e:
+        logging.warning(f"Rejected tool call: {e}")
+        return failed_tool_call(tool_name, arguments, str(e))
+    except Exception as e:
+        logging.error(f"Error executing tool {tool_name}: {e}")
+        return failed_tool_call(tool_name, arguments, str(e))
+
+def validate_tool_calls(tool_calls):
+    # Checks every call against its tool's schema without running anything;
+    # returns (calls with coerced arguments, errors)
+    return tool_registry.validate_calls(tool_calls)
 
-# Global thread manager
-thread_manager = None
-
-class ThreadManager:
-    def __init__(self):
-        self.threads = []
-        self.stop_event = threading.Event()
-
-    def start_thread(self, target, args=()):
-        thread = threading.Thread(target=target, args=args)
-        thread.daemon = True  # Set daemon to True to ensure threads die with the main process
-        thread.start()
-        self.threads.append(thread)
-        return thread
-
-    def stop_all_threads(self):
-        self.stop_event.set()
-        for thread in self.threads:
-            thread.join()
-        self.threads = []
-        self.stop_event.clear()
-
-def setup_thread_manager():
-    global thread_manager
-    thread_manager = ThreadManager()
-
-def execute_tool_calls(tool_calls):
+def execute_tool_plan(tool_calls):
+    # Runs the calls as a dependency graph: calls touching the same paths run
+    # in order, independent ones in parallel. Returns (results, timing report).
     logging.debug("Starting tool execution")
-    results = []
-    for tool in tool_calls:
-        tool_name = tool.get("name")
-        arguments = tool.get("arguments", {})
-        logging.debug(f"Executing tool: {tool_name} with arguments: {arguments}")
-        
-        try:
-            func = globals().get(tool_name)
-            if callable(func):
-                result = thread_manager.start_thread(func, args=(arguments,))
-                results.append({
-                    "tool": tool_name,
-                    "success": result is not None,
-                    "arguments": arguments
-                })
-            else:
-                logging.warning(f"Tool {tool_name} not found.")
-                results.append({
-                    "tool": tool_name,
-                    "success": False,
-                    "error": "Tool not found"
-                })
-        except Exception as e:
-            logging.error(f"Error executing tool {tool_name}: {e}")
-            results.append({
-                "tool": tool_name,
-                "success": False,
-                "error": str(e)
-            })
-    return results
+    results, report = execute_plan(tool_calls, submit_tool_call)
+    logging.debug(f"Tool plan report: {report}")
+    return results, report
+
+def start_streaming_plan():
+    # A plan to add tool calls to as they arrive; each one waits for the
+    # earlier calls it depends on, as in execute_tool_plan
+    return StreamingPlan(submit_tool_call)
 
 def create_file(arguments):
     file_path = arguments.get("file_path")
@@ -99,26 +252,39 @@ def create_folder(arguments):
         logging.error(f"Failed to create folder: {e}")
         return False
 
+def transfer_pairs(arguments):
+    # A single source/destination plus any number of {"source", "destination"} pairs
+    pairs = [(pair.get("source"), pair.get("destination")) for pair in arguments.get("pairs") or []]
+    if arguments.get("source") or arguments.get("destination"):
+        pairs.insert(0, (arguments.get("source"), arguments.get("destination")))
+    if not pairs:
+        raise ValueError("source and destination, or pairs, are required")
+    for source, destination in pairs:
+        if not source or not destination:
+            raise ValueError(f"{source or destination} has no {'destination' if source else 'source'}")
+    return pairs
+
+def log_transfer_progress(done_bytes, total_bytes, done_files, total_files):
+    logging.debug(f"Transferred {done_files}/{total_files} files, {done_bytes}/{total_bytes} bytes")
+
 def move_file(arguments):
-    source = arguments.get("source")
-    destination = arguments.get("destination")
-    logging.debug(f"Moving file from {source} to {destination}")
+    pairs = transfer_pairs(arguments)
+    logging.debug(f"Moving {len(pairs)} items: {pairs[:3]}")
     try:
-        shutil.move(source, destination)
-        logging.debug(f"Moved file from {source} to {destination}")
-        return True
+        stats = transfer(pairs, move=True, progress=log_transfer_progress)
+        logging.debug(f"Moved files: {stats}")
+        return not stats["failed"]
     except Exception as e:
         logging.error(f"Failed to move file: {e}")
         return False
 
 def copy_file(arguments):
-    source = arguments.get("source")
-    destination = arguments.get("destination")
-    logging.debug(f"Copying file from {source} to {destination}")
+    pairs = transfer_pairs(arguments)
+    logging.debug(f"Copying {len(pairs)} items: {pairs[:3]}")
     try:
-        shutil.copy2(source, destination)
-        logging.debug(f"Copied file from {source} to {destination}")
-        return True
+        stats = transfer(pairs, progress=log_transfer_progress)
+        logging.debug(f"Copied files: {stats}")
+        return not stats["failed"]
     except Exception as e:
         logging.error(f"Failed to copy file: {e}")
         return False
@@ -148,15 +314,60 @@ def rename_file(arguments):
         logging.error(f"Failed to rename file: {e}")
         return False
 
+def batch_rename(arguments):
+    directory = arguments.get("directory")
+    pattern = arguments.get("pattern", "*")
+    logging.debug(f"Batch renaming {pattern} in {directory}")
+    try:
+        return rename_matching(
+            directory,
+            pattern,
+            regex=arguments.get("regex"),
+            replacement=arguments.get("replacement", ""),
+            template=arguments.get("template"),
+            start=arguments.get("start", 1),
+            sort=arguments.get("sort", "name"),
+            dry_run=arguments.get("dry_run", False),
+        )
+    except Exception as e:
+        logging.error(f"Failed to batch rename files: {e}")
+        return False
+
+def delete_files(arguments):
+    directory = arguments.get("directory")
+    pattern = arguments.get("pattern")
+    logging.debug(f"Deleting files matching {pattern} in {directory}")
+    try:
+        return delete_matching(
+            directory,
+            pattern,
+            recursive=arguments.get("recursive", False),
+            exclude=arguments.get("exclude"),
+            dry_run=arguments.get("dry_run", False),
+        )
+    except Exception as e:
+        logging.error(f"Failed to delete files: {e}")
+        return False
+
+def create_files(arguments):
+    files = arguments.get("files") or {}
+    directory = arguments.get("directory")
+    logging.debug(f"Creating {len(files)} files")
+    try:
+        return write_files(files, directory, overwrite=arguments.get("overwrite", True))
+    except Exception as e:
+        logging.error(f"Failed to create files: {e}")
+        return False
+
 def compress_files(arguments):
     files = arguments.get("files")
     output_path = arguments.get("output_path")
+    level = arguments.get("level", 6)
+    workers = arguments.get("workers")
     logging.debug(f"Compressing files into {output_path}")
     try:
-        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            for file in files:
-                zipf.write(file, os.path.basename(file))
-        logging.debug(f"Created zip archive at {output_path}")
+        stats = compress_paths(files, output_path, level=level, workers=workers)
+        logging.debug(f"Created zip archive at {output_path}: {stats}")
         return True
     except Exception as e:
         logging.error(f"Failed to create zip archive: {e}")
@@ -165,11 +376,27 @@ def compress_files(arguments):
 def extract_archive(arguments):
     archive_path = arguments.get("archive_path")
     extract_path = arguments.get("extract_path")
+    include = arguments.get("include")
+    exclude = arguments.get("exclude")
+    if arguments.get("list_only", False):
+        logging.debug(f"Listing archive {archive_path}")
+        try:
+            return [member["name"] for member in list_archive(archive_path)]
+        except Exception as e:
+            logging.error(f"Failed to list archive: {e}")
+            return False
+    if not extract_path:
+        # Reported by the tool executor as this call's error
+        raise ValueError("extract_path is required unless list_only is true")
     logging.debug(f"Extracting archive from {archive_path} to {extract_path}")
+
+    def progress(done, total, size):
+        if done % 500 == 0 or done == total:
+            logging.debug(f"Extracted {done}/{total or '?'} members ({size} bytes)")
+
     try:
-        with zipfile.ZipFile(archive_path, 'r') as zipf:
-            zipf.extractall(extract_path)
-        logging.debug(f"Extracted archive to {extract_path}")
+        stats = extract_members(archive_path, extract_path, include=include, exclude=exclude, progress=progress)
+        logging.debug(f"Extracted archive to {extract_path}: {stats}")
         return True
     except Exception as e:
         logging.error(f"Failed to extract archive: {e}")
@@ -179,20 +406,50 @@ def search_files(arguments):
     directory = arguments.get("directory")
     pattern = arguments.get("pattern")
     recursive = arguments.get("recursive", True)
+    max_results = arguments.get("max_results", SEARCH_MAX_RESULTS)
+    max_depth = arguments.get("max_depth")
+    exclude = arguments.get("exclude")
     logging.debug(f"Searching for files in {directory} with pattern {pattern}")
     try:
-        if recursive:
-            search_path = os.path.join(directory, "**", pattern)
-            files = glob.glob(search_path, recursive=True)
-        else:
-            search_path = os.path.join(directory, pattern)
-            files = glob.glob(search_path)
+        if file_index is not None:
+            files = file_index.search(directory, pattern, recursive, max_results, max_depth, exclude)
+            if files is not None:
+                logging.debug(f"Found {len(files)} indexed files matching pattern")
+                return files
+        files = list(walk_files(
+            directory,
+            pattern,
+            recursive=recursive,
+            max_results=max_results,
+            max_depth=max_depth,
+            exclude=exclude,
+        ))
         logging.debug(f"Found {len(files)} files matching pattern")
         return files
     except Exception as e:
         logging.error(f"Failed to search files: {e}")
         return []
 
+def find_duplicates(arguments):
+    directory = arguments.get("directory")
+    pattern = arguments.get("pattern", "*")
+    recursive = arguments.get("recursive", True)
+    min_size = arguments.get("min_size", 1)
+    max_groups = arguments.get("max_groups", 50)
+    logging.debug(f"Looking for duplicate files in {directory}")
+    try:
+        groups, stats = scan_duplicates(directory, pattern, recursive, min_size, cache=hash_cache)
+        logging.debug(f"Duplicate scan stats: {stats}")
+        return {
+            "groups": stats["groups"],
+            "duplicate_files": stats["duplicate_files"],
+            "wasted_bytes": stats["wasted_bytes"],
+            "duplicates": groups[:max_groups],
+        }
+    except Exception as e:
+        logging.error(f"Failed to find duplicates: {e}")
+        return False
+
 def launch_application(arguments):
     app_path = arguments.get("app_path")
     arguments = arguments.get("arguments", "")
@@ -216,6 +473,7 @@ def launch_application(arguments):
         logging.error(f"Failed to launch application: {e}")
         return False
 
+@requires(pyautogui="pyautogui")
 def take_screenshot(arguments):
     output_path = arguments.get("output_path")
     region = arguments.get("region")
@@ -257,6 +515,7 @@ def schedule_task(arguments):
         logging.error(f"Failed to schedule task: {e}")
         return False
 
+@requires(win32api="win32api")
 def system_control(arguments):
     action = arguments.get("action")
     delay = arguments.get("delay", 0)
@@ -278,22 +537,43 @@ def system_control(arguments):
         logging.error(f"Failed to execute system control: {e}")
         return False
 
+def next_occurrence(clock_time):
+    # Next datetime at which the wall clock reads HH:MM (today or tomorrow)
+    target = datetime.strptime(clock_time, "%H:%M").time()
+    now = datetime.now()
+    occurrence = datetime.combine(now.date(), target)
+    if occurrence <= now:
+        occurrence += timedelta(days=1)
+    return occurrence
+
+def alert(title, message, sound, timeout=10):
+    # Called on the scheduler thread; returns the Future of the notification
+    future = alert_executor.submit(show_alert, title, message, sound, timeout)
+    future.add_done_callback(log_alert_failure)
+    return future
+
+def log_alert_failure(future):
+    if not future.cancelled() and future.exception() is not None:
+        logging.error(f"Failed to show alert: {future.exception()}")
+
+@requires(notification="plyer:notification", winsound="winsound")
+def show_alert(title, message, sound, timeout=10):
+    notification.notify(
+        title=title,
+        message=message,
+        app_icon=None,
+        timeout=timeout,
+    )
+    if sound:
+        winsound.PlaySound(sound, winsound.SND_ALIAS | winsound.SND_ASYNC)
+
 def set_timer(arguments):
     duration = arguments.get("duration")
     message = arguments.get("message", "Timer finished!")
     logging.debug(f"Setting timer for {duration} with message {message}")
     try:
         seconds = convert_to_seconds(duration)
-        def timer_thread():
-            time.sleep(seconds)
-            winsound.PlaySound("SystemExclamation", winsound.SND_ALIAS)
-            notification.notify(
-                title="Timer Complete",
-                message=message,
-                app_icon=None,
-                timeout=10,
-            )
-        thread_manager.start_thread(timer_thread)
+        reminder_service.add(time.time() + seconds, "Timer Complete", message, "SystemExclamation")
         logging.debug(f"Timer set for {duration}")
         return True
     except Exception as e:
@@ -305,21 +585,9 @@ def set_alarm(arguments):
     message = arguments.get("message", "Alarm!")
     logging.debug(f"Setting alarm for {alarm_time} with message {message}")
     try:
-        def alarm_thread():
-            while not thread_manager.stop_event.is_set():
-                current_time = datetime.now().strftime("%H:%M")
-                if current_time == alarm_time:
-                    winsound.PlaySound("SystemHand", winsound.SND_ALIAS)
-                    notification.notify(
-                        title="Alarm",
-                        message=message,
-                        app_icon=None,
-                        timeout=10,
-                    )
-                    break
-                time.sleep(30)
-        thread_manager.start_thread(alarm_thread)
-        logging.debug(f"Alarm set for {alarm_time}")
+        alarm_at = next_occurrence(alarm_time)
+        reminder_service.add(alarm_at.timestamp(), "Alarm", message, "SystemHand")
+        logging.debug(f"Alarm set for {alarm_at}")
         return True
     except Exception as e:
         logging.error(f"Failed to set alarm: {e}")
@@ -331,25 +599,10 @@ def set_reminder(arguments):
     logging.debug(f"Setting reminder for {remind_time} with message {message}")
     try:
         if remind_time.lower().endswith(('h', 'm', 's')):
-            seconds = convert_to_seconds(remind_time)
-            reminder_time = datetime.now() + timedelta(seconds=seconds)
+            fire_at = time.time() + convert_to_seconds(remind_time)
         else:
-            reminder_time = datetime.strptime(remind_time, "%H:%M").time()
-        
-        def reminder_thread():
-            while not thread_manager.stop_event.is_set():
-                current_time = datetime.now().time()
-                if current_time >= reminder_time:
-                    notification.notify(
-                        title="Reminder",
-                        message=message,
-                        app_icon=None,
-                        timeout=10,
-                    )
-                    winsound.PlaySound("SystemAsterisk", winsound.SND_ALIAS)
-                    break
-                time.sleep(30)
-        thread_manager.start_thread(reminder_thread)
+            fire_at = next_occurrence(remind_time).timestamp()
+        reminder_service.add(fire_at, "Reminder", message, "SystemAsterisk")
         logging.debug(f"Reminder set for {remind_time}: {message}")
         return True
     except Exception as e:
@@ -362,31 +615,13 @@ def set_recurring_reminder(arguments):
     frequency = arguments.get("frequency", "daily")
     logging.debug(f"Setting recurring reminder for {schedule_time} with message {message} and frequency {frequency}")
     try:
-        def show_reminder():
-            notification.notify(
-                title="Recurring Reminder",
-                message=message,
-                app_icon=None,
-                timeout=10,
-            )
-            winsound.PlaySound("SystemAsterisk", winsound.SND_ALIAS)
-
-        schedule_map = {
-            "daily": schedule.every().day.at(schedule_time).do(show_reminder),
-            "hourly": schedule.every().hour.at(":00").do(show_reminder),
-            "weekly": schedule.every().week.at(schedule_time).do(show_reminder),
-            "workdays": schedule.every().monday.to(schedule.every().friday).at(schedule_time).do(show_reminder)
-        }
-
-        if frequency in schedule_map:
-            def schedule_thread():
-                while not thread_manager.stop_event.is_set():
-                    schedule.run_pending()
-                    time.sleep(30)
-            thread_manager.start_thread(schedule_thread)
-            logging.debug(f"Recurring reminder set for {frequency} at {schedule_time}")
-            return True
-        return False
+        if frequency not in ("daily", "hourly", "weekly", "workdays"):
+            return False
+        fire_at = next_fire_time(schedule_time, frequency)
+        reminder_service.add(fire_at, "Recurring Reminder", message, "SystemAsterisk",
+                             schedule_time=schedule_time, frequency=frequency)
+        logging.debug(f"Recurring reminder set for {frequency} at {schedule_time}")
+        return True
     except Exception as e:
         logging.error(f"Failed to set recurring reminder: {e}")
         return False
@@ -399,27 +634,19 @@ def set_pomodoro_timer(arguments):
     try:
         work_seconds = convert_to_seconds(work_duration)
         break_seconds = convert_to_seconds(break_duration)
-        
-        def pomodoro_thread():
-            for cycle in range(cycles):
-                time.sleep(work_seconds)
-                notification.notify(
-                    title="Pomodoro Timer",
-                    message=f"Time for a break! Cycle {cycle + 1}/{cycles} completed",
-                    timeout=10
-                )
-                winsound.PlaySound("SystemHand", winsound.SND_ALIAS)
-                
-                if cycle < cycles - 1:
-                    time.sleep(break_seconds)
-                    notification.notify(
-                        title="Pomodoro Timer",
-                        message="Break over! Time to work",
-                        timeout=10
-                    )
-                    winsound.PlaySound("SystemAsterisk", winsound.SND_ALIAS)
-        
-        thread_manager.start_thread(pomodoro_thread)
+
+        # Each phase schedules the next one, so no thread sleeps through the session
+        def work_finished(cycle):
+            alert("Pomodoro Timer", f"Time for a break! Cycle {cycle + 1}/{cycles} completed", "SystemHand")
+            if cycle < cycles - 1:
+                timer_scheduler.call_later(break_seconds, break_finished, cycle)
+
+        def break_finished(cycle):
+            alert("Pomodoro Timer", "Break over! Time to work", "SystemAsterisk")
+            timer_scheduler.call_later(work_seconds, work_finished, cycle + 1)
+
+        if cycles > 0:
+            timer_scheduler.call_later(work_seconds, work_finished, 0)
         logging.debug(f"Pomodoro timer started: {cycles} cycles")
         return True
     except Exception as e:
@@ -432,26 +659,19 @@ def countdown_timer(arguments):
     logging.debug(f"Setting countdown timer for {duration} with title {title}")
     try:
         seconds = convert_to_seconds(duration)
-        end_time = datetime.now() + timedelta(seconds=seconds)
-        
-        def countdown_thread():
-            while not thread_manager.stop_event.is_set():
-                remaining = end_time - datetime.now()
-                remaining_str = str(remaining).split('.')[0]
-                notification.notify(
-                    title=title,
-                    message=f"Time remaining: {remaining_str}",
-                    timeout=1
-                )
-                time.sleep(1)
-            winsound.PlaySound("SystemExclamation", winsound.SND_ALIAS)
-            notification.notify(
-                title=title,
-                message="Countdown Complete!",
-                timeout=10
-            )
-        
-        thread_manager.start_thread(countdown_thread)
+        end_at = time.monotonic() + seconds
+
+        def tick():
+            remaining = end_at - time.monotonic()
+            if remaining <= 0:
+                alert(title, "Countdown Complete!", "SystemExclamation")
+                return
+            remaining_str = str(timedelta(seconds=round(remaining)))
+            alert(title, f"Time remaining: {remaining_str}", None, timeout=1)
+            # Re-arm on whole-second boundaries relative to the end so ticks don't drift
+            timer_scheduler.call_at(end_at - (int(remaining - 1e-6)), tick)
+
+        tick()
         logging.debug(f"Countdown timer started for {duration}")
         return True
     except Exception as e:
@@ -479,6 +699,9 @@ def convert_to_seconds(duration_str):
     logging.debug(f"Converted duration to {total_seconds} seconds")
     return total_seconds
 
+@requires(pythoncom="pythoncom", AudioUtilities="pycaw.pycaw:AudioUtilities",
+          IAudioEndpointVolume="pycaw.pycaw:IAudioEndpointVolume", CLSCTX_ALL="comtypes:CLSCTX_ALL",
+          cast="ctypes:cast", POINTER="ctypes:POINTER")
 def volume_control(arguments):
     level = arguments.get("level")
     mute = arguments.get("mute")
@@ -501,45 +724,54 @@ def volume_control(arguments):
         return False
 
 def send_email(arguments):
-    recipient = arguments.get("recipient")
-    subject = arguments.get("subject")
-    body = arguments.get("body")
-    attachment_path = arguments.get("attachment_path")
-    msg = MIMEMultipart()
-    msg['From'] = 'your_email@example.com'
-    msg['To'] = recipient
-    msg['Subject'] = subject
-    msg.attach(MIMEText(body, 'plain'))
-    if attachment_path:
-        attachment = open(attachment_path, "rb")
-        part = MIMEBase('application', 'octet-stream')
-        part.set_payload(attachment.read())
-        encoders.encode_base64(part)
-        part.add_header('Content-Disposition', f"attachment; filename= {os.path.basename(attachment_path)}")
-        msg.attach(part)
-    server = smtplib.SMTP('smtp.example.com', 587)
-    server.starttls()
-    server.login('your_email@example.com', 'your_password')
-    text = msg.as_string()
-    server.sendmail('your_email@example.com', recipient, text)
-    server.quit()
+    # "messages" are sent over the same session as the top-level message
+    messages = ([arguments] if arguments.get("recipient") else []) + list(arguments.get("messages") or [])
+    futures = {}
+    errors = {}
+    for i, item in enumerate(messages, 1):
+        key = f"{i}: {item.get('recipient')}"
+        try:
+            message = OutgoingMessage(EMAIL_ADDRESS, item.get("recipient") or "", item.get("subject"),
+                                      item.get("body"), [item.get("attachment_path")])
+        except (OSError, ValueError) as e:
+            errors[key] = str(e)
+            continue
+        futures[key] = email_sender.submit(message)
+    for key, future in futures.items():
+        try:
+            future.result()
+        except Exception as e:
+            errors[key] = str(e)
+    if len(messages) > 1:
+        return summarize(len(futures) - sum(key in errors for key in futures), errors)
+    # A single message fails the call with the SMTP or attachment error, which
+    # the executor reports as the tool's error
+    if not messages:
+        raise ValueError("recipient or messages is required")
+    if errors:
+        raise RuntimeError(f"Failed to send email to {messages[0].get('recipient')}: {errors.popitem()[1]}")
     return True
 
 def read_emails(arguments):
-    mail = imaplib.IMAP4_SSL('imap.example.com')
-    mail.login('your_email@example.com', 'your_password')
-    mail.select('inbox')
-    typ, data = mail.search(None, 'ALL')
-    for num in data[0].split():
-        typ, data = mail.fetch(num, '(RFC822)')
-        raw_email = data[0][1]
-        email_message = email.message_from_bytes(raw_email)
-        print(f"Subject: {email_message['Subject']}")
-        print(f"From: {email_message['From']}")
-        print(f"Date: {email_message['Date']}")
-    mail.logout()
-    return True
-
+    count = int(arguments.get("count", 10))
+    sender = arguments.get("sender")
+    subject = arguments.get("subject")
+    _, _, synced_at = mail_sync.cache.state(mail_sync.mailbox)
+    if arguments.get("refresh") or synced_at is None or time.time() - synced_at > MAIL_SYNC_SECONDS:
+        try:
+            mail_sync.sync()
+        except Exception as e:
+            # Serve what the cache already has rather than nothing
+            if synced_at is None:
+                logging.error(f"Failed to sync emails: {e}")
+                return False
+            logging.warning(f"Email sync failed, answering from cache: {e}")
+    emails = mail_sync.latest(count, sender=sender, subject=subject)
+    for message in emails:
+        logging.debug(f"Email from {message['from']} on {message['date']}: {message['subject']}")
+    return emails
+
+@requires(Credentials="google.oauth2.credentials:Credentials", build="googleapiclient.discovery:build")
 def add_event(arguments):
     summary = arguments.get("summary")
     start_time = arguments.get("start_time")
@@ -555,6 +787,7 @@ def add_event(arguments):
     print(f'Event created: {event.get("htmlLink")}')
     return True
 
+@requires(sr="speech_recognition", gTTS="gtts:gTTS")
 def voice_command(arguments):
     r = sr.Recognizer()
     with sr.Microphone() as source:
@@ -572,6 +805,7 @@ def voice_command(arguments):
         print(f"Error: {e}")
         return False
 
+@requires(webdriver="selenium:webdriver")
 def web_search(arguments):
     query = arguments.get("query")
     driver = webdriver.Chrome()
@@ -583,63 +817,95 @@ def play_song(arguments):
     song_name = arguments.get("song_name")
     logging.debug(f"Playing song: {song_name}")
     try:
-        # Create a temporary directory within the project directory
-        temp_dir = tempfile.mkdtemp(dir=os.getcwd())
-        logging.debug(f"Created temporary directory: {temp_dir}")
-        
-        # Download the song using spotdl to the temporary directory
-        spotdl_command = f'spotdl download "{song_name}" --output "{temp_dir}"'
-        subprocess.run(spotdl_command, shell=True, check=True)
-        
-        # Find the downloaded song file
-        song_files = glob.glob(os.path.join(temp_dir, "*.mp3"))
-        if not song_files:
-            logging.error(f"Failed to find downloaded song: {song_name}")
-            shutil.rmtree(temp_dir)  # Clean up the temporary directory
-            return False
-        
-        # Play the song using vlc-python in a separate thread
-        def play_song_thread():
-            try:
-                instance = vlc.Instance()
-                player = instance.media_player_new()
-                media = instance.media_new(song_files[0])
-                player.set_media(media)
-                player.play()
-                
-                # Wait for the song to finish playing
-                while player.get_state() != vlc.State.Ended and not thread_manager.stop_event.is_set():
-                    time.sleep(1)
-                
-                logging.debug(f"Song {song_name} has finished playing")
-                
-                # Clean up the temporary directory
-                shutil.rmtree(temp_dir)
-                logging.debug(f"Deleted temporary directory: {temp_dir}")
-            except Exception as e:
-                logging.error(f"Failed to play song: {e}")
-                if 'temp_dir' in locals():
-                    shutil.rmtree(temp_dir)  # Clean up the temporary directory if an error occurs
-        
-        # Start the song playing thread
-        song_thread = thread_manager.start_thread(play_song_thread)
-        
-        return True
+        player = get_music_player()
+        # Cached tracks play straight away; a miss downloads with spotdl once.
+        # The pin is handed to the player, which releases it.
+        song_file = audio_cache.get(song_name, pin=True)
+
+        # Songs likely to be asked for next download in the background
+        for upcoming in arguments.get("prefetch") or []:
+            audio_cache.prefetch(upcoming)
+
+        if arguments.get("queue"):
+            position = player.enqueue(song_name, song_file)
+            logging.debug(f"Queued {song_name} at position {position}")
+        else:
+            player.play(song_name, song_file)
+        return player.status()
     except Exception as e:
         logging.error(f"Failed to play song: {e}")
-        if 'temp_dir' in locals():
-            shutil.rmtree(temp_dir)  # Clean up the temporary directory if an error occurs
         return False
 
+def skip_song(arguments):
+    if music_player is None:
+        return {"playing": None, "queue": []}
+    playing = music_player.skip()
+    logging.debug(f"Skipped to {playing}")
+    return music_player.status()
+
+def stop_music(arguments):
+    if music_player is not None:
+        music_player.stop()
+    logging.debug("Stopped music and cleared the queue")
+    return True
+
 # Signal handler to stop all threads when the main process is terminated
 def signal_handler(sig, frame):
     logging.info("Main process terminated. Stopping all threads.")
-    thread_manager.stop_all_threads()
+    timer_scheduler.stop()
+    alert_executor.shutdown(wait=False)
+    tool_executor.shutdown(wait=False)
+    if music_player is not None:
+        music_player.close()
+    audio_cache.close()
+    # Sends what is already queued, then logs out of the pooled sessions
+    if email_sender is not None:
+        email_sender.close()
+    hash_cache.close()
+    mail_sync.cache.close()
     sys.exit(0)
 
-# Set up signal handler
-signal.signal(signal.SIGINT, signal_handler)
-signal.signal(signal.SIGTERM, signal_handler)
+def setup():
+    # Folder for the stores opened below
+    os.makedirs(DATA_DIR, exist_ok=True)
+
+    # Set up signal handler
+    signal.signal(signal.SIGINT, signal_handler)
+    signal.signal(signal.SIGTERM, signal_handler)
+
+    # Start the thread that shows notifications
+    setup_alert_executor()
+
+    # Initialize timer scheduler
+    setup_timer_scheduler()
+
+    # Reload stored timers, alarms and reminders that are due soon
+    setup_reminder_service()
+
+    # Initialize tool executor
+    setup_tool_executor()
+
+    # Open the filename index and keep it refreshed in the background
+    setup_file_index()
+
+    # Open the hash cache used by find_duplicates
+    setup_hash_cache()
+
+    # Open the email header cache used by read_emails
+    setup_mail_sync()
+
+    # Start the pooled SMTP sender used by send_email
+    setup_email_sender()
+
+    # Open the downloaded-track cache used by play_song
+    setup_audio_cache()
+
+    # Map tool names to their functions
+    setup_tool_registry()
 
-# Initialize thread manager
-setup_thread_manager()
\ No newline at end of file
+# Worker processes, e.g. compress_files' deflate workers, re-import the main
+# module under spawn; they must not open the stores, start threads or take
+# over signals. (spawn names the process before that import, whereas
+# parent_process() is only set after it.)
+if multiprocessing.current_process().name == "MainProcess":
+    setup()
@@ -97,26 +97,44 @@ tools = [
     },
     {
         "name": "move_file",
-        "description": "Move a file from one location to another.",
+        "description": "Move files or folders from one location to another.",
         "parameters": {
             "type": "object",
             "properties": {
-                "source": {"type": "string", "description": "Source file path"},
-                "destination": {"type": "string", "description": "Destination path"}
+                "source": {"type": "string", "description": "Source file or folder path"},
+                "destination": {"type": "string", "description": "Destination path"},
+                "pairs": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {"source": {"type": "string"}, "destination": {"type": "string"}},
+                        "required": ["source", "destination"]
+                    },
+                    "description": "More source/destination pairs to move in the same call"
+                }
             },
-            "required": ["source", "destination"]
+            "anyOf": [{"required": ["source", "destination"]}, {"required": ["pairs"]}]
         }
     },
     {
         "name": "copy_file",
-        "description": "Copy a file from one location to another.",
+        "description": "Copy files or folders from one location to another.",
         "parameters": {
             "type": "object",
             "properties": {
-                "source": {"type": "string", "description": "Source file path"},
-                "destination": {"type": "string", "description": "Destination path"}
+                "source": {"type": "string", "description": "Source file or folder path"},
+                "destination": {"type": "string", "description": "Destination path"},
+                "pairs": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {"source": {"type": "string"}, "destination": {"type": "string"}},
+                        "required": ["source", "destination"]
+                    },
+                    "description": "More source/destination pairs to copy in the same call"
+                }
             },
-            "required": ["source", "destination"]
+            "anyOf": [{"required": ["source", "destination"]}, {"required": ["pairs"]}]
         }
     },
     {
@@ -142,28 +160,79 @@ tools = [
             "required": ["old_path", "new_name"]
         }
     },
+    {
+        "name": "batch_rename",
+        "description": "Rename many files in a folder at once using a regex or a name template.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "directory": {"type": "string", "description": "Folder containing the files"},
+                "pattern": {"type": "string", "description": "Which files to rename (e.g., *.jpg; default: all)"},
+                "regex": {"type": "string", "description": "Regular expression applied to each file name"},
+                "replacement": {"type": "string", "description": "Replacement for regex matches (\\1 for groups)"},
+                "template": {"type": "string", "description": "New name template with {n}, {stem}, {ext}, {name} or {mtime:%Y-%m-%d} (e.g., Holiday_{n:03}{ext})"},
+                "start": {"type": "integer", "description": "First value of {n} (default: 1)"},
+                "sort": {"type": "string", "enum": ["name", "mtime"], "description": "Order used for {n}"},
+                "dry_run": {"type": "boolean", "description": "Only preview the new names"}
+            },
+            "required": ["directory"]
+        }
+    },
+    {
+        "name": "delete_files",
+        "description": "Delete all files in a folder that match a pattern.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "directory": {"type": "string", "description": "Folder to delete files from"},
+                "pattern": {"type": "string", "description": "File name pattern (e.g., *.tmp)"},
+                "recursive": {"type": "boolean", "description": "Also delete matches in subfolders"},
+                "exclude": {"type": "array", "items": {"type": "string"}, "description": "Folder or file names to leave alone"},
+                "dry_run": {"type": "boolean", "description": "Only list what would be deleted"}
+            },
+            "required": ["directory", "pattern"]
+        }
+    },
+    {
+        "name": "create_files",
+        "description": "Create many files at once from a mapping of path to content.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "files": {"type": "object", "additionalProperties": {"type": "string"}, "description": "Mapping of file path to file content"},
+                "directory": {"type": "string", "description": "Base folder for relative paths"},
+                "overwrite": {"type": "boolean", "description": "Replace existing files (default: true)"}
+            },
+            "required": ["files"]
+        }
+    },
     {
         "name": "compress_files",
-        "description": "Compress files into a zip archive.",
+        "description": "Compress files and folders into a zip archive.",
         "parameters": {
             "type": "object",
             "properties": {
-                "files": {"type": "array", "items": {"type": "string"}, "description": "List of file paths to compress"},
-                "output_path": {"type": "string", "description": "Output zip file path"}
+                "files": {"type": "array", "items": {"type": "string"}, "description": "List of file or folder paths to compress; folders are included recursively"},
+                "output_path": {"type": "string", "description": "Output zip file path"},
+                "level": {"type": "integer", "description": "Compression level 0-9 (default: 6)"},
+                "workers": {"type": "integer", "description": "Number of processes compressing in parallel (default: all cores)"}
             },
             "required": ["files", "output_path"]
         }
     },
     {
         "name": "extract_archive",
-        "description": "Extract a zip archive.",
+        "description": "Extract a zip or tar (.tar, .tar.gz, .tar.xz) archive, or list its contents.",
         "parameters": {
             "type": "object",
             "properties": {
                 "archive_path": {"type": "string", "description": "Path to the archive file"},
-                "extract_path": {"type": "string", "description": "Extraction destination path"}
+                "extract_path": {"type": "string", "description": "Extraction destination path (required unless list_only is true)"},
+                "include": {"type": "array", "items": {"type": "string"}, "description": "Only extract members matching these patterns (e.g., *.pdf, docs/*)"},
+                "exclude": {"type": "array", "items": {"type": "string"}, "description": "Skip members matching these patterns"},
+                "list_only": {"type": "boolean", "description": "List the archive's members instead of extracting"}
             },
-            "required": ["archive_path", "extract_path"]
+            "required": ["archive_path"]
         }
     },
     {
@@ -174,11 +243,29 @@ tools = [
             "properties": {
                 "directory": {"type": "string", "description": "Directory to search in"},
                 "pattern": {"type": "string", "description": "Search pattern (e.g., *.txt)"},
-                "recursive": {"type": "boolean", "description": "Search in subdirectories"}
+                "recursive": {"type": "boolean", "description": "Search in subdirectories"},
+                "max_results": {"type": "integer", "description": "Maximum number of matches to return (default: 1000)"},
+                "max_depth": {"type": "integer", "description": "How many directory levels below the search directory to descend"},
+                "exclude": {"type": "array", "items": {"type": "string"}, "description": "Directory or file name patterns to skip (default: node_modules, .git and similar)"}
             },
             "required": ["directory", "pattern"]
         }
     },
+    {
+        "name": "find_duplicates",
+        "description": "Find duplicate files (identical content) in a folder.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "directory": {"type": "string", "description": "Folder to scan"},
+                "pattern": {"type": "string", "description": "Only consider files matching this pattern (e.g., *.jpg)"},
+                "recursive": {"type": "boolean", "description": "Include subfolders (default: true)"},
+                "min_size": {"type": "integer", "description": "Ignore files smaller than this many bytes (default: 1)"},
+                "max_groups": {"type": "integer", "description": "Maximum number of duplicate groups to return (default: 50)"}
+            },
+            "required": ["directory"]
+        }
+    },
     {
         "name": "launch_application",
         "description": "Launch a Windows application.",
@@ -241,26 +328,74 @@ tools = [
             "required": ["level"]
         }
     },
+    {
+        "name": "play_song",
+        "description": "Play a song by name, or add it to the music queue.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "song_name": {"type": "string", "description": "Song title, optionally with the artist"},
+                "queue": {"type": "boolean", "description": "Play after the queued songs instead of now (default: false)"},
+                "prefetch": {"type": "array", "items": {"type": "string"}, "description": "Songs likely to be requested next, downloaded in the background"}
+            },
+            "required": ["song_name"]
+        }
+    },
+    {
+        "name": "skip_song",
+        "description": "Skip to the next song in the music queue.",
+        "parameters": {
+            "type": "object",
+            "properties": {}
+        }
+    },
+    {
+        "name": "stop_music",
+        "description": "Stop the music and clear the queue.",
+        "parameters": {
+            "type": "object",
+            "properties": {}
+        }
+    },
     {
         "name": "send_email",
-        "description": "Send an email with optional attachment.",
+        "description": "Send an email with optional attachment, or several emails at once.",
         "parameters": {
             "type": "object",
             "properties": {
-                "recipient": {"type": "string"},
+                "recipient": {"type": "string", "description": "Recipient address; separate several with commas"},
                 "subject": {"type": "string"},
                 "body": {"type": "string"},
-                "attachment_path": {"type": "string"}
+                "attachment_path": {"type": "string"},
+                "messages": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "recipient": {"type": "string"},
+                            "subject": {"type": "string"},
+                            "body": {"type": "string"},
+                            "attachment_path": {"type": "string"}
+                        },
+                        "required": ["recipient", "subject", "body"]
+                    },
+                    "description": "More emails to send in the same call"
+                }
             },
-            "required": ["recipient", "subject", "body"]
+            "anyOf": [{"required": ["recipient", "subject", "body"]}, {"required": ["messages"]}]
         }
     },
     {
         "name": "read_emails",
-        "description": "Read emails from the inbox.",
+        "description": "Read the newest emails from the inbox, optionally filtered by sender or subject.",
         "parameters": {
             "type": "object",
-            "properties": {}
+            "properties": {
+                "count": {"type": "integer", "description": "How many of the newest matching emails to return (default: 10)"},
+                "sender": {"type": "string", "description": "Only emails whose sender contains this text"},
+                "subject": {"type": "string", "description": "Only emails whose subject contains this text"},
+                "refresh": {"type": "boolean", "description": "Check the server for new mail even if it was checked recently"}
+            }
         }
     },
     {
@@ -0,0 +1,274 @@
+import errno
+import logging
+import os
+import shutil
+import stat
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Bytes per copy_file_range/sendfile call; also the progress granularity
+CHUNK_SIZE = 64 * 1024 * 1024
+# Buffer for the portable read/write fallback
+BUFFER_SIZE = 1024 * 1024
+PART_SUFFIX = ".part"
+# Smaller files are written in place; restarting them costs less than the extra rename
+RESUME_MIN_SIZE = 8 * 1024 * 1024
+# Concurrent copies per (source device, destination device) pair
+PER_DEVICE_WORKERS = 4
+
+_NO_FAST_COPY = {errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP, errno.EBADF, errno.ETXTBSY}
+
+
+class TransferProgress:
+    # Thread-safe byte and file counters; callback(done_bytes, total_bytes,
+    # done_files, total_files) runs at most every `interval` seconds and once
+    # at the end
+    def __init__(self, total_bytes, total_files, callback=None, interval=0.25):
+        self.total_bytes = total_bytes
+        self.total_files = total_files
+        self.done_bytes = 0
+        self.done_files = 0
+        self.callback = callback
+        self.interval = interval
+        self._last = 0.0
+        self._lock = threading.Lock()
+
+    def add_bytes(self, count):
+        with self._lock:
+            self.done_bytes += count
+            self._report(False)
+
+    def file_done(self):
+        with self._lock:
+            self.done_files += 1
+            self._report(self.done_files == self.total_files)
+
+    def _report(self, final):
+        if self.callback is None:
+            return
+        now = time.monotonic()
+        if final or now - self._last >= self.interval:
+            self._last = now
+            self.callback(self.done_bytes, self.total_bytes, self.done_files, self.total_files)
+
+
+def _copy_range(src_fd, dst_fd, offset, size, progress):
+    # Kernel-side copy, without the data passing through userspace
+    while offset < size:
+        copied = os.copy_file_range(src_fd, dst_fd, min(CHUNK_SIZE, size - offset), offset, offset)
+        if copied == 0:
+            break
+        offset += copied
+        progress(copied)
+    return offset
+
+
+def _sendfile(src_fd, dst_fd, offset, size, progress):
+    os.lseek(dst_fd, offset, os.SEEK_SET)
+    while offset < size:
+        sent = os.sendfile(dst_fd, src_fd, offset, min(CHUNK_SIZE, size - offset))
+        if sent == 0:
+            break
+        offset += sent
+        progress(sent)
+    return offset
+
+
+def _buffered(src_fd, dst_fd, offset, size, progress):
+    os.lseek(src_fd, offset, os.SEEK_SET)
+    os.lseek(dst_fd, offset, os.SEEK_SET)
+    buffer = bytearray(BUFFER_SIZE)
+    view = memoryview(buffer)
+    with open(src_fd, "rb", buffering=0, closefd=False) as source:
+        while offset < size:
+            read = source.readinto(view)
+            if not read:
+                break
+            written = 0
+            while written < read:
+                written += os.write(dst_fd, view[written:read])
+            offset += read
+            progress(read)
+    return offset
+
+
+def copy_data(src_fd, dst_fd, offset, size, progress=lambda count: None):
+    # Copies src[offset:size] to the same offsets of dst with the fastest
+    # mechanism the platform allows: copy_file_range, then sendfile, then a
+    # large userspace buffer. Returns the final offset.
+    for method in (getattr(os, "copy_file_range", None) and _copy_range,
+                   hasattr(os, "sendfile") and os.name == "posix" and _sendfile):
+        if not method:
+            continue
+        try:
+            return method(src_fd, dst_fd, offset, size, progress)
+        except OSError as e:
+            if e.errno not in _NO_FAST_COPY:
+                raise
+            # Data lands contiguously from the start of the .part file, so its
+            # size is how far the failed method got
+            offset = os.fstat(dst_fd).st_size
+    return _buffered(src_fd, dst_fd, offset, size, progress)
+
+
+def copy_file(source, destination, progress=None, resume=True):
+    # Copies one file with its timestamps and permission bits. Files of at
+    # least RESUME_MIN_SIZE go through destination + ".part" and are renamed
+    # into place; a leftover .part from an interrupted copy is continued if it
+    # is no larger than the source and the source has not changed since.
+    # Returns the number of bytes resumed rather than copied.
+    progress = progress or (lambda count: None)
+    if os.path.exists(destination) and os.path.samefile(source, destination):
+        # Opening the destination would truncate the source
+        raise shutil.SameFileError(f"{source} and {destination} are the same file")
+    src_stat = os.stat(source)
+    size = src_stat.st_size
+    part = destination + PART_SUFFIX if size >= RESUME_MIN_SIZE else destination
+    offset = 0
+    if resume and part != destination:
+        try:
+            part_stat = os.stat(part)
+            if part_stat.st_size <= size and src_stat.st_mtime <= part_stat.st_mtime:
+                offset = part_stat.st_size
+        except FileNotFoundError:
+            pass
+    src_fd = os.open(source, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        flags = os.O_WRONLY | os.O_CREAT | getattr(os, "O_BINARY", 0) | (0 if offset else os.O_TRUNC)
+        dst_fd = os.open(part, flags, 0o666)
+        try:
+            if offset:
+                progress(offset)
+            end = copy_data(src_fd, dst_fd, offset, size, progress)
+            if end != size:
+                raise IOError(f"{source} changed size while it was being copied")
+        finally:
+            os.close(dst_fd)
+    finally:
+        os.close(src_fd)
+    os.utime(part, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+    os.chmod(part, stat.S_IMODE(src_stat.st_mode))
+    if part != destination:
+        os.replace(part, destination)
+    return offset
+
+
+def resolve_target(source, destination):
+    # Like shutil, a destination that is an existing folder receives the
+    # source under its own name
+    source = os.path.abspath(source)
+    destination = os.path.abspath(destination)
+    if os.path.isdir(destination):
+        destination = os.path.join(destination, os.path.basename(source.rstrip(os.sep)))
+    return source, destination
+
+
+def plan_transfers(pairs):
+    # Expands (source, destination) pairs into per-file jobs and the folders
+    # to create
+    jobs, folders = [], []
+    for source, destination in pairs:
+        source, destination = resolve_target(source, destination)
+        if not os.path.isdir(source):
+            jobs.append((source, destination, os.path.getsize(source)))
+            continue
+        for current, subdirs, names in os.walk(source):
+            target = os.path.join(destination, os.path.relpath(current, source))
+            folders.append(os.path.normpath(target))
+            for name in names:
+                path = os.path.join(current, name)
+                try:
+                    size = os.path.getsize(path)
+                except OSError:
+                    continue
+                jobs.append((path, os.path.join(target, name), size))
+    return jobs, folders
+
+
+def _device(path, cache=None):
+    # Device id of path, or of its nearest existing parent; `cache` maps
+    # folders already looked up during one transfer
+    if cache is not None and path in cache:
+        return cache[path]
+    try:
+        device = os.stat(path).st_dev
+    except FileNotFoundError:
+        parent = os.path.dirname(path)
+        device = None if parent == path else _device(parent, cache)
+    if cache is not None:
+        cache[path] = device
+    return device
+
+
+def transfer(pairs, move=False, progress=None, per_device=PER_DEVICE_WORKERS, resume=True):
+    # Copies (or moves) many files and folder trees in one call. Copies are
+    # grouped by source/destination device pair, each group running on its
+    # own bounded pool, largest files first. Moves within one device are plain
+    # renames; across devices they copy, then remove the source.
+    started = time.perf_counter()
+    stats = {"files": 0, "bytes": 0, "resumed_bytes": 0, "renamed": 0, "failed": []}
+    remaining = []
+    for source, destination in pairs:
+        _, target = resolve_target(source, destination)
+        if os.path.exists(target) and os.path.exists(source) and os.path.samefile(source, target):
+            # Neither file is touched; copying onto itself would truncate it
+            logging.error(f"Cannot transfer {source} onto itself")
+            stats["failed"].append((source, f"{source} and {target} are the same file"))
+            continue
+        if move and _device(source) == _device(destination):
+            try:
+                os.replace(source, target)
+                stats["renamed"] += 1
+                continue
+            except OSError as e:
+                logging.debug(f"Rename of {source} failed, copying instead: {e}")
+        remaining.append((source, destination))
+
+    jobs, folders = plan_transfers(remaining)
+    for folder in dict.fromkeys(folders + [os.path.dirname(destination) for _, destination, _ in jobs]):
+        os.makedirs(folder, exist_ok=True)
+
+    tracker = TransferProgress(sum(size for _, _, size in jobs), len(jobs), progress)
+    groups = {}
+    devices = {}
+    for job in sorted(jobs, key=lambda job: job[2], reverse=True):
+        key = (_device(os.path.dirname(job[0]), devices), _device(os.path.dirname(job[1]), devices))
+        groups.setdefault(key, []).append(job)
+    lock = threading.Lock()
+
+    def run(job):
+        source, destination, size = job
+        try:
+            resumed = copy_file(source, destination, tracker.add_bytes, resume)
+            if move:
+                os.remove(source)
+            with lock:
+                stats["files"] += 1
+                stats["bytes"] += size
+                stats["resumed_bytes"] += resumed
+        except Exception as e:
+            logging.error(f"Failed to transfer {source} to {destination}: {e}")
+            with lock:
+                stats["failed"].append((source, str(e)))
+        finally:
+            tracker.file_done()
+
+    pools = [ThreadPoolExecutor(max_workers=per_device, thread_name_prefix="transfer") for _ in groups]
+    try:
+        futures = [pool.submit(run, job) for pool, group in zip(pools, groups.values()) for job in group]
+        for future in futures:
+            future.result()
+    finally:
+        for pool in pools:
+            pool.shutdown()
+
+    if move and not stats["failed"]:
+        # Emptied source trees from cross-device moves
+        for source, _ in remaining:
+            if os.path.isdir(source):
+                shutil.rmtree(source, ignore_errors=True)
+    stats["seconds"] = time.perf_counter() - started
+    logging.debug(f"{'Moved' if move else 'Copied'} {stats['files']} files ({stats['bytes']} bytes), "
+                  f"renamed {stats['renamed']}, {len(stats['failed'])} failed in {stats['seconds']:.2f}s")
+    return stats